@@ -0,0 +1,136 @@
+"""
+Maintenance and queries for the LedgerBalance summary table.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncMonth
+from .models import LedgerBalance, Transaction
+
+ZERO = Decimal('0')
+
+def month_start(value):
+    return value.replace(day=1)
+
+def next_month(value):
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+def transaction_key(ledger_id, txn_date, transaction_type, amount):
+    """Return ((ledger_id, period), (debit, credit)) for one transaction's values."""
+    txn_date = Transaction._meta.get_field('date').to_python(txn_date)
+    amount = Transaction._meta.get_field('amount').to_python(amount) or ZERO
+    if transaction_type == 'income':
+        return (ledger_id, month_start(txn_date)), (ZERO, amount)
+    return (ledger_id, month_start(txn_date)), (amount, ZERO)
+
+class BalanceDelta:
+    """Accumulates changes per (ledger, period) so each key is written once."""
+
+    def __init__(self):
+        self.changes = defaultdict(lambda: [ZERO, ZERO, 0])
+
+    def add(self, ledger_id, txn_date, transaction_type, amount, sign=1):
+        key, (debit, credit) = transaction_key(ledger_id, txn_date, transaction_type, amount)
+        change = self.changes[key]
+        change[0] += sign * debit
+        change[1] += sign * credit
+        change[2] += sign
+
+    def add_instance(self, instance, sign=1):
+        self.add(instance.ledger_id, instance.date, instance.transaction_type, instance.amount, sign)
+
+    def apply(self, create=True):
+        """
+        Write the accumulated changes. With create=False, rows missing from
+        LedgerBalance are left alone; deletes use this so a cascade from a
+        deleted ledger cannot recreate its balances.
+        """
+        missing = []
+        for (ledger_id, period), (debit, credit, count) in self.changes.items():
+            if (debit or credit or count) and not _update(ledger_id, period, debit, credit, count) and create:
+                missing.append(LedgerBalance(
+                    ledger_id=ledger_id, period=period, debit=debit, credit=credit, transaction_count=count
+                ))
+        self.changes.clear()
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                LedgerBalance.objects.bulk_create(missing)
+        except IntegrityError:
+            # Another writer created some of the rows first
+            for balance in missing:
+                _bump(balance.ledger_id, balance.period, balance.debit, balance.credit, balance.transaction_count)
+
+def _update(ledger_id, period, debit, credit, count):
+    """Add the changes to an existing row; return False if there is none."""
+    return bool(LedgerBalance.objects.filter(ledger_id=ledger_id, period=period).update(
+        debit=F('debit') + debit,
+        credit=F('credit') + credit,
+        transaction_count=F('transaction_count') + count,
+    ))
+
+def _bump(ledger_id, period, debit, credit, count):
+    if _update(ledger_id, period, debit, credit, count):
+        return
+    try:
+        with transaction.atomic():
+            LedgerBalance.objects.create(
+                ledger_id=ledger_id, period=period, debit=debit, credit=credit, transaction_count=count
+            )
+    except IntegrityError:
+        # Another writer created the row first
+        _update(ledger_id, period, debit, credit, count)
+
+def compute_balances():
+    """Aggregate Transaction into unsaved LedgerBalance rows, one per (ledger, month)."""
+    rows = (
+        Transaction.objects
+        .annotate(period=TruncMonth('date'))
+        .values('ledger_id', 'period')
+        .annotate(
+            debit=Sum('amount', filter=~Q(transaction_type='income'), default=ZERO),
+            credit=Sum('amount', filter=Q(transaction_type='income'), default=ZERO),
+            transaction_count=Count('id'),
+        )
+        .order_by()
+    )
+    return [LedgerBalance(**row) for row in rows]
+
+@transaction.atomic
+def rebuild_balances(batch_size=1000):
+    """Replace the whole LedgerBalance table with freshly computed rows."""
+    balances = compute_balances()
+    LedgerBalance.objects.all().delete()
+    LedgerBalance.objects.bulk_create(balances, batch_size=batch_size)
+    return len(balances)
+
+def verify_balances():
+    """
+    Compare LedgerBalance with a fresh aggregate of Transaction and return a
+    list of (ledger_id, period, stored, expected) for every row that differs;
+    stored/expected are (debit, credit, transaction_count) tuples.
+    """
+    def key(balance):
+        return (balance.ledger_id, _as_date(balance.period))
+
+    def values(balance):
+        return (balance.debit, balance.credit, balance.transaction_count)
+
+    expected = {key(balance): values(balance) for balance in compute_balances()}
+    stored = {key(balance): values(balance) for balance in LedgerBalance.objects.all()}
+    empty = (ZERO, ZERO, 0)
+    mismatches = []
+    for ledger_id, period in sorted(expected.keys() | stored.keys()):
+        have = stored.get((ledger_id, period), empty)
+        want = expected.get((ledger_id, period), empty)
+        if have != want:
+            mismatches.append((ledger_id, period, have, want))
+    return mismatches
@@ -4,9 +4,10 @@ from .models import Ledger, Transaction, Report
 class LedgerForm(forms.ModelForm):
     class Meta:
         model = Ledger
-        fields = ['name', 'description']
+        fields = ['name', 'type', 'description']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control'}),
+            'type': forms.Select(attrs={'class': 'form-control'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         }
 
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from accounting.balances import rebuild_balances, verify_balances
+
+class Command(BaseCommand):
+    help = 'Rebuild the LedgerBalance summary table from Transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare the stored balances with Transaction; exit with an error on mismatch')
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help='Rows inserted per query while rebuilding')
+
+    def handle(self, *args, **options):
+        if options['verify']:
+            mismatches = verify_balances()
+            for ledger_id, period, stored, expected in mismatches:
+                self.stderr.write(
+                    f'ledger {ledger_id} {period:%Y-%m}: stored {stored}, expected {expected}'
+                )
+            if mismatches:
+                raise CommandError(f'{len(mismatches)} ledger balances are out of date; run rebuild_balances')
+            self.stdout.write(self.style.SUCCESS('Ledger balances match transactions'))
+            return
+
+        count = rebuild_balances(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} ledger balances'))
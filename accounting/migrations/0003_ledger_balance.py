@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:38
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+
+
+def backfill_balances(apps, schema_editor):
+    Transaction = apps.get_model('accounting', 'Transaction')
+    LedgerBalance = apps.get_model('accounting', 'LedgerBalance')
+    rows = (
+        Transaction.objects
+        .annotate(period=TruncMonth('date'))
+        .values('ledger_id', 'period')
+        .annotate(
+            debit=Sum('amount', filter=~Q(transaction_type='income'), default=0),
+            credit=Sum('amount', filter=Q(transaction_type='income'), default=0),
+            transaction_count=Count('id'),
+        )
+        .order_by()
+    )
+    LedgerBalance.objects.bulk_create([LedgerBalance(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0002_transaction_acc_txn_created_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(help_text='First day of the month')),
+                ('debit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('credit', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('transaction_count', models.IntegerField(default=0)),
+                ('ledger', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balances', to='accounting.ledger')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['period'], name='acc_balance_period_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ledgerbalance',
+            constraint=models.UniqueConstraint(fields=('ledger', 'period'), name='acc_balance_ledger_period_uniq'),
+        ),
+        migrations.RunPython(backfill_balances, migrations.RunPython.noop),
+    ]
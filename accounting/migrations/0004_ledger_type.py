@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0003_ledger_balance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ledger',
+            name='type',
+            field=models.CharField(choices=[('asset', 'Asset'), ('liability', 'Liability'), ('equity', 'Equity'), ('revenue', 'Revenue'), ('expense', 'Expense')], default='asset', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='ledger',
+            index=models.Index(fields=['type'], name='acc_ledger_type_idx'),
+        ),
+    ]
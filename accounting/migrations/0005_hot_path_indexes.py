@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0004_ledger_type'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(fields=['transaction_type', 'date'], name='acc_txn_type_date_idx'),
+        ),
+    ]
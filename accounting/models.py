@@ -1,10 +1,24 @@
 from django.db import models
 
 class Ledger(models.Model):
+    ACCOUNT_TYPES = [
+        ('asset', 'Asset'),
+        ('liability', 'Liability'),
+        ('equity', 'Equity'),
+        ('revenue', 'Revenue'),
+        ('expense', 'Expense'),
+    ]
+
     name = models.CharField(max_length=100)
+    type = models.CharField(max_length=20, choices=ACCOUNT_TYPES, default='asset')
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['type'], name='acc_ledger_type_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -19,9 +33,39 @@ class Transaction(models.Model):
     ], default='expense')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='acc_txn_created_idx'),
+            models.Index(fields=['date', 'id'], name='acc_txn_date_idx'),
+            models.Index(fields=['transaction_type', 'date'], name='acc_txn_type_date_idx'),
+        ]
+
     def __str__(self):
         return f"{self.ledger.name} - {self.amount}"
 
+class LedgerBalance(models.Model):
+    """
+    Debit/credit totals of one ledger for one month, kept in step with
+    Transaction by accounting.signals so reports can read these rows instead
+    of scanning every transaction. Rebuild with `manage.py rebuild_balances`.
+    """
+    ledger = models.ForeignKey(Ledger, on_delete=models.CASCADE, related_name='balances')
+    period = models.DateField(help_text='First day of the month')
+    debit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    credit = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ledger', 'period'], name='acc_balance_ledger_period_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['period'], name='acc_balance_period_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.ledger.name} - {self.period:%Y-%m}"
+
 class Report(models.Model):
     title = models.CharField(max_length=100)
     content = models.TextField()
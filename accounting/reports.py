@@ -0,0 +1,142 @@
+"""
+Date ranges and result caching for the financial reports.
+
+Cached reports are keyed by report type, range and a version token for every
+month the range covers. Writing a transaction replaces the tokens of the
+months it touches (see accounting.signals), so reports over other months,
+closed periods in particular, keep being served from the cache.
+"""
+import hashlib
+import uuid
+from datetime import date, timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from erp_project.metrics import CACHE_REQUESTS
+from .models import LedgerBalance
+
+DEFAULT_RANGE_DAYS = 30
+PERIODS = ('month', 'quarter', 'year')
+# Reports cover dates within these bounds and at most MAX_RANGE_DAYS at once;
+# each month of a range is a cache key to look up
+MIN_DATE = date(1900, 1, 1)
+MAX_DATE = date(2999, 12, 31)
+MAX_RANGE_DAYS = 10 * 366
+
+# Token covering data that is not tied to a month, such as ledger names
+LEDGERS_VERSION_KEY = 'accounting:report-version:ledgers'
+
+class InvalidRange(ValueError):
+    """Raised for report dates that are malformed, out of bounds or too far apart."""
+
+def _parse(value):
+    if not value:
+        return None
+    try:
+        day = parse_date(value)
+    except ValueError:
+        day = None
+    if day is None:
+        raise InvalidRange(f'{value!r} is not a date (YYYY-MM-DD)')
+    if not MIN_DATE <= day <= MAX_DATE:
+        raise InvalidRange(f'{day} is outside {MIN_DATE}..{MAX_DATE}')
+    return day
+
+def period_bounds(period, day):
+    """Return the first and last day of the month, quarter or year containing day."""
+    if period == 'year':
+        return date(day.year, 1, 1), date(day.year, 12, 31)
+    first_month = day.month - (day.month - 1) % 3 if period == 'quarter' else day.month
+    months = 3 if period == 'quarter' else 1
+    start = date(day.year, first_month, 1)
+    end_month = first_month + months
+    end = date(day.year + (end_month > 12), (end_month - 1) % 12 + 1, 1) - timedelta(days=1)
+    return start, end
+
+def report_range(params, today=None):
+    """
+    Return the (start, end) dates selected by a report's query parameters.
+
+    ?period=month|quarter|year selects the whole period containing ?start
+    (today by default). Otherwise ?start and ?end bound the range, which
+    defaults to the last 30 days. Raises InvalidRange for malformed dates,
+    dates outside MIN_DATE..MAX_DATE and ranges over MAX_RANGE_DAYS.
+    """
+    today = today or timezone.localdate()
+    start = _parse(params.get('start'))
+    end = _parse(params.get('end'))
+    period = params.get('period')
+
+    if period in PERIODS:
+        return period_bounds(period, start or end or today)
+
+    end = end or today
+    start = start or end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start > end:
+        start, end = end, start
+    if (end - start).days > MAX_RANGE_DAYS:
+        raise InvalidRange(f'A report covers at most {MAX_RANGE_DAYS} days')
+    return start, end
+
+def _month_key(month):
+    return f'accounting:report-version:{month:%Y-%m}'
+
+def _months(start, end):
+    month = start.replace(day=1)
+    while month <= end:
+        yield month
+        month = (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _version(start, end):
+    """Return a digest of the version tokens covering start..end."""
+    if start is None:
+        first = LedgerBalance.objects.aggregate(first=Min('period'))['first']
+        start = min(first, end) if first else end
+    keys = [LEDGERS_VERSION_KEY] + [_month_key(month) for month in _months(start, end)]
+    tokens = cache.get_many(keys)
+    missing = [key for key in keys if key not in tokens]
+    if missing:
+        # A token that was never set (or was evicted) gets a fresh value, so
+        # no report cached under an older token can match it.
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        tokens.update(cache.get_many(missing))
+    digest = hashlib.sha1('|'.join(str(tokens.get(key)) for key in keys).encode('ascii'))
+    return digest.hexdigest()
+
+def invalidate_reports(months=None):
+    """
+    Expire cached reports covering any of the given months (dates within
+    them), or every cached report when months is None. As with
+    erp_project.caching.invalidate_model, the tokens are replaced now and
+    again on commit, so a report computed by another request from data read
+    before the write committed is not served afterwards.
+    """
+    if months is None:
+        keys = [LEDGERS_VERSION_KEY]
+    else:
+        keys = {_month_key(month) for month in months}
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+    bump()
+    transaction.on_commit(bump)
+
+def cached_report(report_type, start, end, compute):
+    """
+    Return compute(start, end), cached until a transaction between start and
+    end changes. Pass start=None for reports that cover all history up to end.
+    REPORT_CACHE_TIMEOUT=0 disables the cache.
+    """
+    if not settings.REPORT_CACHE_TIMEOUT:
+        return compute(start, end)
+    key = f'accounting:report:{report_type}:{start}:{end}:{_version(start, end)}'
+    data = cache.get(key)
+    CACHE_REQUESTS.inc(cache='report', result='miss' if data is None else 'hit')
+    if data is None:
+        data = compute(start, end)
+        cache.set(key, data, settings.REPORT_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,61 @@
+"""
+Keep LedgerBalance and the cached reports in step with Transaction writes.
+
+Single-row saves and deletes go through the model signals; bulk imports
+announce their rows with erp_project.export_import_utils.rows_imported.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from erp_project.export_import_utils import rows_imported
+from .balances import BalanceDelta
+from .models import Ledger, Transaction
+from .reports import invalidate_reports
+
+def _apply(delta, create=True):
+    months = {period for _, period in delta.changes}
+    delta.apply(create=create)
+    invalidate_reports(months)
+
+@receiver(pre_save, sender=Transaction)
+def remember_previous_transaction(sender, instance, raw=False, **kwargs):
+    instance._previous_balance_values = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_balance_values = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list('ledger_id', 'date', 'transaction_type', 'amount')
+        .first()
+    )
+
+@receiver(post_save, sender=Transaction)
+def update_balance_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    delta = BalanceDelta()
+    previous = getattr(instance, '_previous_balance_values', None)
+    if previous is not None:
+        delta.add(*previous, sign=-1)
+    delta.add_instance(instance)
+    _apply(delta)
+
+@receiver(post_delete, sender=Transaction)
+def update_balance_on_delete(sender, instance, **kwargs):
+    delta = BalanceDelta()
+    delta.add_instance(instance, sign=-1)
+    _apply(delta, create=False)
+
+@receiver(rows_imported, sender=Transaction)
+def update_balance_on_import(sender, created, updated, previous, **kwargs):
+    delta = BalanceDelta()
+    for instance in created:
+        delta.add_instance(instance)
+    for instance in updated:
+        delta.add_instance(previous[instance.pk], sign=-1)
+        delta.add_instance(instance)
+    _apply(delta)
+
+@receiver(post_save, sender=Ledger)
+@receiver(post_delete, sender=Ledger)
+def invalidate_reports_on_ledger_change(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_reports()
@@ -0,0 +1,170 @@
+"""
+Financial statements computed from one pass over the ledger activity.
+
+statement_activity() collects, per ledger, the debits and credits up to the
+end date (for the balance sheet) and within the report range (for the other
+statements) in a single grouped query over Transaction, or, by default, from
+the monthly LedgerBalance rows plus a scan of the partial months at the edges
+of the range. Every statement is then a roll-up of those rows in Python.
+
+Transactions of type "expense" are debits and "income" credits, as in the
+trial balance. Asset and expense ledgers are debit-normal; liability, equity
+and revenue ledgers are credit-normal.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from django.db.models import Q, Sum
+from .balances import month_start, next_month
+from .models import Ledger, LedgerBalance, Transaction
+
+ZERO = Decimal('0')
+DEBIT_NORMAL = {'asset', 'expense'}
+_FIELDS = ('debit', 'credit', 'period_debit', 'period_credit')
+
+def _as_date(value):
+    return value.date() if isinstance(value, datetime) else value
+
+def _add_rows(activity, rows):
+    for row in rows:
+        totals = activity[row['ledger_id']]
+        for field in _FIELDS:
+            totals[field] += row.get(field) or ZERO
+
+def _scan(transactions, cumulative, period):
+    """Group transactions by ledger, summing those matching cumulative and period."""
+    expense = ~Q(transaction_type='income')
+    income = Q(transaction_type='income')
+    return transactions.values('ledger_id').annotate(
+        debit=Sum('amount', filter=expense & cumulative),
+        credit=Sum('amount', filter=income & cumulative),
+        period_debit=Sum('amount', filter=expense & period),
+        period_credit=Sum('amount', filter=income & period),
+    ).order_by()
+
+def statement_activity(start, end, use_balances=True):
+    """
+    Return {ledger_id: {'debit', 'credit', 'period_debit', 'period_credit'}}
+    where debit/credit cover every transaction up to end and the period_
+    values only those from start to end.
+    """
+    start, end = _as_date(start), _as_date(end)
+    activity = defaultdict(lambda: dict.fromkeys(_FIELDS, ZERO))
+
+    if not use_balances:
+        _add_rows(activity, _scan(
+            Transaction.objects.filter(date__lte=end), Q(), Q(date__gte=start)
+        ))
+        return activity
+
+    # Whole months before `upper` come from LedgerBalance; of those, months
+    # from `first_full` on lie entirely inside the report range.
+    upper = next_month(end) if next_month(end) - timedelta(days=1) == end else month_start(end)
+    first_full = start if start.day == 1 else next_month(start)
+    balances = LedgerBalance.objects.filter(period__lt=upper).values('ledger_id').annotate(
+        total_debit=Sum('debit'),
+        total_credit=Sum('credit'),
+        period_debit=Sum('debit', filter=Q(period__gte=first_full)),
+        period_credit=Sum('credit', filter=Q(period__gte=first_full)),
+    ).order_by()
+    _add_rows(activity, (
+        {**row, 'debit': row['total_debit'], 'credit': row['total_credit']} for row in balances
+    ))
+
+    # Scan the days after the last whole month, and the start of the range
+    # when its month was already counted above in full
+    edges = Q(date__gte=upper, date__lte=end)
+    if month_start(start) < upper:
+        edges |= Q(date__gte=start, date__lt=first_full)
+    _add_rows(activity, _scan(
+        Transaction.objects.filter(edges), Q(date__gte=upper), Q(date__gte=start)
+    ))
+    return activity
+
+class Statements:
+    """All four financial statements for one report range."""
+
+    def __init__(self, start, end, use_balances=True):
+        self.start = start
+        self.end = end
+        self.ledgers = list(Ledger.objects.only('id', 'name', 'type').order_by('name', 'id'))
+        self.activity = statement_activity(start, end, use_balances)
+
+    def _net(self, ledger_type, totals, period):
+        prefix = 'period_' if period else ''
+        debit, credit = totals[f'{prefix}debit'], totals[f'{prefix}credit']
+        return debit - credit if ledger_type in DEBIT_NORMAL else credit - debit
+
+    def _by_type(self, period):
+        totals = defaultdict(lambda: ZERO)
+        for ledger in self.ledgers:
+            if ledger.id in self.activity:
+                totals[ledger.type] += self._net(ledger.type, self.activity[ledger.id], period)
+        return totals
+
+    def _cash(self, types):
+        # Cash received minus cash paid over the period
+        return sum(
+            (self.activity[ledger.id]['period_credit'] - self.activity[ledger.id]['period_debit']
+             for ledger in self.ledgers if ledger.type in types and ledger.id in self.activity),
+            ZERO,
+        )
+
+    def trial_balance(self):
+        ledgers = []
+        for ledger in self.ledgers:
+            totals = self.activity.get(ledger.id, {})
+            debit = totals.get('period_debit', ZERO)
+            credit = totals.get('period_credit', ZERO)
+            ledgers.append({
+                'name': ledger.name,
+                'type': ledger.get_type_display(),
+                'debit': debit,
+                'credit': credit,
+                'balance': credit - debit,
+            })
+        return {
+            'ledgers': ledgers,
+            'total_debit': sum((ledger['debit'] for ledger in ledgers), ZERO),
+            'total_credit': sum((ledger['credit'] for ledger in ledgers), ZERO),
+            'total_balance': sum((ledger['balance'] for ledger in ledgers), ZERO),
+        }
+
+    def income_statement(self):
+        totals = self._by_type(period=True)
+        return {
+            'revenue': totals['revenue'],
+            'expenses': totals['expense'],
+            'net_income': totals['revenue'] - totals['expense'],
+        }
+
+    def balance_sheet(self):
+        totals = self._by_type(period=False)
+        retained_earnings = totals['revenue'] - totals['expense']
+        return {
+            'assets': totals['asset'],
+            'liabilities': totals['liability'],
+            'equity': totals['equity'],
+            'retained_earnings': retained_earnings,
+            'total_liabilities_and_equity': totals['liability'] + totals['equity'] + retained_earnings,
+        }
+
+    def cash_flow(self):
+        operating = self._cash({'revenue', 'expense'})
+        investing = self._cash({'asset'})
+        financing = self._cash({'liability', 'equity'})
+        return {
+            'operating_cash_flow': operating,
+            'investing_cash_flow': investing,
+            'financing_cash_flow': financing,
+            'net_cash_flow': operating + investing + financing,
+        }
+
+    def as_dict(self):
+        """Return the data of every statement, keyed by report type."""
+        return {
+            'trial_balance': self.trial_balance(),
+            'income_statement': self.income_statement(),
+            'balance_sheet': self.balance_sheet(),
+            'cash_flow': self.cash_flow(),
+        }
@@ -1,23 +1,41 @@
+from datetime import datetime
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.views.decorators.http import require_http_methods
 from django.contrib import messages
 from .models import Ledger, Transaction, Report
+from .reports import InvalidRange, cached_report, report_range
+from .statements import Statements
 from .forms import LedgerForm, TransactionForm, ReportForm
+from erp_project import counters
+from erp_project.caching import cached_view
 from erp_project.export_import_utils import export_to_csv, export_to_pdf, import_from_csv
+from erp_project.pagination import CREATED_AT_SORTS, paginate
+from erp_project.querysets import QuerysetProfile
+from jobs.utils import enqueue_export, enqueue_import, wants_background
 
+# Queryset profiles shared by the list views and the CSV/PDF exports
+LEDGER_PROFILE = QuerysetProfile(Ledger, only=['id', 'name', 'type', 'description', 'created_at'])
+TRANSACTION_PROFILE = QuerysetProfile(
+    Transaction,
+    select_related=['ledger'],
+    only=['id', 'ledger', 'ledger__name', 'date', 'amount', 'description', 'transaction_type', 'created_at'],
+)
+REPORT_PROFILE = QuerysetProfile(Report, only=['id', 'title', 'content', 'created_at'])
+
+@cached_view('accounting.Ledger', 'accounting.Transaction', 'accounting.Report')
 def dashboard(request):
     """Display the accounting dashboard."""
     context = {
-        'total_ledgers': Ledger.objects.count(),
-        'total_transactions': Transaction.objects.count(),
-        'total_reports': Report.objects.count(),
+        'total_ledgers': counters.count(Ledger),
+        'total_transactions': counters.count(Transaction),
+        'total_reports': counters.count(Report),
     }
     return render(request, 'accounting/dashboard.html', context)
 
 # Ledger Views
 def ledgers_list(request):
-    ledgers = Ledger.objects.all()
+    ledgers = LEDGER_PROFILE.queryset()
     return render(request, 'accounting/ledgers.html', {'ledgers': ledgers})
 
 def ledger_create(request):
@@ -47,8 +65,10 @@ def ledger_delete(request, pk):
     return redirect('ledgers_list')
 
 # Transaction Views
+TRANSACTION_SORTS = {**CREATED_AT_SORTS, 'date': ('-date', '-id')}
+
 def transactions_list(request):
-    transactions = Transaction.objects.all()
+    transactions = paginate(request, TRANSACTION_PROFILE.queryset(), TRANSACTION_SORTS)
     return render(request, 'accounting/transactions.html', {'transactions': transactions})
 
 def transaction_create(request):
@@ -79,7 +99,7 @@ def transaction_delete(request, pk):
 
 # Report Views
 def reports_list(request):
-    reports = Report.objects.all()
+    reports = REPORT_PROFILE.queryset()
     return render(request, 'accounting/reports.html', {'reports': reports})
 
 def report_create(request):
@@ -108,131 +128,49 @@ def report_delete(request, pk):
     report.delete()
     return redirect('reports_list')
 
+# report_type -> whether the report covers all history up to the end date
+# rather than just the selected range
+REPORTS = {
+    'trial_balance': False,
+    'income_statement': False,
+    'balance_sheet': True,
+    'cash_flow': False,
+}
+
 def report_generate(request, report_type):
     """
     Generate different types of financial reports.
     Supported report types: trial_balance, income_statement, balance_sheet, cash_flow
+
+    The range comes from ?start=&end= or ?period=month|quarter|year (see
+    accounting.reports.report_range) and defaults to the last 30 days; invalid
+    dates and overlong ranges are answered with 400.
+    Results are cached until a transaction in the range changes.
     """
-    from django.db.models import Sum, Q
-    from decimal import Decimal
-    from datetime import datetime, timedelta
-    
+    if report_type not in REPORTS:
+        raise Http404("Report type not found")
+
+    try:
+        start_date, end_date = report_range(request.GET)
+    except InvalidRange as e:
+        return HttpResponseBadRequest(str(e))
+
+    def compute(start, end):
+        # start is None for reports over all history, which only use the
+        # cumulative totals; any start within the range gives the same ones
+        statement = getattr(Statements(start or end, end), report_type)
+        return {**statement(), 'generated_date': datetime.now()}
+
+    data = cached_report(report_type, None if REPORTS[report_type] else start_date, end_date, compute)
+
     context = {
         'report_type': report_type,
-        'generated_date': datetime.now(),
+        'period': request.GET.get('period', ''),
+        'start_date': start_date,
+        'end_date': end_date,
+        'report_date': end_date,
+        **data,
     }
-    
-    # Common date range for reports (last 30 days by default)
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=30)
-    
-    if report_type == 'trial_balance':
-        # Calculate trial balance (debits and credits for each ledger)
-        ledgers = Ledger.objects.annotate(
-            total_debit=Sum('transaction__amount', 
-                          filter=Q(transaction__transaction_type='expense',
-                                 transaction__date__range=[start_date, end_date]),
-                          default=0),
-            total_credit=Sum('transaction__amount',
-                           filter=Q(transaction__transaction_type='income',
-                                  transaction__date__range=[start_date, end_date]),
-                           default=0)
-        )
-        
-        # Calculate the difference (balance) for each ledger
-        ledgers = [
-            {
-                'name': ledger.name,
-                'debit': ledger.total_debit or 0,
-                'credit': ledger.total_credit or 0,
-                'balance': (ledger.total_credit or 0) - (ledger.total_debit or 0)
-            }
-            for ledger in ledgers
-        ]
-        
-        context.update({
-            'ledgers': ledgers,
-            'start_date': start_date,
-            'end_date': end_date,
-            'total_debit': sum(ledger['debit'] for ledger in ledgers),
-            'total_credit': sum(ledger['credit'] for ledger in ledgers),
-            'total_balance': sum(ledger['balance'] for ledger in ledgers),
-        })
-        
-    elif report_type == 'income_statement':
-        # Calculate revenue and expenses
-        revenue = Transaction.objects.filter(
-            ledger__type='revenue',
-            date__range=[start_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        expenses = Transaction.objects.filter(
-            ledger__type='expense',
-            date__range=[start_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        context.update({
-            'revenue': revenue,
-            'expenses': expenses,
-            'net_income': revenue - expenses,
-            'start_date': start_date,
-            'end_date': end_date,
-        })
-        
-    elif report_type == 'balance_sheet':
-        # Calculate assets, liabilities, and equity
-        assets = Transaction.objects.filter(
-            ledger__type='asset',
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        liabilities = Transaction.objects.filter(
-            ledger__type='liability',
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        equity = Transaction.objects.filter(
-            ledger__type='equity',
-            date__lte=end_date
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        context.update({
-            'assets': assets,
-            'liabilities': liabilities,
-            'equity': equity,
-            'report_date': end_date,
-        })
-    
-    elif report_type == 'cash_flow':
-        # Calculate cash flow from operating, investing, and financing activities
-        operating = Transaction.objects.filter(
-            Q(ledger__type='revenue') | Q(ledger__type='expense'),
-            date__range=[start_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        investing = Transaction.objects.filter(
-            ledger__type='asset',
-            date__range=[start_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        financing = Transaction.objects.filter(
-            Q(ledger__type='liability') | Q(ledger__type='equity'),
-            date__range=[start_date, end_date]
-        ).aggregate(total=Sum('amount'))['total'] or Decimal('0')
-        
-        context.update({
-            'operating_cash_flow': operating,
-            'investing_cash_flow': investing,
-            'financing_cash_flow': financing,
-            'net_cash_flow': operating + investing + financing,
-            'start_date': start_date,
-            'end_date': end_date,
-        })
-    else:
-        # Handle unknown report type
-        from django.http import Http404
-        raise Http404("Report type not found")
-    
     return render(request, f'accounting/reports/{report_type}.html', context)
 
 def test_template(request):
@@ -242,8 +180,11 @@ def test_template(request):
 # Export/Import Views for Accounting
 
 def export_ledgers(request, format_type='csv'):
-    fields = ['id', 'name', 'description', 'created_at']
-    ledgers = Ledger.objects.all()
+    fields = ['id', 'name', 'type', 'description', 'created_at']
+    ledgers = LEDGER_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('ledgers', LEDGER_PROFILE, fields, format_type, 'Ledgers List')
     
     if format_type == 'pdf':
         return export_to_pdf('ledgers', ledgers, fields, 'Ledgers List')
@@ -252,7 +193,10 @@ def export_ledgers(request, format_type='csv'):
 
 def export_transactions(request, format_type='csv'):
     fields = ['id', 'ledger__name', 'date', 'amount', 'description', 'transaction_type', 'created_at']
-    transactions = Transaction.objects.all()
+    transactions = TRANSACTION_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('transactions', TRANSACTION_PROFILE, fields, format_type, 'Transactions List')
     
     if format_type == 'pdf':
         return export_to_pdf('transactions', transactions, fields, 'Transactions List')
@@ -261,7 +205,10 @@ def export_transactions(request, format_type='csv'):
 
 def export_reports(request, format_type='csv'):
     fields = ['id', 'title', 'content', 'created_at']
-    reports = Report.objects.all()
+    reports = REPORT_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('reports', REPORT_PROFILE, fields, format_type, 'Reports List')
     
     if format_type == 'pdf':
         return export_to_pdf('reports', reports, fields, 'Reports List')
@@ -277,14 +224,20 @@ def import_ledgers(request):
     file = request.FILES['file']
     field_mapping = {
         'Name': 'name',
+        'Type': 'type',
         'Description': 'description'
     }
     
-    success, message = import_from_csv(Ledger, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    if wants_background(request):
+        job = enqueue_import(Ledger, file, field_mapping)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('accounting:ledgers_list')
+    
+    result = import_from_csv(Ledger, file, field_mapping)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('accounting:ledgers_list')
 
@@ -302,12 +255,18 @@ def import_transactions(request):
         'Description': 'description',
         'Transaction Type': 'transaction_type'
     }
+    natural_keys = {'ledger': 'name'}
+    
+    if wants_background(request):
+        job = enqueue_import(Transaction, file, field_mapping, natural_keys)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('accounting:transactions_list')
     
-    success, message = import_from_csv(Transaction, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    result = import_from_csv(Transaction, file, field_mapping, natural_keys=natural_keys)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('accounting:transactions_list')
 
@@ -323,10 +282,15 @@ def import_reports(request):
         'Content': 'content'
     }
     
-    success, message = import_from_csv(Report, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    if wants_background(request):
+        job = enqueue_import(Report, file, field_mapping)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('accounting:reports_list')
+    
+    result = import_from_csv(Report, file, field_mapping)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('accounting:reports_list')
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+class ErpProjectConfig(AppConfig):
+    name = 'erp_project'
+
+    def ready(self):
+        from . import caching, counters
+        caching.connect()
+        counters.connect()
@@ -0,0 +1,100 @@
+"""
+Per-view and fragment caching invalidated by model writes.
+
+Every model of the project's apps has a version token in the cache, replaced
+whenever a row is saved, deleted or imported. Cached pages and template
+fragments fold the tokens of the models they display into their keys, so a
+write to any of those models makes them miss while everything else keeps
+being served from the cache.
+"""
+import hashlib
+import uuid
+from functools import wraps
+from django.apps import apps
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from erp_project.export_import_utils import rows_imported
+from erp_project.metrics import CACHE_REQUESTS
+
+# Apps whose models are versioned
+VERSIONED_APPS = ('sales', 'inventory', 'accounting', 'hr', 'users')
+
+def _version_key(label):
+    return f'model-version:{label.lower()}'
+
+def model_version(*labels):
+    """Return a digest of the version tokens of the given 'app.Model' labels."""
+    keys = [_version_key(label) for label in labels]
+    tokens = cache.get_many(keys)
+    missing = [key for key in keys if key not in tokens]
+    if missing:
+        # A fresh token for a missing key cannot match anything cached before
+        for key in missing:
+            cache.add(key, uuid.uuid4().hex, None)
+        tokens.update(cache.get_many(missing))
+    return hashlib.sha1('|'.join(str(tokens.get(key)) for key in keys).encode('ascii')).hexdigest()
+
+def invalidate_model(model):
+    """
+    Expire everything cached for model. The token is replaced now, for the
+    writer's own later reads, and again on commit, so a page cached by another
+    request before the write became visible is not served afterwards.
+    """
+    key = _version_key(model._meta.label)
+
+    def bump():
+        cache.set(key, uuid.uuid4().hex, None)
+    bump()
+    transaction.on_commit(bump)
+
+def _on_change(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate_model(sender)
+
+def connect():
+    """Connect the invalidation signals; called from AppConfig.ready()."""
+    for app_label in VERSIONED_APPS:
+        for model in apps.get_app_config(app_label).get_models():
+            uid = f'model-version:{model._meta.label}'
+            post_save.connect(_on_change, sender=model, dispatch_uid=uid)
+            post_delete.connect(_on_change, sender=model, dispatch_uid=uid)
+            rows_imported.connect(_on_change, sender=model, dispatch_uid=uid)
+
+def _has_messages(request):
+    # Pages showing a flash message are one-off; never cache or serve them
+    return CookieStorage.cookie_name in request.COOKIES or (
+        settings.SESSION_COOKIE_NAME in request.COOKIES and '_messages' in request.session
+    )
+
+def cached_view(*labels, timeout=None):
+    """
+    Cache the full response of a GET view until a row of any of the models
+    named by labels ('app.Model') changes, or for timeout seconds (default
+    VIEW_CACHE_TIMEOUT; 0 disables caching). Responses other than a plain
+    200 without cookies are never cached.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            seconds = settings.VIEW_CACHE_TIMEOUT if timeout is None else timeout
+            if not seconds or request.method not in ('GET', 'HEAD') or _has_messages(request):
+                return view(request, *args, **kwargs)
+
+            path = hashlib.sha1(request.get_full_path().encode('utf-8')).hexdigest()
+            key = f'view:{view.__module__}.{view.__name__}:{path}:{model_version(*labels)}'
+            cached = cache.get(key)
+            CACHE_REQUESTS.inc(cache='view', result='miss' if cached is None else 'hit')
+            if cached is not None:
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200 and not response.cookies and not response.streaming:
+                cache.set(key, (response.content, response['Content-Type']), seconds)
+            return response
+        return wrapper
+    return decorator
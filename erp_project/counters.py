@@ -0,0 +1,95 @@
+"""
+Cached row counts for the dashboards.
+
+count(model) serves COUNT(*) from the cache. Saves, deletes and imports of
+the models in COUNTED_MODELS adjust the cached value once their transaction
+commits, so the dashboards do not touch the tables while the counts are warm.
+A value is recounted once it is missing or COUNTER_CACHE_TIMEOUT has passed
+since it was last counted or adjusted. That bounds the drift from writes that
+bypass the signals (queryset.update, raw SQL) and from concurrent adjustments
+on the db and file backends, whose incr is a read followed by a write rather
+than atomic; `manage.py reconcile_counters` recounts everything on demand.
+"""
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from erp_project.export_import_utils import rows_imported
+from erp_project.metrics import CACHE_REQUESTS
+
+COUNTED_MODELS = (
+    'sales.Customer',
+    'sales.Order',
+    'sales.Invoice',
+    'inventory.Product',
+    'inventory.Supplier',
+    'inventory.PurchaseOrder',
+    'accounting.Ledger',
+    'accounting.Transaction',
+    'accounting.Report',
+    'hr.Employee',
+    'hr.Attendance',
+    'hr.Leave',
+)
+
+def _key(model):
+    return f'counter:{model._meta.label_lower}'
+
+def count(model):
+    """Return the number of rows of model, from the cache when possible."""
+    if not settings.COUNTER_CACHE_TIMEOUT:
+        return model._default_manager.count()
+    value = cache.get(_key(model))
+    CACHE_REQUESTS.inc(cache='counter', result='miss' if value is None else 'hit')
+    if value is None:
+        value = model._default_manager.count()
+        cache.set(_key(model), value, settings.COUNTER_CACHE_TIMEOUT)
+    return value
+
+def adjust(model, delta):
+    """Add delta to the cached count of model once the current transaction commits."""
+    def apply():
+        try:
+            cache.incr(_key(model), delta)
+        except ValueError:
+            # Not cached: the next count() reads the table anyway
+            return
+        # Backends without a native incr store the result with their default
+        # timeout; touch rather than set, so as not to overwrite a concurrent incr
+        cache.touch(_key(model), settings.COUNTER_CACHE_TIMEOUT)
+    if delta:
+        transaction.on_commit(apply)
+
+def reconcile(models=None):
+    """
+    Recount models (default: every counted model), store the results and
+    return {label: (cached, actual)} for the counts that had drifted.
+    """
+    drift = {}
+    for model in models or [apps.get_model(label) for label in COUNTED_MODELS]:
+        cached = cache.get(_key(model))
+        actual = model._default_manager.count()
+        cache.set(_key(model), actual, settings.COUNTER_CACHE_TIMEOUT)
+        if cached is not None and cached != actual:
+            drift[model._meta.label] = (cached, actual)
+    return drift
+
+def _on_save(sender, created, raw=False, **kwargs):
+    if created and not raw:
+        adjust(sender, 1)
+
+def _on_delete(sender, **kwargs):
+    adjust(sender, -1)
+
+def _on_import(sender, created, **kwargs):
+    adjust(sender, len(created))
+
+def connect():
+    """Connect the counter signals for COUNTED_MODELS; called from AppConfig.ready()."""
+    for label in COUNTED_MODELS:
+        model = apps.get_model(label)
+        uid = f'counter:{label}'
+        post_save.connect(_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(_on_delete, sender=model, dispatch_uid=uid)
+        rows_imported.connect(_on_import, sender=model, dispatch_uid=uid)
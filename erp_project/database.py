@@ -0,0 +1,185 @@
+"""
+Database connection settings, pooling and the connection benchmark.
+
+database_config() builds DATABASES['default'] from DATABASE_URL for one of
+the DB_POOL_MODES:
+
+    persistent  each worker thread keeps its connection for DB_CONN_MAX_AGE
+                seconds; with health checks it is pinged before each request
+                reuses it, so a connection the server dropped is replaced
+                instead of failing the request
+    pool        PostgreSQL only: the threads of a process share a pool of at
+                most DB_POOL_SIZE connections (ConnectionPool, through the
+                erp_project.pooled_postgresql backend). A request checks a
+                connection out on its first query and returns it when it ends.
+    pgbouncer   connect through PgBouncer in transaction mode. Server-side
+                cursors are disabled: the server connection behind a cursor
+                may be handed to another client between transactions.
+    none        open a connection for every request
+
+benchmark() times simulated requests against the configured database and
+counts the connections they open; `manage.py benchmark_connections` prints
+the comparison with connecting per request.
+"""
+import os
+import threading
+import time
+from collections import deque
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+POOL_MODES = ('persistent', 'pool', 'pgbouncer', 'none')
+
+def database_config(default, mode='persistent', conn_max_age=600, health_checks=True,
+                    pool_size=4, pool_timeout=30):
+    """Return the settings of the database at DATABASE_URL (or default) for a pool mode."""
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, not {mode!r}")
+    config = dj_database_url.config(
+        default=default,
+        conn_max_age=0 if mode in ('pool', 'none') else conn_max_age,
+        conn_health_checks=health_checks,
+    )
+    if mode == 'pool':
+        if config['ENGINE'] != 'django.db.backends.postgresql':
+            raise ImproperlyConfigured('DB_POOL_MODE=pool requires a PostgreSQL DATABASE_URL')
+        config['ENGINE'] = 'erp_project.pooled_postgresql'
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'max_size': pool_size,
+            'timeout': pool_timeout,
+            'max_idle': conn_max_age,
+        }
+    elif mode == 'pgbouncer':
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return config
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection became free within the pool's timeout."""
+
+class ConnectionPool:
+    """
+    A thread-safe pool of at most max_size DB-API connections made by connect().
+
+    getconn() hands out the most recently returned idle connection, dropping
+    those idle for longer than max_idle seconds or failing check(), and waits
+    up to timeout seconds when all max_size are in use. putconn() returns a
+    connection, or closes it with close=True.
+    """
+
+    def __init__(self, connect, max_size=4, timeout=30, max_idle=600, check=None):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check = check
+        self.created = 0
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+    def getconn(self):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PoolTimeout(f'all {self.max_size} pooled connections stayed in use for {self.timeout}s')
+        try:
+            while True:
+                with self._lock:
+                    connection, returned = self._idle.pop() if self._idle else (None, None)
+                if connection is None:
+                    connection = self.connect()
+                    self.created += 1
+                    return connection
+                if time.monotonic() - returned <= self.max_idle and (self.check is None or self.check(connection)):
+                    return connection
+                self._discard(connection)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, connection, close=False):
+        try:
+            if close:
+                self._discard(connection)
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def idle(self):
+        return len(self._idle)
+
+    def clear(self):
+        """Close the idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, deque()
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def _discard(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(alias, factory):
+    """Return the pool of a database alias, creating it with factory() on first use."""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = factory()
+        return _pools[alias]
+
+def _forget_pools():
+    # A forked worker must neither use nor close its parent's connections:
+    # closing one would end the parent's session with it
+    global _pools_lock
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_forget_pools)
+
+def disconnect(connection):
+    """Close a database connection for real, also dropping its pool's idle connections."""
+    connection.close()
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        pool.clear()
+
+def benchmark(requests=200, alias='default', reconnect=False, sql='SELECT 1'):
+    """
+    Simulate requests that each run sql on the alias database, sending the
+    request_started and request_finished signals around them as the request
+    handler does, so CONN_MAX_AGE, health checks and pooling apply as when
+    serving. With reconnect, every request starts without a connection.
+
+    Returns (connections opened, [seconds from request start to the query's result]).
+    """
+    from django.core import signals
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    connection = connections[alias]
+    opened = []
+
+    def count(sender, connection, **kwargs):
+        if connection.alias == alias:
+            opened.append(connection)
+
+    connection_created.connect(count)
+    timings = []
+    try:
+        for _ in range(requests):
+            if reconnect:
+                disconnect(connection)
+            started = time.perf_counter()
+            signals.request_started.send(sender=__name__)
+            with connection.cursor() as cursor:
+                cursor.execute(sql)
+                cursor.fetchall()
+            timings.append(time.perf_counter() - started)
+            signals.request_finished.send(sender=__name__)
+    finally:
+        connection_created.disconnect(count)
+    return len(opened), timings
@@ -1,131 +1,630 @@
+import copy
 import csv
 import io
+import itertools
+import logging
+import tempfile
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from django.http import HttpResponse
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections, transaction
+from django.db.models import Q, QuerySet
+from django.dispatch import Signal
+from django.http import FileResponse, StreamingHttpResponse
+from erp_project import lazy
+from erp_project.metrics import EXPORT_ROWS, IMPORT_ROWS
 
-def export_to_csv(model_name, queryset, fields):
+# Sent after each import batch is written, since bulk_create/bulk_update skip
+# the model signals. sender is the model; created and updated are lists of
+# instances and previous maps the pk of each updated row to a copy of it as it
+# was before the import (empty for upserts that never load the old rows).
+rows_imported = Signal()
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per database round-trip while exporting
+EXPORT_CHUNK_SIZE = 2000
+# Size (in characters) of each block of CSV text handed to the client
+CSV_BUFFER_SIZE = 64 * 1024
+
+def iter_rows(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the values_list(*fields) rows of a queryset, chunk_size at a time
+    from the database, so neither the driver nor Python holds the whole result.
+
+    On PostgreSQL the rows come from a server-side cursor inside a
+    transaction: declared outside one, Django makes the cursor WITH HOLD and
+    PostgreSQL copies the entire result aside before the first fetch. With
+    DISABLE_SERVER_SIDE_CURSORS (DB_POOL_MODE=pgbouncer) they are read by
+    keyset_rows() instead. SQLite already steps through the result as it is
+    fetched.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        yield from queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    elif connection.settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        yield from keyset_rows(queryset, fields, chunk_size)
+    else:
+        with transaction.atomic(using=queryset.db, savepoint=False):
+            yield from queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+def _keyset(queryset):
+    # [(attname, descending)] that orders queryset uniquely: its own ordering
+    # up to a unique field, then the primary key. None if rows cannot be
+    # resumed after a key, e.g. when ordered by a nullable or related field.
+    query = queryset.query
+    if query.is_sliced or query.distinct or query.combinator:
+        return None
+    opts = queryset.model._meta
+    keys = []
+    for item in query.order_by or (opts.ordering if query.default_ordering else ()):
+        if not isinstance(item, str) or item == '?':
+            return None
+        name = item.lstrip('-')
+        try:
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+        except FieldDoesNotExist:
+            return None
+        if field.null or field.is_relation or not field.concrete:
+            return None
+        keys.append((field.attname, item.startswith('-')))
+        if field.unique:
+            return keys
+    return keys + [(opts.pk.attname, False)]
+
+def _after(keys, values):
+    # Rows sorting after the row with these key values: equal on the leading
+    # keys and beyond it on the next one
+    after = Q()
+    for index, ((name, descending), value) in enumerate(zip(keys, values)):
+        equal = {keys[previous][0]: values[previous] for previous in range(index)}
+        after |= Q(**equal, **{f"{name}__{'lt' if descending else 'gt'}": value})
+    return after
+
+def keyset_rows(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the values_list(*fields) rows of a queryset in its order, reading
+    each chunk with its own query that resumes after the last row's key.
+
+    No cursor outlives a query, so this is safe behind transaction-mode
+    connection poolers. Querysets that cannot be keyset-paginated (see
+    _keyset) are read in one query, with a warning.
+    """
+    keys = _keyset(queryset)
+    if keys is None:
+        logger.warning('%s export cannot be read in keyset chunks; fetching it in one query',
+                       queryset.model._meta.label)
+        yield from queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+        return
+
+    names = [name for name, _ in keys]
+    rows = queryset.order_by(*(f"{'-' if descending else ''}{name}" for name, descending in keys))
+    rows = rows.values_list(*fields, *names)
+    width = len(fields)
+    after = Q()
+    while True:
+        chunk = list(rows.filter(after)[:chunk_size])
+        for row in chunk:
+            yield row[:width]
+        if len(chunk) < chunk_size:
+            return
+        after = _after(keys, chunk[-1][width:])
+
+def iter_csv(queryset, fields, chunk_size=EXPORT_CHUNK_SIZE, buffer_size=CSV_BUFFER_SIZE, progress=None):
+    """
+    Yield the CSV rendering of a queryset in blocks of roughly buffer_size characters.
+
+    Rows are read with values_list() so related paths such as 'ledger__name'
+    become joins in a single query instead of one lookup per row. progress,
+    if given, is called with the number of rows written before each block.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    written = 0
+    for row in iter_rows(queryset, fields, chunk_size):
+        writer.writerow(['' if value is None else str(value) for value in row])
+        written += 1
+        if buffer.tell() >= buffer_size:
+            if progress is not None:
+                progress(written)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+
+    if progress is not None:
+        progress(written)
+    if buffer.tell():
+        yield buffer.getvalue()
+    EXPORT_ROWS.inc(written, format='csv')
+
+def export_to_csv(model_name, queryset, fields, chunk_size=EXPORT_CHUNK_SIZE):
     """
     Generic function to export data to CSV
     """
-    response = HttpResponse(content_type='text/csv')
+    response = StreamingHttpResponse(iter_csv(queryset, fields, chunk_size), content_type='text/csv')
     response['Content-Disposition'] = f'attachment; filename=\"{model_name}_{datetime.now().strftime("%Y%m%d")}.csv"'
-    
-    writer = csv.writer(response)
-    writer.writerow(fields)
-    
-    for obj in queryset:
+    return response
+
+# PDF exports are drawn one fixed-size table per page: rows per page, row
+# heights and column widths are fixed so reportlab never measures cells, and
+# at most one page of rows is held in memory.
+PDF_ROWS_PER_PAGE = 40
+# US letter, in points
+PDF_PAGE_SIZE = (612.0, 792.0)
+PDF_MARGIN = 36
+PDF_HEADER_HEIGHT = 18
+PDF_ROW_HEIGHT = 14
+PDF_FONT_SIZE = 8
+# Pages rendered by each worker process in a parallel export
+PDF_PAGES_PER_PART = 25
+# Average Helvetica glyph width as a fraction of the font size, used to
+# truncate cells to their column without measuring every string
+PDF_CHAR_WIDTH = 0.5
+
+# Table style commands shared by every page of every generic PDF export.
+# Kept as plain data (colours by name) so reportlab is only imported to render.
+PDF_TABLE_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), 'grey'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BACKGROUND', (0, 1), (-1, -1), 'beige'),
+    ('TEXTCOLOR', (0, 1), (-1, -1), 'black'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), PDF_FONT_SIZE),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('TOPPADDING', (0, 0), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ('GRID', (0, 0), (-1, -1), 0.5, 'black'),
+]
+
+def _truncate(value, limit):
+    text = '' if value is None else ' '.join(str(value).split())
+    return text if len(text) <= limit else text[:max(limit - 3, 1)] + '...'
+
+def _pages(rows, size):
+    page = []
+    for row in rows:
+        page.append(row)
+        if len(page) == size:
+            yield page
+            page = []
+    if page:
+        yield page
+
+def _counted(rows, format):
+    # Count the rows of an export in the metrics once they have all been read
+    count = 0
+    for count, row in enumerate(rows, start=1):
+        yield row
+    EXPORT_ROWS.inc(count, format=format)
+
+def pdf_rows(data, fields, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the values of fields for each item of data (a queryset or any iterable of objects)."""
+    if isinstance(data, QuerySet):
+        yield from iter_rows(data, fields, chunk_size)
+        return
+    for item in data:
         row = []
         for field in fields:
-            if '__' in field:  # Handle related fields
-                related_fields = field.split('__')
-                value = obj
-                for f in related_fields:
-                    value = getattr(value, f, '')
-                row.append(str(value) if value is not None else '')
-            else:
-                value = getattr(obj, field, '')
-                row.append(str(value) if value is not None else '')
-        writer.writerow(row)
-    
-    return response
+            value = item
+            for name in field.split('__'):
+                value = getattr(value, name, '')
+            row.append(value)
+        yield row
+
+def write_pdf_pages(output, rows, header, title, col_widths=None, style=PDF_TABLE_STYLE,
+                    rows_per_page=PDF_ROWS_PER_PAGE, footer='', progress=None, workers=None):
+    """
+    Draw rows into output as a PDF, one table of rows_per_page rows per page
+    with the header repeated on each, and page numbers in the footer.
+
+    style is a list of TableStyle commands. col_widths defaults to the page
+    width split evenly between the columns; cells longer than their column are truncated. progress, if given, is
+    called with the number of rows drawn as pages are finished. With more
+    than one worker (default PDF_EXPORT_WORKERS) exports longer than one
+    part are rendered in parallel; see _write_pdf_parts().
+    """
+    options = {'col_widths': col_widths, 'style': style, 'rows_per_page': rows_per_page, 'footer': footer}
+    rows = _counted(rows, 'pdf')
+    workers = settings.PDF_EXPORT_WORKERS if workers is None else workers
+    if workers > 1:
+        _write_pdf_parts(output, rows, header, title, workers, progress, options)
+    else:
+        _render_pdf(output, rows, header, title, progress=progress, **options)
+
+def _render_pdf(output, rows, header, title, col_widths, style, rows_per_page, footer,
+                first_page=1, progress=None):
+    page_width, page_height = PDF_PAGE_SIZE
+    usable_width = page_width - 2 * PDF_MARGIN
+    if col_widths is None:
+        col_widths = [usable_width / len(header)] * len(header)
+    limits = [max(int(width / (PDF_FONT_SIZE * PDF_CHAR_WIDTH)), 4) for width in col_widths]
+    header = [_truncate(name, limit) for name, limit in zip(header, limits)]
+    # One TableStyle for the whole document, applied to every page's table
+    style = lazy.platypus.TableStyle(style)
+
+    canvas = lazy.canvas.Canvas(output, pagesize=PDF_PAGE_SIZE, pageCompression=1)
+    canvas.setTitle(title)
+    written = 0
+    for number, page in enumerate(_pages(rows, rows_per_page), start=first_page):
+        _draw_page(canvas, number, title, header, page, limits, col_widths, style, footer)
+        written += len(page)
+        if progress is not None:
+            progress(written)
+    if not written:
+        _draw_page(canvas, first_page, title, header, [], limits, col_widths, style, footer)
+    canvas.save()
+
+def _render_pdf_part(rows, header, title, first_page, options):
+    # Runs in a worker process: render one part and hand back its bytes
+    output = io.BytesIO()
+    _render_pdf(output, rows, header, title, first_page=first_page, **options)
+    return output.getvalue()
+
+def _write_pdf_parts(output, rows, header, title, workers, progress, options):
+    """
+    Split rows into parts of PDF_PAGES_PER_PART pages, render the parts in a
+    pool of worker processes and concatenate them in order.
+
+    Parts start on a page boundary and are told their first page number, so
+    the merged document is numbered and laid out exactly like a serial
+    render. Rows are read in the calling process; at most two parts per
+    worker are queued at a time, which bounds the rows held in memory.
+    """
+    parts = _pages(rows, options['rows_per_page'] * PDF_PAGES_PER_PART)
+    first, second = next(parts, []), next(parts, None)
+    if second is None:
+        # A single part is not worth starting a pool for
+        _render_pdf(output, first, header, title, progress=progress, **options)
+        return
+
+    writer = lazy.pypdf.PdfWriter()
+    pending = deque()
+    written = 0
+
+    def merge_next():
+        nonlocal written
+        size, future = pending.popleft()
+        writer.append(lazy.pypdf.PdfReader(io.BytesIO(future.result())))
+        written += size
+        if progress is not None:
+            progress(written)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for index, part in enumerate(itertools.chain([first, second], parts)):
+            first_page = index * PDF_PAGES_PER_PART + 1
+            pending.append((len(part), pool.submit(_render_pdf_part, part, header, title, first_page, options)))
+            if len(pending) >= 2 * workers:
+                merge_next()
+        while pending:
+            merge_next()
+
+    writer.add_metadata({'/Title': title})
+    writer.write(output)
+
+def _draw_page(canvas, number, title, header, page, limits, col_widths, style, footer):
+    page_width, page_height = PDF_PAGE_SIZE
+    top = page_height - PDF_MARGIN
+    if number == 1:
+        canvas.setFont('Helvetica-Bold', 16)
+        canvas.drawCentredString(page_width / 2, top - 16, title)
+        top -= 40
+
+    table = lazy.platypus.Table(
+        [header] + [[_truncate(value, limit) for value, limit in zip(row, limits)] for row in page],
+        colWidths=col_widths,
+        rowHeights=[PDF_HEADER_HEIGHT] + [PDF_ROW_HEIGHT] * len(page),
+    )
+    table.setStyle(style)
+    _, height = table.wrapOn(canvas, sum(col_widths), top - PDF_MARGIN)
+    table.drawOn(canvas, PDF_MARGIN, top - height)
+
+    canvas.setFont('Helvetica', 8)
+    canvas.setFillColor('grey')
+    if footer:
+        canvas.drawString(PDF_MARGIN, PDF_MARGIN / 2, footer)
+    canvas.drawRightString(page_width - PDF_MARGIN, PDF_MARGIN / 2, f'Page {number}')
+    canvas.showPage()
 
-def export_to_pdf(model_name, data, fields, title):
+def pdf_response(filename, render):
+    """
+    Return a FileResponse streaming the PDF that render(output) writes.
+
+    The PDF is spooled to a temporary file rather than held in memory; the
+    response closes (and so deletes) it once sent.
+    """
+    output = tempfile.TemporaryFile()
+    try:
+        render(output)
+    except Exception:
+        output.close()
+        raise
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=filename, content_type='application/pdf')
+
+def export_to_pdf(model_name, data, fields, title, workers=None):
     """
     Generic function to export data to PDF
     """
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = f'attachment; filename=\"{model_name}_{datetime.now().strftime("%Y%m%d")}.pdf"'
-    
-    doc = SimpleDocTemplate(response, pagesize=letter)
-    elements = []
-    
-    # Add title
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        alignment=TA_CENTER,
-        spaceAfter=30
+    return pdf_response(
+        f'{model_name}_{datetime.now().strftime("%Y%m%d")}.pdf',
+        lambda output: write_pdf(output, data, fields, title, workers=workers),
     )
-    elements.append(Paragraph(title, title_style))
-    
-    # Prepare data for table
-    table_data = [fields]
-    for item in data:
-        row = []
-        for field in fields:
-            if '__' in field:  # Handle related fields
-                related_fields = field.split('__')
-                value = item
-                for f in related_fields:
-                    value = getattr(value, f, '')
-                row.append(str(value) if value is not None else '')
+
+def write_pdf(output, data, fields, title, progress=None, workers=None):
+    """
+    Render data as a PDF table into output (any writable file-like object)
+    """
+    write_pdf_pages(output, pdf_rows(data, fields), fields, title, progress=progress, workers=workers)
+
+class ImportResult:
+    """
+    Outcome of a CSV import: how many rows were created or updated, and which
+    rows were rejected (as (line_number, error) pairs).
+
+    While the import runs, rows_read, batches and bytes_read (out of
+    total_bytes, when the upload size is known) report its progress.
+    """
+
+    def __init__(self, total_bytes=None):
+        self.created = 0
+        self.updated = 0
+        self.rejected = []
+        self.error = None
+        self.rows_read = 0
+        self.batches = 0
+        self.bytes_read = 0
+        self.total_bytes = total_bytes
+
+    def reject(self, line, error):
+        self.rejected.append((line, error))
+
+    def record_metrics(self, model):
+        """Count the rows of the finished import in the erp_import_rows_total metric."""
+        for outcome, rows in (('created', self.created), ('updated', self.updated), ('rejected', len(self.rejected))):
+            if rows:
+                IMPORT_ROWS.inc(rows, model=model._meta.label, result=outcome)
+
+    def advance(self, rows, bytes_read=None, progress=None):
+        """Record a processed batch and notify the progress callback, if any."""
+        self.rows_read += rows
+        self.batches += 1
+        if bytes_read is not None:
+            self.bytes_read = bytes_read
+        if progress is not None:
+            progress(self)
+
+    @property
+    def success(self):
+        return self.error is None
+
+    @property
+    def message(self):
+        if self.error is not None:
+            return f"Error during import: {self.error}"
+        message = f"Successfully imported {self.created} new records and updated {self.updated} records."
+        if self.rejected:
+            preview = '; '.join(f"line {line}: {error}" for line, error in self.rejected[:5])
+            if len(self.rejected) > 5:
+                preview += '; ...'
+            message += f" Rejected {len(self.rejected)} rows ({preview})."
+        return message
+
+class ForeignKeyResolver:
+    """
+    Resolves the CSV values of one foreign key column to parent primary keys.
+
+    A value may be the parent's id or, when natural_key is given, the value of
+    that field (e.g. Ledger.name or Customer.email). Unknown values are looked
+    up with one query per batch and the answers are kept in a bounded LRU, so
+    repeated parents across batches cost nothing after the first lookup.
+    """
+
+    def __init__(self, field, natural_key=None, cache_size=None):
+        self.field = field
+        self.model = field.related_model
+        self.natural_key = natural_key
+        self.cache_size = cache_size or settings.IMPORT_FK_CACHE_SIZE
+        self.cache = OrderedDict()
+
+    def _lookup(self, values):
+        """Fetch the pks for values not in the cache with a single query."""
+        target = self.field.target_field
+        ids = {}
+        for value in values:
+            try:
+                ids[target.to_python(value)] = value
+            except ValidationError:
+                pass
+
+        condition = Q(**{f'{target.attname}__in': ids.keys()})
+        fields = [target.attname]
+        if self.natural_key:
+            condition |= Q(**{f'{self.natural_key}__in': values})
+            fields.append(self.natural_key)
+
+        found = dict.fromkeys(values)
+        matches = self.model._default_manager.filter(condition).order_by('pk').values_list(*fields)
+        for match in matches:
+            if match[0] in ids:
+                found[ids[match[0]]] = match[0]
+            # Ids win over natural keys; for duplicate natural keys the oldest row wins
+            if self.natural_key and match[1] in found and found[match[1]] is None:
+                found[match[1]] = match[0]
+        return found
+
+    def resolve(self, values):
+        """Return a dict mapping each raw value to a pk, or None when unknown."""
+        resolved = {}
+        missing = []
+        for value in set(values):
+            if value in self.cache:
+                self.cache.move_to_end(value)
+                resolved[value] = self.cache[value]
             else:
-                value = getattr(item, field, '')
-                row.append(str(value) if value is not None else '')
-        table_data.append(row)
-    
-    # Create table
-    table = Table(table_data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 8),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
-    
-    elements.append(table)
-    doc.build(elements)
-    return response
+                missing.append(value)
+
+        if missing:
+            for value, pk in self._lookup(missing).items():
+                resolved[value] = pk
+                self.cache[value] = pk
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return resolved
 
-def import_from_csv(model, file, field_mapping):
+def _format_validation_error(error):
+    if hasattr(error, 'message_dict'):
+        return '; '.join(f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items())
+    return ' '.join(error.messages)
+
+def _tell(file):
+    try:
+        return file.tell()
+    except (AttributeError, OSError, ValueError):
+        return None
+
+def read_csv_batches(file, batch_size):
+    """
+    Lazily read an uploaded CSV file as lists of (line_number, row) dicts.
+
+    Only one batch is held in memory at a time, however large the upload.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8'))
+    batch = []
+    for row in reader:
+        batch.append((reader.line_num, row))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _parse_batch(model, batch, field_mapping, result):
+    """
+    Map CSV columns onto model fields and convert the primary key. Foreign
+    key values are left as stripped strings for the resolvers. Returns a list
+    of (line, pk, data) for the rows that parsed.
+    """
+    pk_field = model._meta.pk
+    parsed = []
+    for line, row in batch:
+        data = {}
+        for csv_field, model_field in field_mapping.items():
+            if csv_field in row:
+                data[model_field] = row[csv_field]
+        try:
+            pk = pk_field.to_python(data.pop('id', None) or None)
+        except ValidationError as e:
+            result.reject(line, _format_validation_error(e))
+            continue
+        for name, value in data.items():
+            if model._meta.get_field(name).is_relation:
+                data[name] = (value or '').strip() or None
+        parsed.append((line, pk, data))
+    return parsed
+
+def _resolve_foreign_keys(parsed, resolvers, result):
+    """Swap foreign key values for pks, rejecting rows that reference missing parents."""
+    for name, resolver in resolvers.items():
+        values = {data[name] for _, _, data in parsed if data.get(name) is not None}
+        resolved = resolver.resolve(values) if values else {}
+        valid = []
+        for line, pk, data in parsed:
+            if name not in data:
+                valid.append((line, pk, data))
+                continue
+            value = data[name]
+            if value is None and not resolver.field.null:
+                result.reject(line, f"{name}: This field cannot be null.")
+            elif value is not None and resolved[value] is None:
+                result.reject(line, f"{name}: {resolver.model._meta.verbose_name} '{value}' does not exist.")
+            else:
+                data[name] = resolved.get(value)
+                valid.append((line, pk, data))
+        parsed = valid
+    return parsed
+
+def _import_batch(model, batch, field_mapping, result, batch_size, resolvers):
+    parsed = _resolve_foreign_keys(_parse_batch(model, batch, field_mapping, result), resolvers, result)
+
+    # One id__in lookup decides which rows are updates and which are inserts
+    ids = {pk for _, pk, _ in parsed if pk is not None}
+    existing = model._default_manager.in_bulk(ids) if ids else {}
+
+    relations = {f.name for f in model._meta.fields if f.is_relation}
+    to_create = {}
+    to_update = {}
+    previous = {}
+    update_fields = set()
+    for line, pk, data in parsed:
+        if pk in existing:
+            instance = existing[pk]
+            previous.setdefault(pk, copy.copy(instance))
+            exclude = [f.name for f in model._meta.fields if f.name not in data or f.name in relations]
+        else:
+            instance = to_create.get(pk) if pk is not None else None
+            if instance is None:
+                instance = model(pk=pk)
+            exclude = [name for name in relations if name in data]
+        for name, value in data.items():
+            setattr(instance, model._meta.get_field(name).attname, value)
+        try:
+            instance.full_clean(exclude=exclude, validate_unique=False)
+        except ValidationError as e:
+            result.reject(line, _format_validation_error(e))
+            continue
+        if pk in existing:
+            to_update[pk] = instance
+            update_fields.update(data)
+        else:
+            to_create[pk if pk is not None else id(instance)] = instance
+
+    if to_create:
+        model._default_manager.bulk_create(to_create.values(), batch_size=batch_size)
+        result.created += len(to_create)
+    if to_update:
+        model._default_manager.bulk_update(to_update.values(), sorted(update_fields), batch_size=batch_size)
+        result.updated += len(to_update)
+    if to_create or to_update:
+        rows_imported.send(
+            sender=model,
+            created=list(to_create.values()),
+            updated=list(to_update.values()),
+            previous={pk: previous[pk] for pk in to_update},
+        )
+
+def import_from_csv(model, file, field_mapping, batch_size=None, natural_keys=None, progress=None):
     """
     Generic function to import data from CSV
+
+    Rows are validated into model instances and written in batches of
+    batch_size with bulk_create/bulk_update. The whole import runs in one
+    transaction, so a database error leaves no partial results behind.
+    natural_keys maps foreign key fields to a parent field that may be used
+    instead of the id, e.g. {'ledger': 'name'}. progress, if given, is
+    called with the ImportResult after every batch. Returns an ImportResult.
     """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    natural_keys = natural_keys or {}
+    resolvers = {
+        name: ForeignKeyResolver(model._meta.get_field(name), natural_keys.get(name))
+        for name in field_mapping.values()
+        if name != 'id' and model._meta.get_field(name).is_relation
+    }
+    result = ImportResult(total_bytes=getattr(file, 'size', None))
     try:
-        # Read the CSV file
-        csv_file = io.TextIOWrapper(file, encoding='utf-8')
-        reader = csv.DictReader(csv_file)
-        
-        # Process each row
-        created_count = 0
-        updated_count = 0
-        
-        for row in reader:
-            # Map CSV columns to model fields
-            data = {}
-            for csv_field, model_field in field_mapping.items():
-                if csv_field in row:
-                    data[model_field] = row[csv_field]
-            
-            # Create or update the object
-            if 'id' in data and data['id']:
-                # Update existing object
-                obj, created = model.objects.update_or_create(
-                    id=data['id'],
-                    defaults=data
-                )
-                if not created:
-                    updated_count += 1
-            else:
-                # Create new object
-                model.objects.create(**data)
-                created_count += 1
-        
-        return True, f"Successfully imported {created_count} new records and updated {updated_count} records."
+        with transaction.atomic():
+            for batch in read_csv_batches(file, batch_size):
+                _import_batch(model, batch, field_mapping, result, batch_size, resolvers)
+                result.advance(len(batch), _tell(file), progress)
     except Exception as e:
-        return False, f"Error during import: {str(e)}"
+        result.created = result.updated = 0
+        result.error = str(e)
+    result.record_metrics(model)
+    return result
@@ -0,0 +1,74 @@
+"""
+Registry of the queries on the hot filter and sort paths.
+
+Each entry builds the queryset the application runs, with representative
+parameters. `manage.py explain_hot_queries` runs EXPLAIN on every one of them
+and fails when a plan falls back to a sequential scan, so a missing or
+unusable index is caught before it reaches production.
+"""
+import re
+from datetime import timedelta
+from django.utils import timezone
+from accounting.models import LedgerBalance, Transaction
+from hr.models import Attendance, Leave
+from inventory.models import PurchaseOrder
+from sales.models import Invoice, Order
+
+HOT_QUERIES = {}
+
+def hot_query(name):
+    """Register a function returning the queryset for a hot query."""
+    def decorator(func):
+        HOT_QUERIES[name] = func
+        return func
+    return decorator
+
+# Lines of EXPLAIN output that read a whole table, per database vendor
+SEQUENTIAL_SCAN_PATTERNS = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (\w+)$', re.MULTILINE),
+}
+
+def sequential_scans(plan, vendor):
+    """Return the tables an EXPLAIN plan reads sequentially."""
+    return SEQUENTIAL_SCAN_PATTERNS[vendor].findall(plan)
+
+def _recent(days=30):
+    return timezone.localdate() - timedelta(days=days)
+
+@hot_query('accounting.transactions_by_type')
+def transactions_by_type():
+    return Transaction.objects.filter(transaction_type='expense', date__range=[_recent(), timezone.localdate()])
+
+@hot_query('accounting.statement_edges')
+def statement_edges():
+    return Transaction.objects.filter(date__range=[_recent(10), timezone.localdate()]).values('ledger_id')
+
+@hot_query('accounting.ledger_balances')
+def ledger_balances():
+    return LedgerBalance.objects.filter(period__gte=_recent(365).replace(day=1))
+
+@hot_query('sales.orders_by_status')
+def orders_by_status():
+    return Order.objects.filter(status='pending', order_date__gte=_recent())
+
+@hot_query('sales.open_invoices')
+def open_invoices():
+    return Invoice.objects.filter(status__in=['unpaid', 'overdue'], invoice_date__lte=_recent())
+
+@hot_query('inventory.purchase_orders_by_status')
+def purchase_orders_by_status():
+    return PurchaseOrder.objects.filter(status='pending', order_date__gte=_recent())
+
+@hot_query('hr.employee_attendance')
+def employee_attendance():
+    return Attendance.objects.filter(employee_id=1, date__range=[_recent(), timezone.localdate()])
+
+@hot_query('hr.absences')
+def absences():
+    return Attendance.objects.filter(status='Absent', date__gte=_recent())
+
+@hot_query('hr.employee_leave_overlap')
+def employee_leave_overlap():
+    today = timezone.localdate()
+    return Leave.objects.filter(employee_id=1, start_date__lte=today, end_date__gte=today)
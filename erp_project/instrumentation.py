@@ -0,0 +1,155 @@
+"""
+Per-request timing and query instrumentation.
+
+InstrumentationMiddleware measures every request: wall time, the number and
+total time of database queries (through connection.execute_wrapper),
+template render time (through the DjangoTemplates backend below) and the
+response size. Requests slower than REQUEST_SLOW_MS, issuing more than
+REQUEST_SLOW_QUERIES queries, or repeating one statement more than
+REQUEST_REPEATED_QUERIES times are logged as warnings to
+`erp_project.requests` with their most repeated SQL, which is how N+1
+patterns show up. Every response carries X-Request-ID and a Server-Timing
+header, and the duration and query count are recorded per URL name in the
+erp_project.metrics histograms.
+
+Streaming responses (CSV exports) are measured up to the point their body
+starts streaming; the queries run while streaming are not counted.
+"""
+import logging
+import re
+import time
+import uuid
+from collections import Counter
+from contextlib import ExitStack
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateDoesNotExist
+from django.template.backends import django as django_backend
+from erp_project.metrics import REQUEST_DURATION, REQUEST_QUERIES
+
+logger = logging.getLogger('erp_project.requests')
+
+# Stats of the request being handled by this thread or task, if any
+current_request = ContextVar('current_request', default=None)
+
+# Placeholder lists of any length count as the same statement
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+
+class RequestStats:
+    """Timings of one request; also the execute_wrapper that counts its queries."""
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+        self.started = time.perf_counter()
+        self.wall_time = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = 0
+        self.statements = Counter()
+        self.size = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+            self.statements[_IN_LIST.sub('IN (...)', sql)] += 1
+
+    def finish(self, response):
+        self.wall_time = time.perf_counter() - self.started
+        if not response.streaming:
+            self.size = len(response.content)
+        elif response.has_header('Content-Length'):
+            self.size = int(response['Content-Length'])
+
+    def repeated(self, limit=3):
+        """Return the most repeated statements as (count, sql), most frequent first."""
+        return [(count, sql) for sql, count in self.statements.most_common(limit) if count > 1]
+
+    def is_slow(self):
+        return (
+            self.wall_time * 1000 > settings.REQUEST_SLOW_MS
+            or self.queries > settings.REQUEST_SLOW_QUERIES
+            or any(count > settings.REQUEST_REPEATED_QUERIES for count, _ in self.repeated(1))
+        )
+
+    def server_timing(self):
+        return (f'db;desc="{self.queries} queries";dur={self.db_time * 1000:.1f}, '
+                f'tpl;dur={self.template_time * 1000:.1f}, total;dur={self.wall_time * 1000:.1f}')
+
+class InstrumentationMiddleware:
+    """Measure each request and log the slow or chatty ones; see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = RequestStats(request.headers.get('X-Request-ID') or uuid.uuid4().hex)
+        token = current_request.set(stats)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(stats))
+                response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+        stats.finish(response)
+        view = request.resolver_match.view_name if request.resolver_match else '<unmatched>'
+        REQUEST_DURATION.observe(stats.wall_time, view=view)
+        REQUEST_QUERIES.observe(stats.queries, view=view)
+        response['X-Request-ID'] = stats.request_id
+        response['Server-Timing'] = stats.server_timing()
+        self.log(request, response, stats)
+        return response
+
+    def log(self, request, response, stats):
+        slow = stats.is_slow()
+        if not slow and not logger.isEnabledFor(logging.DEBUG):
+            return
+        message = (
+            f'{request.method} {request.path} {response.status_code} {stats.wall_time * 1000:.0f}ms '
+            f'db={stats.queries}q/{stats.db_time * 1000:.0f}ms tpl={stats.template_time * 1000:.0f}ms '
+            f'size={stats.size if stats.size is not None else "-"} id={stats.request_id}'
+        )
+        if slow:
+            message += ''.join(f'\n  {count}x {sql[:300]}' for count, sql in stats.repeated())
+        logger.log(logging.WARNING if slow else logging.DEBUG, message, extra={
+            'request_id': stats.request_id,
+            'duration_ms': round(stats.wall_time * 1000, 1),
+            'queries': stats.queries,
+        })
+
+class Template(django_backend.Template):
+    """Template that adds its render time to the current request's stats."""
+
+    def render(self, context=None, request=None):
+        stats = current_request.get()
+        if stats is None:
+            return super().render(context, request)
+        # Templates rendered while rendering (render_to_string in a tag) are
+        # already inside the outer measurement
+        stats.rendering += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            stats.rendering -= 1
+            if not stats.rendering:
+                stats.template_time += time.perf_counter() - started
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """The Django template backend, returning timed templates."""
+
+    def from_string(self, template_code):
+        return Template(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return Template(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
@@ -0,0 +1,27 @@
+"""
+Deferred imports of the heavy export/import dependencies.
+
+pandas, reportlab and pypdf are only used by the export and import endpoints
+but take a noticeable share of a worker's start-up time and memory. The names
+below stand in for those modules and import the real one on first attribute
+access, so a worker that never exports or imports never loads them.
+"""
+import importlib
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        # importlib caches the module in sys.modules, so later lookups are cheap
+        return getattr(importlib.import_module(self._name), attr)
+
+    def __repr__(self):
+        return f'<LazyModule {self._name!r}>'
+
+pandas = LazyModule('pandas')
+canvas = LazyModule('reportlab.pdfgen.canvas')
+platypus = LazyModule('reportlab.platypus')
+pypdf = LazyModule('pypdf')
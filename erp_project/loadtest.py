@@ -0,0 +1,108 @@
+"""
+Load-test harness for comparing server profiles.
+
+run() drives a running server with a number of concurrent clients for a fixed
+time, each repeatedly fetching one of the weighted LOADTEST_PATHS, and
+summarize() turns the timings into throughput and latency percentiles per
+path. `manage.py loadtest` wraps both; start the server separately (e.g.
+`gunicorn -c gunicorn.conf.py erp_project.wsgi`) against a seeded database.
+
+Requests carry the X-Forwarded-Proto header of the TLS proxy in front of
+production, so a server with DEBUG off serves them instead of redirecting
+each one to https (SECURE_SSL_REDIRECT). Redirects are counted as errors:
+timing them says nothing about the page.
+"""
+import http.client
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+from django.urls import reverse
+
+# (url name, args, weight): lists and dashboards dominate real traffic
+LOADTEST_PATHS = [
+    ('sales:dashboard', [], 5),
+    ('accounting:dashboard', [], 5),
+    ('sales:customers_list', [], 5),
+    ('sales:orders_list', [], 5),
+    ('sales:invoices_list', [], 5),
+    ('inventory:products_list', [], 5),
+    ('accounting:transactions_list', [], 5),
+    ('hr:attendance_list', [], 5),
+    ('accounting:report_generate', ['trial_balance'], 2),
+    ('sales:export_invoices', ['csv'], 1),
+    ('accounting:export_transactions', ['pdf'], 1),
+]
+
+# Sent with every request, as the proxy in front of production does
+HEADERS = {'X-Forwarded-Proto': 'https'}
+
+def default_paths():
+    """Return {path: weight} for LOADTEST_PATHS."""
+    return {reverse(name, args=args): weight for name, args, weight in LOADTEST_PATHS}
+
+def _client(base_url, paths, weights, deadline, seed, timeout):
+    url = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if url.scheme == 'https' else http.client.HTTPConnection
+    connection = connection_class(url.hostname, url.port, timeout=timeout)
+    prefix = url.path.rstrip('/')
+    rng = random.Random(seed)
+    results = []
+    while time.monotonic() < deadline:
+        path = rng.choices(paths, weights)[0]
+        started = time.perf_counter()
+        try:
+            connection.request('GET', prefix + path, headers=HEADERS)
+            response = connection.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            status = None
+            connection.close()
+        results.append((path, status, time.perf_counter() - started))
+    connection.close()
+    return results
+
+def run(base_url, paths=None, concurrency=8, duration=30, seed=0, timeout=60):
+    """
+    Fetch paths ({path: weight}, default default_paths()) from base_url with
+    concurrency clients for duration seconds. Returns a list of
+    (path, status, seconds) tuples; status is None for connection errors.
+    """
+    paths = paths or default_paths()
+    deadline = time.monotonic() + duration
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [
+            pool.submit(_client, base_url, list(paths), list(paths.values()), deadline, seed + client, timeout)
+            for client in range(concurrency)
+        ]
+        return [result for future in futures for result in future.result()]
+
+def _percentile(ordered, percent):
+    # Nearest-rank percentile of an already sorted list
+    index = max(int(round(percent / 100 * len(ordered))) - 1, 0)
+    return ordered[min(index, len(ordered) - 1)]
+
+def summarize(results, duration):
+    """
+    Return {path: stats} plus a 'total' entry, where stats holds requests,
+    errors (connection failures, 3xx, 4xx and 5xx), redirects (the 3xx among
+    the errors), rps and the p50/p95/p99/max latency in milliseconds.
+    """
+    groups = {}
+    for path, status, seconds in results:
+        groups.setdefault(path, []).append((status, seconds))
+    groups['total'] = [(status, seconds) for _, status, seconds in results]
+
+    summary = {}
+    for path, samples in groups.items():
+        latencies = sorted(seconds * 1000 for _, seconds in samples)
+        summary[path] = {
+            'requests': len(samples),
+            'errors': sum(1 for status, _ in samples if status is None or status >= 300),
+            'redirects': sum(1 for status, _ in samples if status is not None and 300 <= status < 400),
+            'rps': len(samples) / duration if duration else 0,
+            **{f'p{percent}': _percentile(latencies, percent) if latencies else 0 for percent in (50, 95, 99)},
+            'max': latencies[-1] if latencies else 0,
+        }
+    return summary
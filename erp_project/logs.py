@@ -0,0 +1,182 @@
+"""
+Structured, non-blocking logging.
+
+AsyncRotatingFileHandler puts records on a bounded queue and returns; a
+QueueListener thread formats them as JSON lines (JsonFormatter) and writes
+them to a size-rotated file, so a slow disk never stalls a request. When
+the queue is full, records are dropped and counted rather than waited for.
+Several worker processes can share one file: rollover happens under a file
+lock (where fcntl exists), and a process whose file was rotated by another
+reopens it.
+
+RequestContextFilter stamps records with the id of the request being
+served, and SamplingFilter lets a burst of each repeated debug message
+through per interval, then only one in `every`.
+"""
+import json
+import logging
+import os
+import queue
+import time
+import weakref
+try:
+    import fcntl
+except ImportError:  # Windows: a single process writes each file
+    fcntl = None
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from erp_project.instrumentation import current_request
+
+# Attributes every LogRecord has; anything else was passed in `extra`
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+class JsonFormatter(logging.Formatter):
+    """Format a record as one JSON object per line, including its `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'pid': record.process,
+        }
+        entry.update(
+            (key, value) for key, value in vars(record).items()
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_')
+        )
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class RequestContextFilter(logging.Filter):
+    """Add the current request's id to records logged while serving it."""
+
+    def filter(self, record):
+        stats = current_request.get()
+        if stats is not None and not hasattr(record, 'request_id'):
+            record.request_id = stats.request_id
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    Pass the first `burst` records of each debug message (by logger and
+    format string) per `interval` seconds, then one in every `every`,
+    annotated with how many were skipped. Records above `level` always pass.
+    """
+
+    def __init__(self, burst=10, every=100, interval=60, level=logging.DEBUG):
+        super().__init__()
+        self.burst = burst
+        self.every = every
+        self.interval = interval
+        self.level = level
+        self.seen = {}
+
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        # The same record reaches every handler sharing this filter
+        if hasattr(record, '_sampled'):
+            return record._sampled
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        window, count = self.seen.get(key, (now, 0))
+        if now - window >= self.interval:
+            window, count = now, 0
+        count += 1
+        if len(self.seen) > 10000:
+            self.seen.clear()
+        self.seen[key] = (window, count)
+
+        record._sampled = count <= self.burst or (count - self.burst) % self.every == 0
+        if record._sampled and count > self.burst:
+            record.sampled_skipped = self.every - 1
+        return record._sampled
+
+class _SharedRotatingFileHandler(RotatingFileHandler):
+    """RotatingFileHandler that is safe to share between processes."""
+
+    def emit(self, record):
+        if fcntl is None:
+            return self._emit(record)
+        with open(f'{self.baseFilename}.lock', 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._emit(record)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _emit(self, record):
+        if self.stream is not None and self._rotated_elsewhere():
+            self.stream.close()
+            self.stream = None
+        super().emit(record)
+
+    def _rotated_elsewhere(self):
+        try:
+            return os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Wait for room rather than fail when stopping with a full queue
+        self.queue.put(self._sentinel)
+
+_handlers = weakref.WeakSet()
+
+class AsyncRotatingFileHandler(QueueHandler):
+    """Queue records for a background thread that writes them as JSON to a rotating file."""
+
+    def __init__(self, filename, maxBytes=10 * 1024 * 1024, backupCount=5, queueSize=10000):
+        super().__init__(queue.Queue(queueSize))
+        self.queue_size = queueSize
+        self.dropped = 0
+        self.target = _SharedRotatingFileHandler(
+            filename, maxBytes=maxBytes, backupCount=backupCount, encoding='utf-8', delay=True,
+        )
+        self.target.setFormatter(JsonFormatter())
+        self.listener = _Listener(self.queue, self.target)
+        self.listener.start()
+        _handlers.add(self)
+
+    def prepare(self, record):
+        # Only what cannot wait is done here: the message is interpolated now,
+        # while its arguments still hold their current values
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.dropped:
+            record.dropped_records = self.dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.dropped = 0
+
+    def restart(self):
+        """Start a fresh queue and listener thread, e.g. in a forked child."""
+        self.queue = queue.Queue(self.queue_size)
+        self.listener = _Listener(self.queue, self.target)
+        self.listener.start()
+
+    def close(self):
+        _handlers.discard(self)
+        if self.listener._thread is not None:
+            self.listener.stop()
+        self.target.close()
+        super().close()
+
+def _restart_after_fork():
+    # Threads do not survive fork(): a preloaded gunicorn worker would
+    # otherwise queue records that nothing ever writes
+    for handler in list(_handlers):
+        handler.restart()
+
+os.register_at_fork(after_in_child=_restart_after_fork)
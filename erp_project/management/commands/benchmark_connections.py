@@ -0,0 +1,46 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from erp_project.database import benchmark
+from erp_project.loadtest import summarize
+
+LATENCY_FIELDS = ('requests', 'p50', 'p95', 'p99', 'max')
+
+class Command(BaseCommand):
+    help = ('Time simulated requests with the configured connection handling (DB_POOL_MODE) '
+            'against opening a connection per request')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Simulated requests per run')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS,
+                            help='Database alias to benchmark')
+        parser.add_argument('--sql', default='SELECT 1',
+                            help='Statement each request runs')
+        parser.add_argument('--json', action='store_true',
+                            help='Print the summary as JSON, for comparing runs')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError('--requests must be positive')
+        if options['database'] not in connections:
+            raise CommandError(f"Unknown database {options['database']}")
+
+        summary = {}
+        for label, reconnect in ((settings.DB_POOL_MODE, False), ('reconnect', True)):
+            opened, timings = benchmark(options['requests'], options['database'], reconnect, options['sql'])
+            stats = summarize([(label, 200, seconds) for seconds in timings], sum(timings))[label]
+            summary[label] = {'connections': opened, **{key: stats[key] for key in LATENCY_FIELDS}}
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        self.stdout.write(f"{'run':<12} {'reqs':>6} {'conns':>6} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for label, stats in summary.items():
+            self.stdout.write(
+                f"{label:<12} {stats['requests']:>6} {stats['connections']:>6} {stats['p50']:>8.2f} "
+                f"{stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['max']:>8.2f}"
+            )
+        if connections[options['database']].vendor == 'sqlite':
+            self.stderr.write(self.style.WARNING('SQLite connects in-process; benchmark against PostgreSQL'))
@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from erp_project.hot_queries import HOT_QUERIES, SEQUENTIAL_SCAN_PATTERNS, sequential_scans
+
+class Command(BaseCommand):
+    help = 'EXPLAIN every registered hot query and fail if any plan uses a sequential scan'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*',
+                            help='Only explain these hot queries (default: all)')
+        parser.add_argument('--min-rows', type=int, default=10000,
+                            help='Skip queries on tables with fewer rows, where a scan is the right plan; '
+                                 'seed a large dataset first')
+        parser.add_argument('--analyze', action='store_true',
+                            help='Refresh the planner statistics before explaining')
+        parser.add_argument('--verbose-plans', action='store_true',
+                            help='Print every plan, not just the failing ones')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in SEQUENTIAL_SCAN_PATTERNS:
+            raise CommandError(f'EXPLAIN checks are not supported on {vendor}')
+
+        unknown = set(options['names']) - HOT_QUERIES.keys()
+        if unknown:
+            raise CommandError(f"Unknown hot queries: {', '.join(sorted(unknown))}")
+        names = options['names'] or sorted(HOT_QUERIES)
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        failures = []
+        for name in names:
+            queryset = HOT_QUERIES[name]()
+            rows = queryset.model._default_manager.count()
+            if rows < options['min_rows']:
+                self.stdout.write(f'{name}: skipped ({rows} rows in {queryset.model._meta.db_table})')
+                continue
+
+            plan = queryset.explain()
+            scans = sequential_scans(plan, vendor)
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"{name}: sequential scan on {', '.join(scans)}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+            if scans or options['verbose_plans']:
+                self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries use a sequential scan: {', '.join(failures)}")
@@ -0,0 +1,46 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from erp_project.loadtest import default_paths, run, summarize
+
+class Command(BaseCommand):
+    help = 'Drive the list, dashboard and export pages of a running server and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000',
+                            help='Base URL of the server under test')
+        parser.add_argument('--concurrency', type=int, default=8,
+                            help='Number of concurrent clients')
+        parser.add_argument('--duration', type=float, default=30,
+                            help='Seconds to keep sending requests')
+        parser.add_argument('--path', action='append', dest='paths',
+                            help='Request only this path (repeatable; default: the main pages and exports)')
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Seed for the order in which clients pick paths')
+        parser.add_argument('--json', action='store_true',
+                            help='Print the summary as JSON, for comparing runs')
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive')
+        paths = dict.fromkeys(options['paths'], 1) if options['paths'] else default_paths()
+
+        results = run(options['url'], paths, options['concurrency'], options['duration'], options['seed'])
+        summary = summarize(results, options['duration'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        self.stdout.write(f"{'path':<45} {'reqs':>6} {'errs':>5} {'rps':>7} "
+                          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+        for path, stats in summary.items():
+            self.stdout.write(
+                f"{path:<45} {stats['requests']:>6} {stats['errors']:>5} {stats['rps']:>7.1f} "
+                f"{stats['p50']:>8.1f} {stats['p95']:>8.1f} {stats['p99']:>8.1f} {stats['max']:>8.1f}"
+            )
+        if summary['total']['errors']:
+            self.stderr.write(self.style.WARNING(f"{summary['total']['errors']} requests failed"))
+        if summary['total']['redirects']:
+            self.stderr.write(self.style.WARNING(
+                f"{summary['total']['redirects']} of them were redirects; check --url and the server's "
+                'SECURE_SSL_REDIRECT and ALLOWED_HOSTS'
+            ))
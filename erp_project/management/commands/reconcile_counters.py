@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from erp_project.counters import reconcile
+
+class Command(BaseCommand):
+    help = 'Recount the cached dashboard counters and report any drift'
+
+    def handle(self, *args, **options):
+        drift = reconcile()
+        for label, (cached, actual) in sorted(drift.items()):
+            self.stdout.write(self.style.WARNING(f'{label}: cached {cached}, actual {actual}'))
+        self.stdout.write(self.style.SUCCESS(f'Counters reconciled ({len(drift)} had drifted)'))
@@ -0,0 +1,65 @@
+import time
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+from accounting.balances import rebuild_balances
+from accounting.reports import invalidate_reports
+from erp_project import caching, counters
+from erp_project.seeding import DEFAULT_END, SCALE_RATIOS, Seeder
+
+def _count(value):
+    kind, _, number = value.partition('=')
+    if kind not in SCALE_RATIOS or not number.isdigit():
+        raise ValueError(value)
+    return kind, int(number)
+
+def _date(value):
+    day = parse_date(value)
+    if day is None:
+        raise ValueError(value)
+    return day
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic and skewed dataset for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1000,
+                            help='Rows per unit of SCALE_RATIOS (customers = scale, orders = 10 x scale, '
+                                 'transactions = 50 x scale, ...)')
+        parser.add_argument('--count', type=_count, action='append', default=[], metavar='KIND=N',
+                            help=f"Override the row count of one kind ({', '.join(SCALE_RATIOS)})")
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed; the same seed always generates the same data')
+        parser.add_argument('--days', type=int, default=730,
+                            help='Length of the history to spread dates over, ending at --end')
+        parser.add_argument('--end', type=_date, default=DEFAULT_END, metavar='YYYY-MM-DD',
+                            help=f'Last day of the history (default {DEFAULT_END}, so runs are reproducible)')
+        parser.add_argument('--skew', type=float, default=1.1,
+                            help='Zipf exponent for hot customers, suppliers and ledgers (0 = uniform)')
+        parser.add_argument('--seasonality', type=float, default=0.5,
+                            help='Extra weight of year-end and month-end dates (0 = uniform)')
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help='Rows inserted per query')
+
+    def handle(self, *args, **options):
+        counts = {kind: int(options['scale'] * ratio) for kind, ratio in SCALE_RATIOS.items()}
+        counts.update(options['count'])
+        seeder = Seeder(
+            counts, seed=options['seed'], days=options['days'], end=options['end'], skew=options['skew'],
+            seasonality=options['seasonality'], batch_size=options['batch_size'], log=self.stdout.write,
+        )
+        if seeder.already_seeded():
+            raise CommandError(f"This database already holds the data of seed {options['seed']}; "
+                               'use another --seed')
+
+        started = time.monotonic()
+        seeder.run()
+
+        # bulk_create skipped the signals that keep the derived data in step
+        self.stdout.write(f'Rebuilt {rebuild_balances(batch_size=options["batch_size"])} ledger balances')
+        invalidate_reports()
+        for app_label in caching.VERSIONED_APPS:
+            for model in apps.get_app_config(app_label).get_models():
+                caching.invalidate_model(model)
+        counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(f'Seeded in {time.monotonic() - started:.1f}s'))
@@ -0,0 +1,223 @@
+"""
+In-process metrics, aggregated across worker processes.
+
+Counters and histograms are updated in memory and written to a file of their
+own per process (METRICS_DIR/<pid>.json) at most every METRICS_FLUSH_INTERVAL
+seconds and on exit. The /metrics endpoint adds up the files of every process
+together with the live values of the process serving it, and renders them
+in the Prometheus text exposition format, so a scrape sees the whole server
+whichever worker answers it. Values from dead workers are folded into
+archive.json so counters never go backwards: gunicorn's child_exit hook
+calls mark_process_dead for each worker, and every process archives its own
+file on exit, which covers manage.py commands and run_jobs. The directory is
+emptied when the server starts.
+
+Cache hit ratio, for example:
+    sum(rate(erp_cache_requests_total{result="hit"}[5m])) / sum(rate(erp_cache_requests_total[5m]))
+"""
+import atexit
+import json
+import os
+import threading
+import time
+try:
+    import fcntl
+except ImportError:  # Windows: processes archive without locking
+    fcntl = None
+from bisect import bisect_left
+from django.conf import settings
+
+ARCHIVE = 'archive.json'
+ARCHIVE_LOCK = 'archive.lock'
+
+REGISTRY = {}
+
+class _Values:
+    """The values recorded by this process since it started (or forked)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counters = {}
+        self.histograms = {}
+        self.last_flush = time.monotonic()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [[name, list(labels), list(counts), total]
+                               for (name, labels), (counts, total) in self.histograms.items()],
+            }
+
+_values = _Values()
+# A forked worker starts from zero instead of re-reporting its parent's values
+os.register_at_fork(after_in_child=_values.reset)
+
+class Metric:
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        REGISTRY[name] = self
+
+    def _label_values(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name} takes the labels {self.labels}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labels)
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = (self.name, self._label_values(labels))
+        with _values.lock:
+            _values.counters[key] = _values.counters.get(key, 0) + amount
+        _maybe_flush()
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=()):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = (self.name, self._label_values(labels))
+        # One slot per bucket (value <= bound) plus one for +Inf
+        index = bisect_left(self.buckets, value)
+        with _values.lock:
+            counts, total = _values.histograms.get(key) or ([0] * (len(self.buckets) + 1), 0)
+            counts[index] += 1
+            _values.histograms[key] = (counts, total + value)
+        _maybe_flush()
+
+def _directory():
+    os.makedirs(settings.METRICS_DIR, exist_ok=True)
+    return settings.METRICS_DIR
+
+def _write(path, data):
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+def _read(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        # Removed by mark_process_dead() since listing the directory
+        return {'counters': [], 'histograms': []}
+
+def flush():
+    """Write this process's values to its file."""
+    _write(os.path.join(_directory(), f'{os.getpid()}.json'), _values.snapshot())
+    _values.last_flush = time.monotonic()
+
+def _maybe_flush():
+    if time.monotonic() - _values.last_flush >= settings.METRICS_FLUSH_INTERVAL:
+        flush()
+
+@atexit.register
+def _archive_at_exit():
+    if _values.counters or _values.histograms:
+        flush()
+        mark_process_dead(os.getpid())
+
+def _merge(into, data):
+    for name, labels, value in data['counters']:
+        key = (name, tuple(labels))
+        into['counters'][key] = into['counters'].get(key, 0) + value
+    for name, labels, counts, total in data['histograms']:
+        key = (name, tuple(labels))
+        merged, merged_total = into['histograms'].get(key) or ([0] * len(counts), 0)
+        into['histograms'][key] = ([a + b for a, b in zip(merged, counts)], merged_total + total)
+
+def collect():
+    """Return {'counters': {...}, 'histograms': {...}} summed over every process."""
+    merged = {'counters': {}, 'histograms': {}}
+    directory = _directory()
+    own = f'{os.getpid()}.json'
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.json') and filename != own:
+            _merge(merged, _read(os.path.join(directory, filename)))
+    _merge(merged, _values.snapshot())
+    return merged
+
+def mark_process_dead(pid):
+    """Fold the values of a finished process into the archive and remove its file."""
+    directory = _directory()
+    path = os.path.join(directory, f'{pid}.json')
+    # Processes exiting together would otherwise overwrite each other's archive
+    with open(os.path.join(directory, ARCHIVE_LOCK), 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(path):
+            return
+        archive = {'counters': {}, 'histograms': {}}
+        _merge(archive, _read(os.path.join(directory, ARCHIVE)))
+        _merge(archive, _read(path))
+        _write(os.path.join(directory, ARCHIVE), {
+            'counters': [[name, list(labels), value] for (name, labels), value in archive['counters'].items()],
+            'histograms': [[name, list(labels), counts, total]
+                           for (name, labels), (counts, total) in archive['histograms'].items()],
+        })
+        os.remove(path)
+
+def reset_directory():
+    """Remove every process file; called once when the server starts."""
+    directory = _directory()
+    for filename in os.listdir(directory):
+        if filename.endswith('.json') or filename.endswith('.tmp'):
+            os.remove(os.path.join(directory, filename))
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render():
+    """Return every registered metric in the Prometheus text format."""
+    data = collect()
+    lines = []
+    for name, metric in sorted(REGISTRY.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.type}')
+        if metric.type == 'counter':
+            for (key, labels), value in sorted(data['counters'].items()):
+                if key == name:
+                    lines.append(f'{name}{_labels(metric.labels, labels)} {_number(value)}')
+            continue
+        for (key, labels), (counts, total) in sorted(data['histograms'].items()):
+            if key != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(metric.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else _number(bound)
+                lines.append(f'{name}_bucket{_labels(metric.labels, labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(metric.labels, labels)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(metric.labels, labels)} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+REQUEST_DURATION = Histogram(
+    'erp_request_duration_seconds', 'Time to produce a response, by URL name.', ['view'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+REQUEST_QUERIES = Histogram(
+    'erp_request_queries', 'Database queries per request, by URL name.', ['view'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+EXPORT_ROWS = Counter('erp_export_rows_total', 'Rows written by exports.', ['format'])
+IMPORT_ROWS = Counter('erp_import_rows_total', 'Rows processed by imports.', ['model', 'result'])
+CACHE_REQUESTS = Counter('erp_cache_requests_total', 'Cache lookups, by cache and result.', ['cache', 'result'])
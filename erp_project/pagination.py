@@ -0,0 +1,203 @@
+"""
+Keyset (seek) pagination for the list views.
+
+Pages are addressed by a cursor holding the sort values of the row at the
+edge of the current page, so fetching any page is an index range scan of
+page_size + 1 rows: no COUNT(*) and no OFFSET, however large the table.
+"""
+import base64
+import json
+from datetime import date, datetime
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.functional import cached_property
+from django.utils.http import urlencode
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 200
+
+# Sorts offered by models with a created_at column; each ordering ends with
+# 'id' so rows sharing a timestamp still have a strict order.
+CREATED_AT_SORTS = {
+    'newest': ('-created_at', '-id'),
+    'oldest': ('created_at', 'id'),
+}
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return ['datetime', value.isoformat()]
+    if isinstance(value, date):
+        return ['date', value.isoformat()]
+    return ['value', value if isinstance(value, (int, float, str)) or value is None else str(value)]
+
+def _decode_value(item):
+    kind, value = item
+    if kind == 'datetime':
+        return parse_datetime(value)
+    if kind == 'date':
+        return parse_date(value)
+    return value
+
+def encode_cursor(values):
+    data = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, length):
+    """Return the list of sort values in cursor, or None if it is malformed."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = [_decode_value(item) for item in json.loads(data)]
+    except (ValueError, TypeError):
+        return None
+    return values if len(values) == length else None
+
+def clean_cursor(values, model, ordering):
+    """
+    Return the cursor values converted to the types of the ordering's fields
+    of model, or None if any of them is missing or does not fit its field.
+    """
+    if values is None:
+        return None
+    cleaned = []
+    for name, value in zip(ordering, values):
+        name = name.lstrip('-')
+        field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+        try:
+            value = field.to_python(value)
+        except (ValidationError, ValueError, TypeError):
+            return None
+        if value is None:
+            return None
+        cleaned.append(value)
+    return cleaned
+
+def _seek(ordering, values):
+    """
+    Build the filter selecting rows after values in the given ordering, i.e.
+    (a > x) OR (a = x AND b > y) ... with the comparison flipped for
+    descending fields.
+    """
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        condition |= equal & Q(**{f'{name}__{lookup}': value})
+        equal &= Q(**{name: value})
+    return condition
+
+def _reverse(ordering):
+    return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated queryset.
+
+    The page is evaluated lazily, the first time it is iterated or asked for
+    its links, and it can be used in templates wherever the plain queryset
+    was used before.
+    """
+
+    def __init__(self, queryset, ordering, page_size, sort, after=None, before=None):
+        self.queryset = queryset
+        self.ordering = ordering
+        self.page_size = page_size
+        self.sort = sort
+        self.after = after
+        self.before = before
+
+    @cached_property
+    def _rows(self):
+        if self.before is not None:
+            queryset = self.queryset.order_by(*_reverse(self.ordering)).filter(
+                _seek(_reverse(self.ordering), self.before)
+            )
+        else:
+            queryset = self.queryset.order_by(*self.ordering)
+            if self.after is not None:
+                queryset = queryset.filter(_seek(self.ordering, self.after))
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.before is not None:
+            rows.reverse()
+        return rows, has_more
+
+    @property
+    def object_list(self):
+        return self._rows[0]
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def __contains__(self, item):
+        return item in self.object_list
+
+    @property
+    def has_next(self):
+        return self.before is not None or self._rows[1]
+
+    @property
+    def has_previous(self):
+        if self.before is not None:
+            return self._rows[1]
+        return self.after is not None
+
+    def _cursor(self, row):
+        return encode_cursor([getattr(row, field.lstrip('-')) for field in self.ordering])
+
+    def _query(self, **params):
+        return urlencode({'sort': self.sort, 'size': self.page_size, **params})
+
+    @property
+    def next_query(self):
+        if not self.has_next or not self.object_list:
+            return None
+        return self._query(after=self._cursor(self.object_list[-1]))
+
+    @property
+    def previous_query(self):
+        if not self.has_previous or not self.object_list:
+            return None
+        return self._query(before=self._cursor(self.object_list[0]))
+
+    @property
+    def first_query(self):
+        return self._query()
+
+def paginate(request, queryset, sorts=CREATED_AT_SORTS, default_sort=None, page_size=DEFAULT_PAGE_SIZE):
+    """
+    Return the KeysetPage of queryset selected by the request's query string.
+
+    sorts maps the names accepted in ?sort= to orderings; only offer
+    orderings backed by an index. ?size= picks the page size (capped at
+    MAX_PAGE_SIZE) and ?after=/?before= carry the cursor.
+    """
+    sort = request.GET.get('sort')
+    if sort not in sorts:
+        sort = default_sort or next(iter(sorts))
+    ordering = sorts[sort]
+
+    try:
+        size = int(request.GET.get('size', page_size))
+    except ValueError:
+        size = page_size
+    size = max(1, min(size, MAX_PAGE_SIZE))
+
+    # A malformed cursor, or one whose values do not fit the sort's fields,
+    # selects the first page
+    after = before = None
+    if request.GET.get('before'):
+        before = clean_cursor(decode_cursor(request.GET['before'], len(ordering)), queryset.model, ordering)
+    elif request.GET.get('after'):
+        after = clean_cursor(decode_cursor(request.GET['after'], len(ordering)), queryset.model, ordering)
+
+    return KeysetPage(queryset, ordering, size, sort, after=after, before=before)
@@ -0,0 +1,4 @@
+"""
+PostgreSQL backend whose connections come from a per-process ConnectionPool;
+selected by DB_POOL_MODE=pool (see erp_project/database.py).
+"""
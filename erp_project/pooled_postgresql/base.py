@@ -0,0 +1,57 @@
+from django.db.backends.postgresql import base
+from erp_project.database import ConnectionPool, get_pool
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Take connections from the alias's pool instead of connecting, and return
+    them to it instead of closing. OPTIONS['pool'] holds the ConnectionPool
+    arguments. CONN_MAX_AGE should be 0, so a request returns its connection
+    when it ends; with CONN_HEALTH_CHECKS, a pooled connection is pinged
+    before it is handed out.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self._create_pool)
+
+    def _create_pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool', {})
+        return ConnectionPool(
+            lambda: super(DatabaseWrapper, self).get_new_connection(self.get_connection_params()),
+            check=self._usable if self.settings_dict['CONN_HEALTH_CHECKS'] else self._open,
+            **options,
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        # Set by the parent class when it connects, which only the pool does
+        self.isolation_level = base.IsolationLevel(
+            self.settings_dict['OPTIONS'].get('isolation_level', base.IsolationLevel.READ_COMMITTED)
+        )
+        return self.pool.getconn()
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                # A connection left inside a transaction is not reused
+                busy = (self.connection.closed or self.connection.get_transaction_status()
+                        != self.Database.extensions.TRANSACTION_STATUS_IDLE)
+                self.pool.putconn(self.connection, close=busy)
+
+    @staticmethod
+    def _open(connection):
+        return not connection.closed
+
+    def _usable(self, connection):
+        if connection.closed:
+            return False
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+        except self.Database.Error:
+            return False
+        return True
@@ -0,0 +1,36 @@
+"""
+Declarative queryset profiles for list and export views.
+"""
+from django.apps import apps
+
+class QuerysetProfile:
+    """
+    Declares how a view loads rows of a model: the relations to join with
+    select_related() and the columns to load with only().
+
+    The HTML list, the CSV export and the PDF export of a model share one
+    profile, so rendering N rows costs the same number of queries as one.
+    """
+
+    def __init__(self, model, select_related=(), only=()):
+        self.model = model
+        self.select_related = list(select_related)
+        self.only = list(only)
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+    def queryset(self):
+        return self.apply(self.model._default_manager.all())
+
+    def as_params(self):
+        """Serialize the profile, e.g. into a background job's params."""
+        return {'model': self.model._meta.label, 'select_related': self.select_related, 'only': self.only}
+
+    @classmethod
+    def from_params(cls, params):
+        return cls(apps.get_model(params['model']), params.get('select_related', ()), params.get('only', ()))
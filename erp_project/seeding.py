@@ -0,0 +1,248 @@
+"""
+Deterministic, skewed benchmark data for every app.
+
+Seeder generates referentially consistent rows with bulk_create in batches.
+The same seed always produces the same rows. Two kinds of skew make the data
+look like production:
+
+- A few customers, suppliers and ledgers get most of the orders, purchase
+  orders and transactions (Zipf-like weights, exponent `skew`).
+- Dates cluster at year end and month end (amplitude `seasonality`).
+
+Dates run up to a fixed `end` (DEFAULT_END) rather than today, so a seed
+generates the same rows whatever day it is run on.
+
+bulk_create bypasses the model signals, so after seeding the derived state
+(ledger balances, dashboard counters, cached pages and reports) is rebuilt
+by `manage.py seed_erp`.
+"""
+import math
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from django.db import transaction
+from accounting.models import Ledger, Transaction
+from hr.models import Attendance, Employee, Leave
+from inventory.models import Product, PurchaseOrder, Supplier
+from sales.models import Customer, Invoice, Order
+
+# Last day of the generated history
+DEFAULT_END = date(2024, 12, 31)
+
+# Rows per unit of scale; --scale 20000 gives a million transactions
+SCALE_RATIOS = {
+    'customers': 1,
+    'orders': 10,
+    'products': 1,
+    'suppliers': 0.1,
+    'purchase_orders': 2,
+    'transactions': 50,
+    'employees': 0.05,
+    'leaves': 0.1,
+}
+
+CHART_OF_ACCOUNTS = [
+    ('Cash', 'asset'), ('Bank', 'asset'), ('Accounts Receivable', 'asset'),
+    ('Inventory', 'asset'), ('Equipment', 'asset'),
+    ('Accounts Payable', 'liability'), ('Loans', 'liability'),
+    ("Owner's Equity", 'equity'),
+    ('Product Sales', 'revenue'), ('Service Revenue', 'revenue'), ('Interest Income', 'revenue'),
+    ('Salaries', 'expense'), ('Rent', 'expense'), ('Utilities', 'expense'),
+    ('Supplies', 'expense'), ('Marketing', 'expense'), ('Travel', 'expense'),
+]
+
+ORDER_STATUSES = (['completed', 'pending', 'cancelled'], [70, 20, 10])
+INVOICE_STATUSES = (['paid', 'unpaid', 'overdue'], [75, 15, 10])
+POSITIONS = ['Accountant', 'Sales Rep', 'Warehouse', 'Manager', 'Engineer', 'Support']
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class Seeder:
+    """Generate `counts` rows per kind (see SCALE_RATIOS) from one random seed."""
+
+    def __init__(self, counts, seed=0, days=730, end=DEFAULT_END, skew=1.1, seasonality=0.5, batch_size=5000,
+                 log=None):
+        self.counts = counts
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.skew = skew
+        self.log = log or (lambda message: None)
+        self.prefix = f'S{seed}'
+        self.end = end
+        self.start = self.end - timedelta(days=days - 1)
+        self.days = [self.start + timedelta(days=offset) for offset in range(days)]
+        self.day_weights = list(accumulate(self._day_weight(day, seasonality) for day in self.days))
+
+    @staticmethod
+    def _day_weight(day, seasonality):
+        # Busiest in December and over the last days of each month
+        year_cycle = math.cos(2 * math.pi * (day.timetuple().tm_yday - 350) / 365)
+        month_end = (day + timedelta(days=3)).month != day.month
+        return (1 + seasonality * year_cycle) * (1 + seasonality if month_end else 1)
+
+    def already_seeded(self):
+        return Product.objects.filter(sku__startswith=f'{self.prefix}-').exists()
+
+    def _hot(self, ids):
+        """Return (ids, cumulative weights) giving a shuffled few of ids most of the picks."""
+        ids = list(ids)
+        self.rng.shuffle(ids)
+        return ids, list(accumulate(1 / (rank + 1) ** self.skew for rank in range(len(ids))))
+
+    def _pick(self, hot, k):
+        ids, weights = hot
+        return self.rng.choices(ids, cum_weights=weights, k=k)
+
+    def _dates(self, k):
+        return self.rng.choices(self.days, cum_weights=self.day_weights, k=k)
+
+    def _amount(self, median):
+        return Decimal(f'{self.rng.lognormvariate(math.log(median), 0.8):.2f}')
+
+    def _insert(self, model, rows):
+        """bulk_create rows batch by batch in one transaction; return the saved objects' pks."""
+        pks = []
+        with transaction.atomic():
+            for batch in _batches(rows, self.batch_size):
+                pks.extend(obj.pk for obj in model.objects.bulk_create(batch))
+        self.log(f'{model._meta.label}: {len(pks)} rows')
+        return pks
+
+    def seed_customers(self):
+        return self._insert(Customer, (
+            Customer(
+                name=f'Customer {self.prefix}-{n}', email=f'customer{n}@{self.prefix.lower()}.example.com',
+                phone=f'555-{n % 10000:04d}', address=f'{n} Market Street',
+            )
+            for n in range(self.counts['customers'])
+        ))
+
+    def seed_orders(self, customer_ids):
+        """Create orders for the hot customers and invoice most of them, batch by batch."""
+        hot = self._hot(customer_ids)
+        statuses, weights = ORDER_STATUSES
+        total = self.counts['orders']
+        orders = invoices = 0
+        with transaction.atomic():
+            for start in range(0, total, self.batch_size):
+                size = min(self.batch_size, total - start)
+                batch = [
+                    Order(customer_id=customer_id, order_date=day, total_amount=self._amount(120), status=status)
+                    for customer_id, day, status in zip(
+                        self._pick(hot, size), self._dates(size), self.rng.choices(statuses, weights, k=size),
+                    )
+                ]
+                Order.objects.bulk_create(batch)
+                invoiced = [order for order in batch if order.status != 'cancelled']
+                Invoice.objects.bulk_create([
+                    Invoice(
+                        order_id=order.pk, amount=order.total_amount,
+                        invoice_date=min(order.order_date + timedelta(days=self.rng.randint(0, 14)), self.end),
+                        status=self.rng.choices(*INVOICE_STATUSES)[0],
+                    )
+                    for order in invoiced
+                ])
+                orders += len(batch)
+                invoices += len(invoiced)
+        self.log(f'sales.Order: {orders} rows')
+        self.log(f'sales.Invoice: {invoices} rows')
+
+    def seed_products(self):
+        return self._insert(Product, (
+            Product(
+                sku=f'{self.prefix}-{n:07d}', name=f'Product {n}', description=f'Benchmark product {n}',
+                price=self._amount(25), quantity=self.rng.randint(0, 500),
+            )
+            for n in range(self.counts['products'])
+        ))
+
+    def seed_suppliers(self):
+        return self._insert(Supplier, (
+            Supplier(
+                name=f'Supplier {self.prefix}-{n}', email=f'supplier{n}@{self.prefix.lower()}.example.com',
+                phone=f'555-{n % 10000:04d}', address=f'{n} Harbour Road',
+            )
+            for n in range(max(self.counts['suppliers'], 1))
+        ))
+
+    def seed_purchase_orders(self, supplier_ids):
+        hot = self._hot(supplier_ids)
+        total = self.counts['purchase_orders']
+        statuses, weights = ORDER_STATUSES
+        self._insert(PurchaseOrder, (
+            PurchaseOrder(supplier_id=supplier_id, order_date=day, total_amount=self._amount(800), status=status)
+            for supplier_id, day, status in zip(
+                self._pick(hot, total), self._dates(total), self.rng.choices(statuses, weights, k=total),
+            )
+        ))
+
+    def seed_ledgers(self):
+        ledgers = self._insert(Ledger, (
+            Ledger(name=f'{name} ({self.prefix})', type=ledger_type) for name, ledger_type in CHART_OF_ACCOUNTS
+        ))
+        return dict(zip(ledgers, (ledger_type for _, ledger_type in CHART_OF_ACCOUNTS)))
+
+    def seed_transactions(self, ledger_types):
+        hot = self._hot(ledger_types)
+        total = self.counts['transactions']
+
+        def transaction_type(ledger_id):
+            ledger_type = ledger_types[ledger_id]
+            if ledger_type in ('revenue', 'expense'):
+                return 'income' if ledger_type == 'revenue' else 'expense'
+            return self.rng.choice(['income', 'expense'])
+
+        self._insert(Transaction, (
+            Transaction(
+                ledger_id=ledger_id, date=day, amount=self._amount(300),
+                description=f'Benchmark transaction {n}', transaction_type=transaction_type(ledger_id),
+            )
+            for n, (ledger_id, day) in enumerate(zip(self._pick(hot, total), self._dates(total)))
+        ))
+
+    def seed_employees(self):
+        return self._insert(Employee, (
+            Employee(
+                name=f'Employee {self.prefix}-{n}', email=f'employee{n}@{self.prefix.lower()}.example.com',
+                phone=f'555-{n % 10000:04d}', position=self.rng.choice(POSITIONS),
+                hire_date=self.start - timedelta(days=self.rng.randint(0, 3650)),
+            )
+            for n in range(max(self.counts['employees'], 1))
+        ))
+
+    def seed_attendance(self, employee_ids):
+        # One row per employee per weekday of the seeded period
+        workdays = [day for day in self.days if day.weekday() < 5]
+        self._insert(Attendance, (
+            Attendance(employee_id=employee_id, date=day,
+                       status='Absent' if self.rng.random() < 0.05 else 'Present')
+            for employee_id in employee_ids for day in workdays
+        ))
+
+    def seed_leaves(self, employee_ids):
+        starts = self._dates(self.counts['leaves'])
+        self._insert(Leave, (
+            Leave(employee_id=self.rng.choice(employee_ids), start_date=start,
+                  end_date=start + timedelta(days=self.rng.randint(0, 9)), reason='Annual leave')
+            for start in starts
+        ))
+
+    def run(self):
+        customer_ids = self.seed_customers()
+        self.seed_orders(customer_ids)
+        self.seed_products()
+        self.seed_purchase_orders(self.seed_suppliers())
+        self.seed_transactions(self.seed_ledgers())
+        employee_ids = self.seed_employees()
+        self.seed_attendance(employee_ids)
+        self.seed_leaves(employee_ids)
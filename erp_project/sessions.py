@@ -0,0 +1,47 @@
+"""
+Cached, database-backed sessions that only write when something changed.
+
+With SESSION_SAVE_EVERY_REQUEST the session middleware saves the session on
+every response to slide its expiry forward, which is an UPDATE of
+django_session per page view. This store keeps the session in the cache with
+write-through to the database (like django's cached_db engine) and skips the
+save unless the data changed or the expiry moved into a new
+SESSION_EXPIRY_BUCKET-second bucket, so an active session is written at most
+once per bucket.
+
+Reads come from the cache only when SESSION_CACHE_READS is set, i.e. when the
+cache is shared between processes; a per-process cache would serve other
+workers' stale copies.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+# Session data key holding the expiry bucket of the last write
+BUCKET_KEY = '_expiry_bucket'
+
+class SessionStore(cached_db.SessionStore):
+
+    def _expiry_bucket(self):
+        return int(self.get_expiry_date().timestamp()) // settings.SESSION_EXPIRY_BUCKET
+
+    def load(self):
+        if not settings.SESSION_CACHE_READS:
+            return DBStore.load(self)
+        return super().load()
+
+    def save(self, must_create=False):
+        bucket = self._expiry_bucket()
+        if (not must_create and self.session_key is not None and not self.modified
+                and self._session.get(BUCKET_KEY) == bucket):
+            return
+        self._session[BUCKET_KEY] = bucket
+        super().save(must_create)
+
+    def create_model_instance(self, data):
+        # The row is only rewritten once per bucket while the cookie's expiry
+        # slides on every response, so keep the row alive a bucket longer.
+        instance = super().create_model_instance(data)
+        instance.expire_date += timedelta(seconds=settings.SESSION_EXPIRY_BUCKET)
+        return instance
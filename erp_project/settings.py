@@ -1,8 +1,9 @@
 from pathlib import Path
 import os
 from decouple import config, Csv
-import dj_database_url
+from erp_project.database import database_config
 import sys
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,14 +39,18 @@ INSTALLED_APPS = [
     'django.contrib.humanize',
     
     # Local apps
+    'erp_project',
     'sales',
     'inventory',
     'accounting',
     'hr',
     'users',
+    'jobs',
 ]
 
 MIDDLEWARE = [
+    # Outermost, so it times and counts everything below it
+    'erp_project.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -60,7 +65,9 @@ ROOT_URLCONF = 'erp_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the instrumentation middleware
+        'BACKEND': 'erp_project.instrumentation.DjangoTemplates',
+        'NAME': 'django',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -78,10 +85,19 @@ TEMPLATES = [
 WSGI_APPLICATION = 'erp_project.wsgi.application'
 
 # Database
+# DB_POOL_MODE is persistent (default), pool (PostgreSQL: DB_POOL_SIZE
+# connections shared by a process's threads), pgbouncer (transaction pooling:
+# no server-side cursors) or none; see erp_project/database.py. Connections
+# are kept DB_CONN_MAX_AGE seconds and pinged before reuse.
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': database_config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600
+        mode=DB_POOL_MODE,
+        conn_max_age=config('DB_CONN_MAX_AGE', default=600, cast=int),
+        health_checks=config('DB_HEALTH_CHECKS', default=True, cast=bool),
+        pool_size=config('DB_POOL_SIZE', default=4, cast=int),
+        pool_timeout=config('DB_POOL_TIMEOUT', default=30, cast=float),
     )
 }
 
@@ -132,6 +148,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.CustomUser'
 
 # Logging configuration
+# Logging: the file handler writes JSON lines from a background thread (see
+# erp_project/logs.py) and rotates at LOG_MAX_BYTES; repeated debug messages
+# are sampled.
+LOG_FILE = config('LOG_FILE', default=os.path.join(BASE_DIR, 'debug.log' if DEBUG else 'production.log'))
+LOG_MAX_BYTES = config('LOG_MAX_BYTES', default=10 * 1024 * 1024, cast=int)
+LOG_BACKUP_COUNT = config('LOG_BACKUP_COUNT', default=5, cast=int)
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -141,16 +163,30 @@ LOGGING = {
             'style': '{',
         },
     },
+    'filters': {
+        'request_context': {
+            '()': 'erp_project.logs.RequestContextFilter',
+        },
+        'sample_debug': {
+            '()': 'erp_project.logs.SamplingFilter',
+            'burst': 10,
+            'every': 100,
+            'interval': 60,
+        },
+    },
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
             'formatter': 'verbose',
+            'filters': ['sample_debug'],
         },
         'file': {
             'level': 'DEBUG' if DEBUG else 'INFO',
-            'class': 'logging.FileHandler',
-            'filename': os.path.join(BASE_DIR, 'debug.log') if DEBUG else os.path.join(BASE_DIR, 'production.log'),
-            'formatter': 'verbose',
+            'class': 'erp_project.logs.AsyncRotatingFileHandler',
+            'filename': LOG_FILE,
+            'maxBytes': LOG_MAX_BYTES,
+            'backupCount': LOG_BACKUP_COUNT,
+            'filters': ['request_context', 'sample_debug'],
         },
     },
     'loggers': {
@@ -167,6 +203,21 @@ LOGGING = {
     },
 }
 
+# Request instrumentation (erp_project/instrumentation.py): requests over any
+# of these limits are logged as warnings with their most repeated SQL
+REQUEST_SLOW_MS = config('REQUEST_SLOW_MS', default=500, cast=int)
+REQUEST_SLOW_QUERIES = config('REQUEST_SLOW_QUERIES', default=50, cast=int)
+REQUEST_REPEATED_QUERIES = config('REQUEST_REPEATED_QUERIES', default=10, cast=int)
+
+# Metrics (erp_project/metrics.py): each process writes its values to a file in
+# METRICS_DIR at most every METRICS_FLUSH_INTERVAL seconds; /metrics adds them
+# up. With METRICS_TOKEN set, /metrics requires "Authorization: Bearer <token>";
+# without one it only answers METRICS_ALLOWED_IPS, unless DEBUG is on.
+METRICS_DIR = config('METRICS_DIR', default=str(BASE_DIR / '.metrics'))
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=5, cast=float)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_ALLOWED_IPS = config('METRICS_ALLOWED_IPS', default='127.0.0.1,::1', cast=Csv())
+
 # Email settings (configure these in your environment variables)
 EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.console.EmailBackend')
 EMAIL_HOST = config('EMAIL_HOST', default='')
@@ -179,6 +230,67 @@ DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='webmaster@example.com
 # Security settings
 CSRF_TRUSTED_ORIGINS = config('CSRF_TRUSTED_ORIGINS', default='http://localhost,http://127.0.0.1', cast=Csv())
 
+# Cache settings
+# CACHE_BACKEND picks the backend: locmem (default, per process), file, db
+# (run createcachetable), redis or memcached (shared between processes), or
+# dummy (no caching). CACHE_LOCATION overrides the backend's default location.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'erp-project'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'erp_cache'),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'dummy': ('django.core.cache.backends.dummy.DummyCache', ''),
+}
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}")
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': config('CACHE_KEY_PREFIX', default='erp'),
+    }
+}
+# Whether the web workers and run_jobs all see the same cache
+SHARED_CACHE_BACKENDS = ('file', 'db', 'redis', 'memcached')
+CACHE_SHARED = CACHE_BACKEND in SHARED_CACHE_BACKENDS
+
+def _shared_cache_timeout(name, default):
+    # Cached pages, reports and counts are expired through the cache itself,
+    # so a write in one process only reaches the others through a shared
+    # backend. Without one they are off (0), and turning them on is an error.
+    seconds = config(name, default=default if CACHE_SHARED else 0, cast=int)
+    if seconds and not CACHE_SHARED:
+        raise ImproperlyConfigured(
+            f"{name} requires CACHE_BACKEND to be one of {', '.join(SHARED_CACHE_BACKENDS)}, not {CACHE_BACKEND}"
+        )
+    return seconds
+
+# Lifetime of cached pages and template fragments (seconds; 0 disables them)
+VIEW_CACHE_TIMEOUT = _shared_cache_timeout('VIEW_CACHE_TIMEOUT', 10 * 60)
+
+# Import/export settings
+IMPORT_BATCH_SIZE = config('IMPORT_BATCH_SIZE', default=1000, cast=int)
+IMPORT_FK_CACHE_SIZE = config('IMPORT_FK_CACHE_SIZE', default=10000, cast=int)
+# Processes rendering a PDF export in parallel (1 renders in the calling process)
+PDF_EXPORT_WORKERS = config('PDF_EXPORT_WORKERS', default=1, cast=int)
+
+# Reporting settings
+# Lifetime of cached report results (seconds; 0 disables them)
+REPORT_CACHE_TIMEOUT = _shared_cache_timeout('REPORT_CACHE_TIMEOUT', 24 * 60 * 60)
+# Dashboard row counts are recounted at least this often (seconds; 0 counts
+# on every request)
+COUNTER_CACHE_TIMEOUT = _shared_cache_timeout('COUNTER_CACHE_TIMEOUT', 5 * 60)
+
 # Session settings
 SESSION_COOKIE_AGE = 1209600  # 2 weeks, in seconds
 SESSION_SAVE_EVERY_REQUEST = True
+# Cached sessions written through to the database; see erp_project/sessions.py.
+# Set SESSION_ENGINE=django.contrib.sessions.backends.db for plain DB sessions.
+SESSION_ENGINE = config('SESSION_ENGINE', default='erp_project.sessions')
+# Unchanged sessions are rewritten only when their expiry crosses a bucket (seconds)
+SESSION_EXPIRY_BUCKET = config('SESSION_EXPIRY_BUCKET', default=60 * 60, cast=int)
+# Serve sessions from the cache only if every process sees the same cache
+SESSION_CACHE_READS = config('SESSION_CACHE_READS', default=CACHE_SHARED, cast=bool)
@@ -0,0 +1,24 @@
+"""
+Template helpers for fragment caching keyed on model versions.
+
+    {% load cache model_cache %}
+    {% model_version 'sales.Order' 'sales.Customer' as version %}
+    {% fragment_timeout as timeout %}
+    {% cache timeout orders_table version request.get_full_path %}
+        ...
+    {% endcache %}
+"""
+from django import template
+from django.conf import settings
+from erp_project import caching
+
+register = template.Library()
+
+@register.simple_tag
+def model_version(*labels):
+    """Return a token that changes whenever a row of any of the models changes."""
+    return caching.model_version(*labels)
+
+@register.simple_tag
+def fragment_timeout():
+    return settings.VIEW_CACHE_TIMEOUT
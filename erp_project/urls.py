@@ -1,11 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
+from erp_project import views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', views.metrics, name='metrics'),
     path('', include('sales.urls')),
     path('inventory/', include('inventory.urls')),
     path('accounting/', include('accounting.urls')),
     path('hr/', include('hr.urls')),
     path('users/', include('users.urls')),
+    path('jobs/', include('jobs.urls')),
 ]
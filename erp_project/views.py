@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from erp_project import metrics as registry
+
+def metrics(request):
+    """
+    Serve the metrics of every worker in the Prometheus text format. With
+    METRICS_TOKEN set the token is required; without it, and with DEBUG off,
+    only METRICS_ALLOWED_IPS are served.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Unauthorized', status=401)
+    elif not settings.DEBUG and request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse('Forbidden', status=403)
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,104 @@
+"""
+Gunicorn settings, read from the environment.
+
+    GUNICORN_WORKER_CLASS   sync (default) or gthread
+    WEB_CONCURRENCY         worker processes (default: 2 per CPU + 1 for sync,
+                            1 per CPU + 1 for gthread)
+    GUNICORN_THREADS        threads per gthread worker (default 4)
+    GUNICORN_PRELOAD        load the application once in the master (default on)
+    GUNICORN_PRELOAD_EXPORTS
+                            with preload, also import pandas and reportlab in
+                            the master so workers share them (default off)
+    GUNICORN_MAX_REQUESTS   recycle a worker after this many requests (default
+                            1000, 0 disables), GUNICORN_MAX_REQUESTS_JITTER
+                            spreads the restarts (default 100)
+    GUNICORN_TIMEOUT        seconds a request may take (default 30);
+                            GUNICORN_EXPORT_TIMEOUT for exports, imports and
+                            reports (default 120)
+
+`python manage.py loadtest` drives the main pages against a running server to
+compare these profiles.
+"""
+import multiprocessing
+import os
+import re
+import signal
+
+def _env(name, default, cast=str):
+    value = os.environ.get(name)
+    if value in (None, ''):
+        return default
+    if cast is bool:
+        return value.lower() in ('1', 'true', 'yes', 'on')
+    return cast(value)
+
+cpus = multiprocessing.cpu_count()
+
+bind = f"0.0.0.0:{_env('PORT', '8000')}"
+worker_class = _env('GUNICORN_WORKER_CLASS', 'sync')
+if worker_class not in ('sync', 'gthread'):
+    raise ValueError('GUNICORN_WORKER_CLASS must be sync or gthread')
+threads = _env('GUNICORN_THREADS', 4, int) if worker_class == 'gthread' else 1
+workers = _env('WEB_CONCURRENCY', cpus * 2 + 1 if worker_class == 'sync' else cpus + 1, int)
+
+preload_app = _env('GUNICORN_PRELOAD', True, bool)
+max_requests = _env('GUNICORN_MAX_REQUESTS', 1000, int)
+max_requests_jitter = _env('GUNICORN_MAX_REQUESTS_JITTER', 100, int)
+
+# Timeouts per route class. Gunicorn's own timeout is per worker, so it is set
+# to the longest class and the shorter limits are enforced per request below.
+ROUTE_TIMEOUTS = [
+    (re.compile(r'/(export|import)/|/reports/generate/|^/jobs/\d+/download/'), _env('GUNICORN_EXPORT_TIMEOUT', 120, int)),
+]
+DEFAULT_TIMEOUT = _env('GUNICORN_TIMEOUT', 30, int)
+timeout = max([DEFAULT_TIMEOUT] + [seconds for _, seconds in ROUTE_TIMEOUTS])
+graceful_timeout = _env('GUNICORN_GRACEFUL_TIMEOUT', 30, int)
+keepalive = _env('GUNICORN_KEEPALIVE', 5, int)
+
+accesslog = '-'
+errorlog = '-'
+loglevel = _env('GUNICORN_LOG_LEVEL', 'info')
+
+def route_timeout(path):
+    """Return the number of seconds a request for path may take."""
+    for pattern, seconds in ROUTE_TIMEOUTS:
+        if pattern.search(path):
+            return seconds
+    return DEFAULT_TIMEOUT
+
+class RequestTimeout(Exception):
+    """Raised in a sync worker whose request outlived its route's timeout."""
+
+def _expire(signum, frame):
+    raise RequestTimeout('request exceeded its route timeout')
+
+def on_starting(server):
+    # Metrics left behind by a previous run would be added to this one's
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'erp_project.settings')
+    from erp_project import metrics
+    metrics.reset_directory()
+
+def child_exit(server, worker):
+    from erp_project import metrics
+    metrics.mark_process_dead(worker.pid)
+
+def when_ready(server):
+    if preload_app and _env('GUNICORN_PRELOAD_EXPORTS', False, bool):
+        # Imported before forking, the modules' memory is shared copy-on-write
+        import pandas  # noqa: F401
+        import reportlab.pdfgen.canvas  # noqa: F401
+        import reportlab.platypus  # noqa: F401
+
+def post_fork(server, worker):
+    if worker_class == 'sync':
+        signal.signal(signal.SIGALRM, _expire)
+
+def pre_request(worker, req):
+    # A sync worker runs one request at a time on its main thread, so an
+    # alarm can interrupt it; gthread workers rely on `timeout` alone.
+    if worker_class == 'sync':
+        signal.alarm(route_timeout(req.path))
+
+def post_request(worker, req, environ, resp):
+    if worker_class == 'sync':
+        signal.alarm(0)
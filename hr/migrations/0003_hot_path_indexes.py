@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0002_attendance_hr_attendance_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['employee', 'date'], name='hr_attendance_emp_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(condition=models.Q(('status', 'Absent')), fields=['date'], name='hr_attendance_absent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leave',
+            index=models.Index(fields=['employee', 'start_date', 'end_date'], name='hr_leave_emp_dates_idx'),
+        ),
+    ]
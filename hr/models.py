@@ -16,6 +16,13 @@ class Attendance(models.Model):
     date = models.DateField()
     status = models.CharField(max_length=10, choices=[('Present', 'Present'), ('Absent', 'Absent')])
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id'], name='hr_attendance_date_idx'),
+            models.Index(fields=['employee', 'date'], name='hr_attendance_emp_date_idx'),
+            models.Index(fields=['date'], condition=models.Q(status='Absent'), name='hr_attendance_absent_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee.name} - {self.date}"
 
@@ -25,5 +32,11 @@ class Leave(models.Model):
     end_date = models.DateField()
     reason = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['start_date', 'id'], name='hr_leave_start_idx'),
+            models.Index(fields=['employee', 'start_date', 'end_date'], name='hr_leave_emp_dates_idx'),
+        ]
+
     def __str__(self):
         return f"{self.employee.name} Leave"
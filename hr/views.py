@@ -5,10 +5,26 @@ from django.contrib import messages
 from .models import Employee, Attendance, Leave
 from .forms import EmployeeForm, AttendanceForm, LeaveForm
 from erp_project.export_import_utils import export_to_csv, export_to_pdf, import_from_csv
+from erp_project.pagination import paginate
+from erp_project.querysets import QuerysetProfile
+from jobs.utils import enqueue_export, enqueue_import, wants_background
+
+# Queryset profiles shared by the list views and the CSV/PDF exports
+EMPLOYEE_PROFILE = QuerysetProfile(Employee, only=['id', 'name', 'email', 'phone', 'position', 'hire_date', 'created_at'])
+ATTENDANCE_PROFILE = QuerysetProfile(
+    Attendance,
+    select_related=['employee'],
+    only=['id', 'employee', 'employee__name', 'employee__position', 'date', 'status'],
+)
+LEAVE_PROFILE = QuerysetProfile(
+    Leave,
+    select_related=['employee'],
+    only=['id', 'employee', 'employee__name', 'start_date', 'end_date', 'reason'],
+)
 
 # Employee Views
 def employees_list(request):
-    employees = Employee.objects.all()
+    employees = EMPLOYEE_PROFILE.queryset()
     return render(request, 'hr/employees.html', {'employees': employees})
 
 def employee_create(request):
@@ -38,8 +54,10 @@ def employee_delete(request, pk):
     return redirect('employees_list')
 
 # Attendance Views
+ATTENDANCE_SORTS = {'newest': ('-date', '-id'), 'oldest': ('date', 'id')}
+
 def attendance_list(request):
-    attendance = Attendance.objects.all()
+    attendance = paginate(request, ATTENDANCE_PROFILE.queryset(), ATTENDANCE_SORTS)
     return render(request, 'hr/attendance.html', {'attendance': attendance})
 
 def attendance_create(request):
@@ -69,8 +87,10 @@ def attendance_delete(request, pk):
     return redirect('attendance_list')
 
 # Leave Views
+LEAVE_SORTS = {'newest': ('-start_date', '-id'), 'oldest': ('start_date', 'id')}
+
 def leaves_list(request):
-    leaves = Leave.objects.all()
+    leaves = paginate(request, LEAVE_PROFILE.queryset(), LEAVE_SORTS)
     return render(request, 'hr/leaves.html', {'leaves': leaves})
 
 def leave_create(request):
@@ -102,7 +122,10 @@ def leave_delete(request, pk):
 # Export/Import Views
 def export_employees(request, format_type='csv'):
     fields = ['id', 'name', 'email', 'phone', 'position', 'hire_date', 'created_at']
-    employees = Employee.objects.all()
+    employees = EMPLOYEE_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('employees', EMPLOYEE_PROFILE, fields, format_type, 'Employees List')
     
     if format_type == 'pdf':
         return export_to_pdf('employees', employees, fields, 'Employees List')
@@ -111,7 +134,10 @@ def export_employees(request, format_type='csv'):
 
 def export_attendance(request, format_type='csv'):
     fields = ['id', 'employee__name', 'date', 'status']
-    attendance = Attendance.objects.all()
+    attendance = ATTENDANCE_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('attendance', ATTENDANCE_PROFILE, fields, format_type, 'Attendance Records')
     
     if format_type == 'pdf':
         return export_to_pdf('attendance', attendance, fields, 'Attendance Records')
@@ -120,7 +146,10 @@ def export_attendance(request, format_type='csv'):
 
 def export_leaves(request, format_type='csv'):
     fields = ['id', 'employee__name', 'start_date', 'end_date', 'reason']
-    leaves = Leave.objects.all()
+    leaves = LEAVE_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('leaves', LEAVE_PROFILE, fields, format_type, 'Leave Records')
     
     if format_type == 'pdf':
         return export_to_pdf('leaves', leaves, fields, 'Leave Records')
@@ -142,11 +171,16 @@ def import_employees(request):
         'Hire Date': 'hire_date'
     }
     
-    success, message = import_from_csv(Employee, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    if wants_background(request):
+        job = enqueue_import(Employee, file, field_mapping)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('employees_list')
+    
+    result = import_from_csv(Employee, file, field_mapping)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('employees_list')
 
@@ -162,12 +196,18 @@ def import_attendance(request):
         'Date': 'date',
         'Status': 'status'
     }
+    natural_keys = {'employee': 'email'}
+    
+    if wants_background(request):
+        job = enqueue_import(Attendance, file, field_mapping, natural_keys)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('attendance_list')
     
-    success, message = import_from_csv(Attendance, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    result = import_from_csv(Attendance, file, field_mapping, natural_keys=natural_keys)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('attendance_list')
 
@@ -184,11 +224,17 @@ def import_leaves(request):
         'End Date': 'end_date',
         'Reason': 'reason'
     }
+    natural_keys = {'employee': 'email'}
+    
+    if wants_background(request):
+        job = enqueue_import(Leave, file, field_mapping, natural_keys)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('leaves_list')
     
-    success, message = import_from_csv(Leave, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    result = import_from_csv(Leave, file, field_mapping, natural_keys=natural_keys)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('leaves_list')
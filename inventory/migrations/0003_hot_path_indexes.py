@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 07:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_product_inv_product_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['status', 'order_date'], name='inv_po_status_date_idx'),
+        ),
+    ]
@@ -8,6 +8,11 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='inv_product_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -32,5 +37,10 @@ class PurchaseOrder(models.Model):
     ], default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'order_date'], name='inv_po_status_date_idx'),
+        ]
+
     def __str__(self):
         return f"PO #{self.id} - {self.supplier.name}"
@@ -1,24 +1,33 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpResponse, JsonResponse
+from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods
+from django.conf import settings
 from django.db import transaction
 from django.utils import timezone
 from io import BytesIO, StringIO
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-import pandas as pd
 import json
 from datetime import datetime
+from decimal import Decimal
 
 from .models import Product, Supplier, PurchaseOrder
 from .forms import ProductForm, SupplierForm, PurchaseOrderForm
+from erp_project.export_import_utils import (
+    ImportResult, export_to_csv, iter_rows, pdf_response, rows_imported, write_pdf_pages,
+)
+from jobs.utils import enqueue_export, enqueue_job, wants_background
+from erp_project.lazy import pandas as pd
+from erp_project.pagination import paginate
+from erp_project.querysets import QuerysetProfile
+
+# Queryset profiles shared by the list views and the exports
+PRODUCT_PROFILE = QuerysetProfile(
+    Product, only=['id', 'sku', 'name', 'description', 'price', 'quantity', 'created_at']
+)
+PURCHASE_ORDER_PROFILE = QuerysetProfile(PurchaseOrder, select_related=['supplier'])
 
 # Product Views
 def products_list(request):
-    products = Product.objects.all()
+    products = paginate(request, PRODUCT_PROFILE.queryset())
     return render(request, 'inventory/products.html', {'products': products})
 
 def product_create(request):
@@ -57,112 +66,176 @@ def product_detail(request, pk):
     return render(request, 'inventory/product_detail.html', context)
 
 def export_products_csv(request):
-    """Export products to CSV"""
-    # Get all products
-    products = Product.objects.all().values('sku', 'name', 'description', 'price', 'quantity', 'category__name', 'supplier__name')
-    
-    # Convert to DataFrame
-    df = pd.DataFrame(list(products))
-    
-    # Rename columns for better readability
-    df = df.rename(columns={
-        'category__name': 'category',
-        'supplier__name': 'supplier'
-    })
-    
-    # Create response with CSV data
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename="products_export_{}.csv"'.format(
-        timezone.now().strftime('%Y%m%d_%H%M%S')
-    )
-    
-    # Write DataFrame to response
-    df.to_csv(response, index=False)
-    return response
+    """Export products to CSV, in the columns import_products_csv reads"""
+    fields = ['sku', 'name', 'description', 'price', 'quantity']
+    if wants_background(request):
+        return enqueue_export('products', PRODUCT_PROFILE, fields, 'csv', 'Products List')
+    return export_to_csv('products', PRODUCT_PROFILE.queryset(), fields)
+
+PRODUCTS_PDF_HEADER = ['SKU', 'Name', 'Description', 'Price', 'Qty']
+PRODUCTS_PDF_COL_WIDTHS = [72, 144, 216, 54, 36]  # points: 1, 2, 3, 0.75 and 0.5 inch
+PRODUCTS_PDF_STYLE = [
+    ('BACKGROUND', (0, 0), (-1, 0), 'grey'),
+    ('TEXTCOLOR', (0, 0), (-1, 0), 'whitesmoke'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BACKGROUND', (0, 1), (-1, -1), 'white'),
+    ('TEXTCOLOR', (0, 1), (-1, -1), 'black'),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 1),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+    ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),  # Right align price and quantity
+    ('GRID', (0, 0), (-1, -1), 0.5, 'black'),
+]
 
 def export_products_pdf(request):
     """Export products to PDF"""
-    # Get all products
-    products = Product.objects.select_related('category', 'supplier').all()
-    
-    # Create the HttpResponse object with the appropriate PDF headers.
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = 'attachment; filename="products_export_{}.pdf"'.format(
-        timezone.now().strftime('%Y%m%d_%H%M%S')
+    if wants_background(request):
+        return enqueue_job('export_products_pdf')
+
+    return pdf_response(
+        'products_export_{}.pdf'.format(timezone.now().strftime('%Y%m%d_%H%M%S')),
+        lambda output: write_products_pdf(output, PRODUCT_PROFILE.queryset()),
     )
-    
-    # Create the PDF object, using the response object as its "file."
-    doc = SimpleDocTemplate(response, pagesize=letter, rightMargin=30, leftMargin=30, topMargin=30, bottomMargin=18)
-    
-    # Container for the 'Flowable' objects
-    elements = []
-    
-    # Add title
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'Title',
-        parent=styles['Heading1'],
-        fontSize=16,
-        spaceAfter=20,
-        alignment=1  # Center
+
+def write_products_pdf(output, products, progress=None):
+    """Render the products PDF into output (any writable file-like object)"""
+    now = timezone.now().strftime('%Y-%m-%d %H:%M')
+    rows = (
+        (sku, name, description, f"${price:.2f}", quantity)
+        for sku, name, description, price, quantity in iter_rows(
+            products, ['sku', 'name', 'description', 'price', 'quantity']
+        )
     )
-    title = Paragraph("Products Export - {}".format(timezone.now().strftime('%Y-%m-%d %H:%M')), title_style)
-    elements.append(title)
-    
-    # Prepare data for the table
-    data = [['SKU', 'Name', 'Category', 'Supplier', 'Price', 'Qty']]
-    
-    for product in products:
-        data.append([
-            product.sku,
-            product.name,
-            str(product.category) if product.category else '',
-            str(product.supplier) if product.supplier else '',
-            f"${product.price:.2f}",
-            str(product.quantity)
-        ])
-    
-    # Create the table
-    table = Table(data, colWidths=[1*inch, 2*inch, 1.5*inch, 1.5*inch, 0.75*inch, 0.5*inch])
-    
-    # Add style to the table
-    style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-        ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 1), (-1, -1), 9),
-        ('ALIGN', (3, 1), (-1, -1), 'RIGHT'),  # Right align price and quantity
-        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-    ])
-    
-    # Apply the style to the table
-    table.setStyle(style)
-    
-    # Add the table to the elements
-    elements.append(table)
-    
-    # Add footer
-    elements.append(Spacer(1, 12))
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=8,
-        textColor=colors.grey,
-        alignment=2  # Right
+    write_pdf_pages(
+        output, rows, PRODUCTS_PDF_HEADER, f"Products Export - {now}",
+        col_widths=PRODUCTS_PDF_COL_WIDTHS, style=PRODUCTS_PDF_STYLE,
+        footer=f"Generated on {now}", progress=progress,
     )
-    footer = Paragraph("Generated on {}".format(timezone.now().strftime('%Y-%m-%d %H:%M')), footer_style)
-    elements.append(footer)
-    
-    # Build the PDF
-    doc.build(elements)
-    
-    return response
+
+def _clean_product_frame(df, result):
+    """
+    Validate and coerce a DataFrame of products column-wise.
+
+    Invalid rows are recorded on result with their CSV line number; the
+    remaining rows are returned deduplicated by SKU. The last occurrence wins
+    and the earlier ones are rejected too.
+    """
+    def text(column):
+        if column not in df.columns:
+            return pd.Series('', index=df.index)
+        return df[column].fillna('').astype(str).str.strip()
+
+    frame = pd.DataFrame({
+        'line': df.index + 2,  # line 1 is the header
+        'sku': text('sku'),
+        'name': text('name'),
+        'description': text('description'),
+        'price': pd.to_numeric(df['price'], errors='coerce').round(2),
+        'quantity': pd.to_numeric(df['quantity'], errors='coerce'),
+    })
+
+    sku_length = Product._meta.get_field('sku').max_length
+    name_length = Product._meta.get_field('name').max_length
+    checks = [
+        (frame['sku'] == '', 'sku: This field cannot be blank.'),
+        (frame['sku'].str.len() > sku_length, f'sku: Ensure this value has at most {sku_length} characters.'),
+        (frame['name'] == '', 'name: This field cannot be blank.'),
+        (frame['name'].str.len() > name_length, f'name: Ensure this value has at most {name_length} characters.'),
+        (frame['price'].isna(), 'price: A valid number is required.'),
+        (frame['price'].abs() >= 10 ** 8, 'price: Ensure that there are no more than 10 digits in total.'),
+        (frame['quantity'].isna() | (frame['quantity'] % 1 != 0), 'quantity: Enter a whole number.'),
+        (frame['quantity'].abs() >= 2 ** 31, 'quantity: Ensure this value is a valid integer.'),
+    ]
+    errors = pd.Series('', index=df.index)
+    for mask, message in checks:
+        errors = errors.where(~mask, errors + message + ' ')
+
+    invalid = errors != ''
+    for line, error in zip(frame.loc[invalid, 'line'], errors[invalid]):
+        result.reject(int(line), error.strip())
+
+    frame = frame[~invalid]
+    repeated = frame['sku'].duplicated(keep='last')
+    last_lines = frame.drop_duplicates('sku', keep='last').set_index('sku')['line']
+    for line, sku in zip(frame.loc[repeated, 'line'], frame.loc[repeated, 'sku']):
+        result.reject(int(line), _repeated_sku(sku, last_lines[sku]))
+    return frame[~repeated]
+
+def _repeated_sku(sku, line):
+    return f'sku: {sku} is repeated on line {line}, which was imported instead.'
+
+def _upsert_products(frame, result, batch_size, imported):
+    """
+    Write a cleaned product frame with one SKU lookup and one upsert per batch.
+
+    imported maps the SKUs written by earlier chunks of the same file to their
+    line. A SKU seen again overwrites that row, which is then rejected, and is
+    not counted a second time.
+    """
+    for start in range(0, len(frame), batch_size):
+        chunk = frame.iloc[start:start + batch_size]
+        skus = chunk['sku'].tolist()
+        existing = set(Product.objects.filter(sku__in=skus).values_list('sku', flat=True))
+        products = [
+            Product(sku=sku, name=name, description=description,
+                    price=Decimal(f'{price:.2f}'), quantity=int(quantity))
+            for sku, name, description, price, quantity in zip(
+                skus, chunk['name'], chunk['description'], chunk['price'], chunk['quantity']
+            )
+        ]
+        Product.objects.bulk_create(
+            products,
+            update_conflicts=True,
+            unique_fields=['sku'],
+            update_fields=['name', 'description', 'price', 'quantity'],
+        )
+        result.created += len(products) - len(existing)
+        result.updated += len(existing)
+        for sku, line in zip(skus, chunk['line']):
+            if sku in imported:
+                result.updated -= 1
+                result.reject(imported[sku], _repeated_sku(sku, int(line)))
+            imported[sku] = int(line)
+        rows_imported.send(
+            sender=Product,
+            created=[product for product in products if product.sku not in existing],
+            updated=[product for product in products if product.sku in existing],
+            previous={},
+        )
+
+def import_products_csv(file, batch_size=None, progress=None):
+    """
+    Import products from a CSV file, reading it batch_size rows at a time.
+
+    Each chunk is validated column-wise and upserted by SKU, so memory is
+    bounded by the batch size rather than the file size (plus the line of
+    each SKU imported so far). A repeated SKU is imported from its last row
+    and counted once; its earlier rows are rejected. Returns an ImportResult,
+    with the rejected rows in line order.
+    """
+    batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+    result = ImportResult(total_bytes=getattr(file, 'size', None))
+    required_columns = ['sku', 'name', 'price', 'quantity']
+    imported = {}
+
+    with transaction.atomic():
+        reader = pd.read_csv(file, chunksize=batch_size, dtype={'sku': str, 'name': str, 'description': str})
+        with reader:
+            for df in reader:
+                missing_columns = [col for col in required_columns if col not in df.columns]
+                if missing_columns:
+                    result.error = f'Missing required columns: {", ".join(missing_columns)}'
+                    break
+                _upsert_products(_clean_product_frame(df, result), result, batch_size, imported)
+                result.advance(len(df), file.tell(), progress)
+    result.rejected.sort()
+
+    result.record_metrics(Product)
+    return result
 
 @require_http_methods(["POST"])
 def import_products(request):
@@ -175,45 +248,19 @@ def import_products(request):
     
     try:
         if file_extension == 'csv':
-            # Read the CSV file
-            df = pd.read_csv(file)
-            
-            # Basic validation
-            required_columns = ['sku', 'name', 'price', 'quantity']
-            missing_columns = [col for col in required_columns if col not in df.columns]
-            
-            if missing_columns:
-                return JsonResponse(
-                    {'error': f'Missing required columns: {", ".join(missing_columns)}'}, 
-                    status=400
-                )
-            
-            # Process each row
-            created_count = 0
-            updated_count = 0
+            if wants_background(request):
+                return enqueue_job('import_products', input_file=file)
             
-            with transaction.atomic():
-                for _, row in df.iterrows():
-                    # Check if product exists
-                    product, created = Product.objects.update_or_create(
-                        sku=row['sku'],
-                        defaults={
-                            'name': row['name'],
-                            'description': row.get('description', ''),
-                            'price': float(row['price']),
-                            'quantity': int(row['quantity']),
-                            # Add other fields as needed
-                        }
-                    )
-                    
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
+            result = import_products_csv(file)
+            if not result.success:
+                return JsonResponse({'error': result.error}, status=400)
             
             return JsonResponse({
                 'success': True,
-                'message': f'Successfully imported {created_count} new products and updated {updated_count} existing products.'
+                'message': f'Successfully imported {result.created} new products and updated {result.updated} existing products.',
+                'created': result.created,
+                'updated': result.updated,
+                'rejected': [{'line': line, 'error': error} for line, error in result.rejected],
             })
             
         elif file_extension == 'pdf':
@@ -268,7 +315,7 @@ def supplier_delete(request, pk):
 
 # Purchase Order Views
 def purchase_orders_list(request):
-    purchase_orders = PurchaseOrder.objects.all()
+    purchase_orders = PURCHASE_ORDER_PROFILE.queryset()
     return render(request, 'inventory/purchase_orders.html', {'purchase_orders': purchase_orders})
 
 def purchase_order_create(request):
@@ -0,0 +1,92 @@
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, close_old_connections, connections
+from django.utils import timezone
+from jobs.models import Job
+from jobs.tasks import TASKS
+
+logger = logging.getLogger('erp_project.jobs')
+
+class Heartbeat(threading.Thread):
+    """
+    Touch a running job every interval seconds, so other workers do not take
+    it for stale however long it keeps a transaction open.
+    """
+
+    def __init__(self, job, interval):
+        super().__init__(name=f'heartbeat-{job.pk}', daemon=True)
+        self.job = job
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def run(self):
+        try:
+            while not self.stopped.wait(self.interval):
+                try:
+                    self.job.heartbeat()
+                except DatabaseError as e:
+                    # SQLite has one writer at a time; the next beat retries
+                    logger.debug('Heartbeat of %s failed: %s', self.job, e)
+        finally:
+            connections.close_all()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+class Command(BaseCommand):
+    help = 'Run queued import/export jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true',
+                            help='Exit once the queue is empty instead of polling forever')
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--stale-after', type=int, default=15 * 60,
+                            help='Requeue running jobs whose worker has sent no heartbeat for this many seconds')
+        parser.add_argument('--heartbeat', type=float, default=60,
+                            help='Seconds between the heartbeats of the running job; keep it well under '
+                                 '--stale-after')
+
+    def handle(self, *args, **options):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        self.stdout.write(f'Job worker {worker} started')
+
+        while True:
+            close_old_connections()
+            stale = Job.requeue_stale(timezone.now() - timedelta(seconds=options['stale_after']))
+            if stale:
+                logger.warning('Requeued %s stale jobs', stale)
+
+            job = Job.claim_next(worker)
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+                continue
+
+            self.run_job(job, options['heartbeat'])
+
+    def run_job(self, job, heartbeat=60):
+        logger.info('Running %s', job)
+        task = TASKS.get(job.task)
+        beat = Heartbeat(job, heartbeat)
+        beat.start()
+        try:
+            if task is None:
+                raise LookupError(f"Unknown task '{job.task}'")
+            task(job)
+        except Exception as e:
+            logger.error('%s failed\n%s', job, traceback.format_exc())
+            job.fail(str(e))
+        else:
+            job.succeed()
+            logger.info('Finished %s', job)
+        finally:
+            beat.stop()
@@ -0,0 +1,157 @@
+import os
+from django.core.cache import cache
+from django.core.files import File
+from django.db import models, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+class Job(models.Model):
+    """
+    A unit of background work (an import or an export) queued in the database
+    and picked up by `python manage.py run_jobs`.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED)
+    input_file = models.FileField(upload_to='jobs/input/', blank=True)
+    result_file = models.FileField(upload_to='jobs/results/', blank=True)
+    processed = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    message = models.TextField(blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='jobs_status_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.id} - {self.task} ({self.status})"
+
+    @classmethod
+    def enqueue(cls, task, params=None, input_file=None):
+        job = cls(task=task, params=params or {})
+        if input_file is not None:
+            job.input_file.save(os.path.basename(input_file.name), input_file, save=False)
+        job.save()
+        return job
+
+    @classmethod
+    def claim_next(cls, worker):
+        """
+        Atomically move the oldest queued job to running and return it.
+
+        The conditional UPDATE acts as a compare-and-swap, so several workers
+        can poll the same table without a broker or row locks.
+        """
+        candidates = cls.objects.filter(status=cls.QUEUED).order_by('created_at', 'id')
+        for pk in candidates.values_list('pk', flat=True)[:10]:
+            claimed = cls.objects.filter(pk=pk, status=cls.QUEUED).update(
+                status=cls.RUNNING, worker=worker, started_at=timezone.now(), updated_at=timezone.now()
+            )
+            if claimed:
+                return cls.objects.get(pk=pk)
+        return None
+
+    @classmethod
+    def requeue_stale(cls, older_than):
+        """
+        Put running jobs whose worker stopped sending heartbeats (see
+        heartbeat()) since older_than back in the queue.
+        """
+        return cls.objects.filter(status=cls.RUNNING, updated_at__lt=older_than).update(
+            status=cls.QUEUED, worker='', started_at=None, updated_at=timezone.now()
+        )
+
+    def heartbeat(self):
+        """
+        Mark the job as still running by touching updated_at. Returns False
+        if the job is no longer running on this worker.
+
+        run_jobs calls this from a thread of its own: Django gives each thread
+        its own connection, so the update commits even while the job holds a
+        transaction open on the worker's main thread.
+        """
+        return bool(Job.objects.filter(pk=self.pk, status=self.RUNNING, worker=self.worker).update(
+            updated_at=timezone.now()
+        ))
+
+    def _progress_key(self):
+        return f'jobs:progress:{self.pk}'
+
+    def report_progress(self, processed, total=None):
+        """
+        Record how far the job has got.
+
+        Imports run inside a single transaction, so progress is published
+        through the cache (readable by other processes when a shared cache
+        backend is configured) and only written to the row when that is
+        visible to pollers, i.e. outside an atomic block.
+        """
+        self.processed = processed
+        if total is not None:
+            self.total = total
+        cache.set(self._progress_key(), (self.processed, self.total), 24 * 60 * 60)
+        if not transaction.get_connection().in_atomic_block:
+            Job.objects.filter(pk=self.pk).update(
+                processed=self.processed, total=self.total, updated_at=timezone.now()
+            )
+
+    def live_progress(self):
+        """Return (processed, total), preferring the cached value while running."""
+        if self.status == self.RUNNING:
+            progress = cache.get(self._progress_key())
+            if progress is not None:
+                return progress
+        return self.processed, self.total
+
+    def save_result(self, name, file):
+        self.result_file.save(name, File(file), save=False)
+
+    def succeed(self):
+        self.status = self.SUCCEEDED
+        self.finished_at = timezone.now()
+        self.save()
+        cache.delete(self._progress_key())
+
+    def fail(self, message):
+        self.status = self.FAILED
+        self.message = message
+        self.finished_at = timezone.now()
+        self.save()
+        cache.delete(self._progress_key())
+
+    def as_dict(self):
+        processed, total = self.live_progress()
+        data = {
+            'id': self.id,
+            'task': self.task,
+            'status': self.status,
+            'processed': processed,
+            'total': total,
+            'message': self.message,
+            'result': self.result,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'status_url': reverse('jobs:job_status', args=[self.id]),
+        }
+        if self.status == self.SUCCEEDED and self.result_file:
+            data['download_url'] = reverse('jobs:job_download', args=[self.id])
+        return data
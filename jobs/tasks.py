@@ -0,0 +1,83 @@
+import tempfile
+from datetime import datetime
+from django.apps import apps
+from erp_project.export_import_utils import import_from_csv, iter_csv, write_pdf
+from erp_project.querysets import QuerysetProfile
+
+# Task name -> callable(job); populated with @register
+TASKS = {}
+
+def register(name):
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+def _result_name(job, extension):
+    return f"{job.params.get('name', job.task)}_{datetime.now().strftime('%Y%m%d')}.{extension}"
+
+def _record_import(job, result):
+    if not result.success:
+        raise RuntimeError(result.message)
+    job.message = result.message
+    job.result = {
+        'created': result.created,
+        'updated': result.updated,
+        'rejected': [{'line': line, 'error': error} for line, error in result.rejected[:100]],
+        'rejected_count': len(result.rejected),
+    }
+    job.report_progress(result.rows_read)
+
+@register('export_csv')
+def export_csv(job):
+    queryset = QuerysetProfile.from_params(job.params).queryset()
+    job.report_progress(0, queryset.count())
+
+    with tempfile.TemporaryFile() as output:
+        for chunk in iter_csv(queryset, job.params['fields'], progress=job.report_progress):
+            output.write(chunk.encode('utf-8'))
+        output.seek(0)
+        job.save_result(_result_name(job, 'csv'), output)
+
+@register('export_pdf')
+def export_pdf(job):
+    queryset = QuerysetProfile.from_params(job.params).queryset()
+    job.report_progress(0, queryset.count())
+
+    with tempfile.TemporaryFile() as output:
+        write_pdf(output, queryset, job.params['fields'], job.params['title'], progress=job.report_progress)
+        output.seek(0)
+        job.save_result(_result_name(job, 'pdf'), output)
+    job.report_progress(job.total)
+
+@register('export_products_pdf')
+def export_products_pdf(job):
+    from inventory.views import PRODUCT_PROFILE, write_products_pdf
+
+    products = PRODUCT_PROFILE.queryset()
+    job.report_progress(0, products.count())
+
+    with tempfile.TemporaryFile() as output:
+        write_products_pdf(output, products, progress=job.report_progress)
+        output.seek(0)
+        job.save_result(f"products_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf", output)
+    job.report_progress(job.total)
+
+@register('import_csv')
+def import_csv(job):
+    model = apps.get_model(job.params['model'])
+    with job.input_file.open('rb') as file:
+        result = import_from_csv(
+            model, file, job.params['field_mapping'],
+            natural_keys=job.params.get('natural_keys'),
+            progress=lambda r: job.report_progress(r.rows_read),
+        )
+    _record_import(job, result)
+
+@register('import_products')
+def import_products(job):
+    from inventory.views import import_products_csv
+
+    with job.input_file.open('rb') as file:
+        result = import_products_csv(file, progress=lambda r: job.report_progress(r.rows_read))
+    _record_import(job, result)
@@ -0,0 +1,25 @@
+from django.http import JsonResponse
+from .models import Job
+
+def wants_background(request):
+    """True when the client asked for the work to be queued (?background=1)."""
+    value = request.POST.get('background') or request.GET.get('background') or ''
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+def enqueue_job(task, params=None, input_file=None):
+    """Queue a job and answer with 202 and the URL to poll."""
+    job = Job.enqueue(task, params, input_file)
+    return JsonResponse(job.as_dict(), status=202)
+
+def enqueue_export(model_name, profile, fields, format_type, title):
+    """Queue the background equivalent of export_to_csv/export_to_pdf for a QuerysetProfile."""
+    params = {'name': model_name, 'fields': fields, **profile.as_params()}
+    if format_type == 'pdf':
+        params['title'] = title
+        return enqueue_job('export_pdf', params)
+    return enqueue_job('export_csv', params)
+
+def enqueue_import(model, file, field_mapping, natural_keys=None):
+    """Queue the background equivalent of import_from_csv and return the job."""
+    params = {'model': model._meta.label, 'field_mapping': field_mapping, 'natural_keys': natural_keys or {}}
+    return Job.enqueue('import_csv', params, file)
@@ -0,0 +1,25 @@
+import os
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from .models import Job
+
+def jobs_list(request):
+    """List the most recent jobs."""
+    jobs = Job.objects.order_by('-created_at', '-id')[:50]
+    return JsonResponse({'jobs': [job.as_dict() for job in jobs]})
+
+def job_status(request, pk):
+    """Poll the status and progress of a job."""
+    job = get_object_or_404(Job, pk=pk)
+    return JsonResponse(job.as_dict())
+
+def job_download(request, pk):
+    """Download the file produced by a finished export job."""
+    job = get_object_or_404(Job, pk=pk, status=Job.SUCCEEDED)
+    if not job.result_file:
+        raise Http404("This job has no result file")
+    return FileResponse(
+        job.result_file.open('rb'),
+        as_attachment=True,
+        filename=os.path.basename(job.result_file.name),
+    )
@@ -7,6 +7,11 @@ class Customer(models.Model):
     address = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='sales_customer_created_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -21,6 +26,13 @@ class Order(models.Model):
     ], default='pending')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='sales_order_created_idx'),
+            models.Index(fields=['order_date', 'id'], name='sales_order_date_idx'),
+            models.Index(fields=['status', 'order_date'], name='sales_order_status_date_idx'),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} - {self.customer.name}"
 
@@ -35,5 +47,17 @@ class Invoice(models.Model):
     ], default='unpaid')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='sales_invoice_created_idx'),
+            models.Index(fields=['invoice_date', 'id'], name='sales_invoice_date_idx'),
+            # Paid invoices are the bulk of the table and are rarely filtered on
+            models.Index(
+                fields=['invoice_date'],
+                condition=models.Q(status__in=['unpaid', 'overdue']),
+                name='sales_invoice_open_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"Invoice #{self.id} - {self.order.customer.name}"
@@ -4,22 +4,45 @@ from django.views.decorators.http import require_http_methods
 from django.contrib import messages
 from .models import Customer, Order, Invoice
 from .forms import CustomerForm, OrderForm, InvoiceForm
+from erp_project import counters
+from erp_project.caching import cached_view
 from erp_project.export_import_utils import export_to_csv, export_to_pdf, import_from_csv
+from erp_project.pagination import CREATED_AT_SORTS, paginate
+from erp_project.querysets import QuerysetProfile
+from jobs.utils import enqueue_export, enqueue_import, wants_background
 
 # Dashboard View
+@cached_view('sales.Customer', 'sales.Order', 'sales.Invoice')
 def dashboard(request):
-    customers_count = Customer.objects.count()
-    orders_count = Order.objects.count()
-    invoices_count = Invoice.objects.count()
+    customers_count = counters.count(Customer)
+    orders_count = counters.count(Order)
+    invoices_count = counters.count(Invoice)
     return render(request, 'sales/dashboard.html', {
         'customers_count': customers_count,
         'orders_count': orders_count,
         'invoices_count': invoices_count
     })
 
+# Sort options for the list views (each backed by an index)
+ORDER_SORTS = {**CREATED_AT_SORTS, 'order_date': ('-order_date', '-id')}
+INVOICE_SORTS = {**CREATED_AT_SORTS, 'invoice_date': ('-invoice_date', '-id')}
+
+# Queryset profiles shared by the list views and the CSV/PDF exports
+CUSTOMER_PROFILE = QuerysetProfile(Customer, only=['id', 'name', 'email', 'phone', 'address', 'created_at'])
+ORDER_PROFILE = QuerysetProfile(
+    Order,
+    select_related=['customer'],
+    only=['id', 'customer', 'customer__name', 'order_date', 'total_amount', 'status', 'created_at'],
+)
+INVOICE_PROFILE = QuerysetProfile(
+    Invoice,
+    select_related=['order__customer'],
+    only=['id', 'order', 'order__customer', 'order__customer__name', 'invoice_date', 'amount', 'status', 'created_at'],
+)
+
 # Customer Views
 def customers_list(request):
-    customers = Customer.objects.all()
+    customers = paginate(request, CUSTOMER_PROFILE.queryset())
     return render(request, 'sales/customers.html', {'customers': customers})
 
 def customer_create(request):
@@ -50,7 +73,7 @@ def customer_delete(request, pk):
 
 # Order Views
 def orders_list(request):
-    orders = Order.objects.all()
+    orders = paginate(request, ORDER_PROFILE.queryset(), ORDER_SORTS)
     return render(request, 'sales/orders.html', {'orders': orders})
 
 def order_create(request):
@@ -81,7 +104,7 @@ def order_delete(request, pk):
 
 # Invoice Views
 def invoices_list(request):
-    invoices = Invoice.objects.all()
+    invoices = paginate(request, INVOICE_PROFILE.queryset(), INVOICE_SORTS)
     return render(request, 'sales/invoices.html', {'invoices': invoices})
 
 def invoice_create(request):
@@ -114,7 +137,10 @@ def invoice_delete(request, pk):
 
 def export_customers(request, format_type='csv'):
     fields = ['id', 'name', 'email', 'phone', 'address', 'created_at']
-    customers = Customer.objects.all()
+    customers = CUSTOMER_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('customers', CUSTOMER_PROFILE, fields, format_type, 'Customers List')
     
     if format_type == 'pdf':
         return export_to_pdf('customers', customers, fields, 'Customers List')
@@ -123,7 +149,10 @@ def export_customers(request, format_type='csv'):
 
 def export_orders(request, format_type='csv'):
     fields = ['id', 'customer__name', 'order_date', 'total_amount', 'status', 'created_at']
-    orders = Order.objects.all()
+    orders = ORDER_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('orders', ORDER_PROFILE, fields, format_type, 'Orders List')
     
     if format_type == 'pdf':
         return export_to_pdf('orders', orders, fields, 'Orders List')
@@ -132,7 +161,10 @@ def export_orders(request, format_type='csv'):
 
 def export_invoices(request, format_type='csv'):
     fields = ['id', 'order__customer__name', 'invoice_date', 'amount', 'status', 'created_at']
-    invoices = Invoice.objects.all()
+    invoices = INVOICE_PROFILE.queryset()
+    
+    if wants_background(request):
+        return enqueue_export('invoices', INVOICE_PROFILE, fields, format_type, 'Invoices List')
     
     if format_type == 'pdf':
         return export_to_pdf('invoices', invoices, fields, 'Invoices List')
@@ -153,11 +185,16 @@ def import_customers(request):
         'Address': 'address'
     }
     
-    success, message = import_from_csv(Customer, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    if wants_background(request):
+        job = enqueue_import(Customer, file, field_mapping)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('sales:customers_list')
+    
+    result = import_from_csv(Customer, file, field_mapping)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('sales:customers_list')
 
@@ -174,12 +211,18 @@ def import_orders(request):
         'Total Amount': 'total_amount',
         'Status': 'status'
     }
+    natural_keys = {'customer': 'email'}
+    
+    if wants_background(request):
+        job = enqueue_import(Order, file, field_mapping, natural_keys)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('sales:orders_list')
     
-    success, message = import_from_csv(Order, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    result = import_from_csv(Order, file, field_mapping, natural_keys=natural_keys)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('sales:orders_list')
 
@@ -197,10 +240,15 @@ def import_invoices(request):
         'Status': 'status'
     }
     
-    success, message = import_from_csv(Invoice, file, field_mapping)
-    if success:
-        messages.success(request, message)
+    if wants_background(request):
+        job = enqueue_import(Invoice, file, field_mapping)
+        messages.info(request, f'Import queued as job #{job.id}.')
+        return redirect('sales:invoices_list')
+    
+    result = import_from_csv(Invoice, file, field_mapping)
+    if result.success:
+        messages.success(request, result.message)
     else:
-        messages.error(request, message)
+        messages.error(request, result.message)
     
     return redirect('sales:invoices_list')
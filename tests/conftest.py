@@ -3,14 +3,38 @@ Pytest configuration and fixtures for the ERP project tests.
 """
 import os
 import pytest
+from django.conf import settings
+from django.core.cache import cache
 from django.test import Client
 from django.contrib.auth.models import User as DjangoUser
 from sales.models import Customer, Order, Invoice
 from inventory.models import Product, Supplier, PurchaseOrder
+from accounting.models import Ledger
 
 # Ensure Django settings are configured
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'erp_project.settings')
 
+@pytest.fixture(scope='session', autouse=True)
+def metrics_directory(tmp_path_factory):
+    """Keep the metrics files of the test processes, and their children, out of the project."""
+    directory = str(tmp_path_factory.mktemp('metrics'))
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv('METRICS_DIR', directory)
+        patch.setattr(settings, 'METRICS_DIR', directory)
+        yield directory
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Start every test with an empty cache; the database is rolled back but the cache is not."""
+    cache.clear()
+
+@pytest.fixture(autouse=True)
+def cache_timeouts(settings):
+    """Turn the page, report and counter caches on; the test process is the only one using its cache."""
+    settings.VIEW_CACHE_TIMEOUT = 10 * 60
+    settings.REPORT_CACHE_TIMEOUT = 24 * 60 * 60
+    settings.COUNTER_CACHE_TIMEOUT = 5 * 60
+
 @pytest.fixture
 def client():
     """Return a Django test client."""
@@ -91,3 +115,11 @@ def purchase_order(supplier):
         total_amount=500.00,
         status='pending'
     )
+
+@pytest.fixture
+def ledger():
+    """Create and return a test ledger."""
+    return Ledger.objects.create(
+        name='Cash',
+        description='Cash on hand'
+    )
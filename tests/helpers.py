@@ -0,0 +1,26 @@
+"""
+Shared helpers for the ERP project tests.
+"""
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+def count_queries(func):
+    """Call func and return how many queries it ran."""
+    with CaptureQueriesContext(connection) as captured:
+        func()
+    return len(captured.captured_queries)
+
+def assert_constant_queries(func, add_rows, sizes=(1, 10)):
+    """
+    Assert func runs the same number of queries whatever the row count.
+
+    add_rows(n) must create n more rows of the data func renders; func is
+    called after each step and the query counts are compared, which catches
+    N+1 patterns that a fixed expected number would hide.
+    """
+    counts = []
+    for size in sizes:
+        add_rows(size)
+        counts.append(count_queries(func))
+    assert len(set(counts)) == 1, f"Query count grows with the number of rows: {dict(zip(sizes, counts))}"
+    return counts[0]
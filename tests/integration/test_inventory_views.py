@@ -0,0 +1,113 @@
+"""
+Integration tests for inventory views.
+"""
+import pytest
+from decimal import Decimal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from inventory.models import Product
+from jobs.models import Job
+
+def _upload(content):
+    return SimpleUploadedFile('products.csv', content.encode('utf-8'), content_type='text/csv')
+
+@pytest.mark.django_db
+class TestImportProducts:
+    """Test cases for the product CSV import."""
+
+    def test_import_upserts_products_by_sku(self, client, product):
+        """Test new SKUs are created and existing SKUs are updated."""
+        content = (
+            'sku,name,price,quantity,description\n'
+            'TEST-001,Renamed,10.5,3,Updated\n'
+            'NEW-001,New Product,20,5,\n'
+        )
+
+        response = client.post(reverse('inventory:import_products'), {'file': _upload(content)})
+
+        data = response.json()
+        assert response.status_code == 200
+        assert (data['created'], data['updated'], data['rejected']) == (1, 1, [])
+        product.refresh_from_db()
+        assert product.name == 'Renamed'
+        assert product.price == Decimal('10.50')
+        assert Product.objects.get(sku='NEW-001').quantity == 5
+
+    def test_import_reports_rejected_rows_and_deduplicates(self, client):
+        """Test invalid rows are reported by line, and duplicate SKUs keep the last row and reject the rest."""
+        content = (
+            'sku,name,price,quantity\n'
+            'DUP-001,First,1,1\n'
+            'BAD-001,Bad Price,abc,1\n'
+            ',No Sku,1,1\n'
+            'DUP-001,Second,2,2.5\n'
+            'DUP-001,Last,3,3\n'
+        )
+
+        response = client.post(reverse('inventory:import_products'), {'file': _upload(content)})
+
+        data = response.json()
+        assert (data['created'], data['updated']) == (1, 0)
+        assert [reject['line'] for reject in data['rejected']] == [2, 3, 4, 5]
+        assert data['rejected'][0]['error'] == 'sku: DUP-001 is repeated on line 6, which was imported instead.'
+        assert 'price' in data['rejected'][1]['error']
+        assert 'quantity' in data['rejected'][3]['error']
+        assert Product.objects.get(sku='DUP-001').name == 'Last'
+
+    def test_import_reads_file_in_chunks(self, client, settings):
+        """Test large files are processed chunk by chunk with correct line numbers, counting each SKU once."""
+        settings.IMPORT_BATCH_SIZE = 2
+        content = 'sku,name,price,quantity\n' + ''.join(f'SKU-{i},Product {i},1,1\n' for i in range(5))
+        content += 'SKU-0,Repeated,1,1\nSKU-9,Bad,1,x\n'
+
+        response = client.post(reverse('inventory:import_products'), {'file': _upload(content)})
+
+        data = response.json()
+        assert (data['created'], data['updated']) == (5, 0)
+        assert [reject['line'] for reject in data['rejected']] == [2, 8]
+        assert data['rejected'][0]['error'] == 'sku: SKU-0 is repeated on line 7, which was imported instead.'
+        assert Product.objects.get(sku='SKU-0').name == 'Repeated'
+
+    def test_repeated_existing_sku_is_counted_once(self, client, product, settings):
+        """Test an existing SKU repeated across chunks is one update."""
+        settings.IMPORT_BATCH_SIZE = 1
+        content = 'sku,name,price,quantity\nTEST-001,First,1,1\nTEST-001,Second,2,2\n'
+
+        data = client.post(reverse('inventory:import_products'), {'file': _upload(content)}).json()
+
+        assert (data['created'], data['updated']) == (0, 1)
+        assert [reject['line'] for reject in data['rejected']] == [2]
+        product.refresh_from_db()
+        assert product.name == 'Second'
+
+@pytest.mark.django_db
+class TestExportProducts:
+    """Test cases for the product exports."""
+
+    def test_export_products_csv(self, client, product):
+        """Test the products CSV export streams the columns the import reads."""
+        response = client.get(reverse('inventory:export_products_csv'))
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'text/csv'
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        assert lines[0] == 'sku,name,description,price,quantity'
+        assert lines[1].startswith('TEST-001,Test Product,')
+
+    def test_export_products_csv_in_background(self, client, product):
+        """Test ?background=1 queues the products CSV export as a job."""
+        response = client.get(reverse('inventory:export_products_csv'), {'background': '1'})
+
+        assert response.status_code == 202
+        job = Job.objects.get()
+        assert (job.task, job.params['model'], job.params['fields']) == (
+            'export_csv', 'inventory.Product', ['sku', 'name', 'description', 'price', 'quantity'],
+        )
+
+    def test_export_products_pdf(self, client, product):
+        """Test the products PDF export returns a PDF document."""
+        response = client.get(reverse('inventory:export_products_pdf'))
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/pdf'
+        assert b''.join(response.streaming_content).startswith(b'%PDF')
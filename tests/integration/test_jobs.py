@@ -0,0 +1,98 @@
+"""
+Integration tests for background import/export jobs.
+"""
+import threading
+import time
+from datetime import timedelta
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.urls import reverse
+from django.utils import timezone
+from jobs.models import Job
+from jobs.tasks import TASKS
+from sales.models import Customer
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+@pytest.mark.django_db
+class TestJobs:
+    """Test cases for queueing, running and downloading jobs."""
+
+    def test_background_export_is_queued_and_downloadable(self, client, customer):
+        """Test an export can be queued, run by the worker and downloaded."""
+        response = client.get(reverse('sales:export_customers', args=['csv']), {'background': '1'})
+
+        assert response.status_code == 202
+        job = Job.objects.get(pk=response.json()['id'])
+        assert job.status == Job.QUEUED
+
+        call_command('run_jobs', '--once')
+
+        status = client.get(reverse('jobs:job_status', args=[job.id])).json()
+        assert status['status'] == Job.SUCCEEDED
+        assert (status['processed'], status['total']) == (1, 1)
+        download = client.get(status['download_url'])
+        content = b''.join(download.streaming_content).decode('utf-8')
+        assert 'Test Customer' in content
+
+    def test_background_import_is_queued(self, client):
+        """Test an import upload is stored and processed by the worker."""
+        upload = SimpleUploadedFile(
+            'customers.csv',
+            b'Name,Email,Phone,Address\nQueued,queued@example.com,555,Street\n',
+            content_type='text/csv'
+        )
+
+        response = client.post(reverse('sales:import_customers'), {'file': upload, 'background': '1'})
+
+        assert response.status_code == 302
+        assert not Customer.objects.exists()
+
+        call_command('run_jobs', '--once')
+
+        job = Job.objects.get()
+        assert job.status == Job.SUCCEEDED
+        assert job.result['created'] == 1
+        assert Customer.objects.get().name == 'Queued'
+
+    def test_failed_job_records_error(self):
+        """Test an unknown task marks the job as failed."""
+        job = Job.enqueue('no_such_task')
+
+        call_command('run_jobs', '--once')
+
+        job.refresh_from_db()
+        assert job.status == Job.FAILED
+        assert 'no_such_task' in job.message
+
+def _requeue_from_another_worker(requeued, older_than):
+    try:
+        requeued.append(Job.requeue_stale(timezone.now() - older_than))
+    finally:
+        connections.close_all()
+
+@pytest.mark.django_db(transaction=True)
+def test_long_running_atomic_job_is_not_requeued(monkeypatch):
+    """Test heartbeats keep a job that holds a transaction open from being taken for stale."""
+    requeued = []
+
+    def long_task(job):
+        with transaction.atomic():
+            Customer.objects.count()
+            time.sleep(0.6)
+            other = threading.Thread(target=_requeue_from_another_worker, args=(requeued, timedelta(seconds=0.3)))
+            other.start()
+            other.join()
+
+    monkeypatch.setitem(TASKS, 'long_task', long_task)
+    job = Job.enqueue('long_task')
+
+    call_command('run_jobs', '--once', '--heartbeat', '0.05')
+
+    job.refresh_from_db()
+    assert requeued == [0]
+    assert job.status == Job.SUCCEEDED
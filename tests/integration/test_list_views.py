@@ -0,0 +1,65 @@
+"""
+Integration tests for the query cost of list and export views.
+"""
+import itertools
+import pytest
+from django.urls import reverse
+from accounting.models import Transaction
+from erp_project.export_import_utils import rows_imported
+from hr.models import Attendance, Employee
+from sales.models import Customer, Invoice, Order
+from tests.helpers import assert_constant_queries
+
+_sequence = itertools.count()
+
+def _add_invoices(count):
+    for _ in range(count):
+        i = next(_sequence)
+        customer = Customer.objects.create(name=f'Customer {i}', email=f'c{i}@example.com', phone='555', address='Street')
+        order = Order.objects.create(customer=customer, order_date='2024-01-01', total_amount=10)
+        Invoice.objects.create(order=order, invoice_date='2024-01-02', amount=10)
+
+def _bulk_create(model, objs):
+    # Announce the rows as imports do, so caches of the model are expired
+    created = model.objects.bulk_create(objs)
+    rows_imported.send(sender=model, created=created, updated=[], previous={})
+
+def _add_transactions(ledger):
+    def add(count):
+        _bulk_create(Transaction, [
+            Transaction(ledger=ledger, date='2024-01-01', amount=1, description='Row')
+            for _ in range(count)
+        ])
+    return add
+
+def _add_attendance(count):
+    employee = Employee.objects.create(name='Emp', email='e@example.com', phone='555', position='Clerk', hire_date='2024-01-01')
+    _bulk_create(Attendance, [
+        Attendance(employee=employee, date='2024-01-01', status='Present') for _ in range(count)
+    ])
+
+@pytest.mark.django_db
+class TestListViewQueries:
+    """Test list and export views do not issue a query per row."""
+
+    @pytest.mark.parametrize('url', [
+        reverse('sales:invoices_list'),
+        reverse('sales:orders_list'),
+        reverse('sales:export_invoices', args=['csv']),
+        reverse('sales:export_invoices', args=['pdf']),
+    ])
+    def test_sales_views(self, client, url):
+        """Test invoice and order pages cost the same for 1 and 11 rows."""
+        assert_constant_queries(lambda: b''.join(client.get(url)), _add_invoices)
+
+    @pytest.mark.parametrize('url', [
+        reverse('accounting:transactions_list'),
+        reverse('accounting:export_transactions', args=['pdf']),
+    ])
+    def test_transaction_views(self, client, ledger, url):
+        """Test transaction pages cost the same for 1 and 11 rows."""
+        assert_constant_queries(lambda: client.get(url), _add_transactions(ledger))
+
+    def test_attendance_list(self, client):
+        """Test the attendance page costs the same for 1 and 11 rows."""
+        assert_constant_queries(lambda: client.get(reverse('hr:attendance_list')), _add_attendance)
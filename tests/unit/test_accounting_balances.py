@@ -0,0 +1,92 @@
+"""
+Unit tests for the LedgerBalance summary table.
+"""
+import io
+from datetime import date
+from decimal import Decimal
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from accounting.balances import rebuild_balances, verify_balances
+from accounting.models import Ledger, LedgerBalance, Transaction
+from erp_project.export_import_utils import import_from_csv
+
+TRANSACTION_MAPPING = {
+    'ID': 'id', 'Ledger': 'ledger', 'Date': 'date', 'Amount': 'amount',
+    'Description': 'description', 'Type': 'transaction_type',
+}
+
+def _transaction(ledger, day, amount, transaction_type='expense'):
+    return Transaction.objects.create(
+        ledger=ledger, date=day, amount=Decimal(amount),
+        description='Test', transaction_type=transaction_type,
+    )
+
+def _balance(ledger, period):
+    return LedgerBalance.objects.get(ledger=ledger, period=period)
+
+@pytest.mark.django_db
+class TestLedgerBalances:
+    """Test cases for incremental balance maintenance."""
+
+    def test_create_update_and_delete(self, ledger):
+        """Test that single-row writes keep the monthly totals in step."""
+        txn = _transaction(ledger, date(2024, 1, 15), '100.00')
+        _transaction(ledger, date(2024, 1, 20), '40.00', 'income')
+        balance = _balance(ledger, date(2024, 1, 1))
+        assert (balance.debit, balance.credit, balance.transaction_count) == (100, 40, 2)
+
+        txn.date = date(2024, 2, 3)
+        txn.amount = Decimal('30.00')
+        txn.save()
+        assert _balance(ledger, date(2024, 1, 1)).debit == 0
+        assert _balance(ledger, date(2024, 2, 1)).debit == 30
+
+        txn.delete()
+        assert _balance(ledger, date(2024, 2, 1)).transaction_count == 0
+        assert verify_balances() == []
+
+    def test_deleting_ledger_cascades(self, ledger):
+        """Test that deleting a ledger does not recreate its balances."""
+        _transaction(ledger, date(2024, 1, 15), '100.00')
+        ledger.delete()
+        assert not LedgerBalance.objects.exists()
+
+    def test_bulk_import_updates_balances(self, ledger):
+        """Test that rows written by import_from_csv are counted."""
+        existing = _transaction(ledger, date(2024, 1, 15), '100.00')
+        csv_data = (
+            'ID,Ledger,Date,Amount,Description,Type\n'
+            f'{existing.pk},{ledger.pk},2024-03-01,25.00,Moved,expense\n'
+            f',{ledger.pk},2024-01-05,10.00,New,income\n'
+        )
+        result = import_from_csv(Transaction, io.BytesIO(csv_data.encode()), TRANSACTION_MAPPING)
+        assert result.success, result.message
+
+        january = _balance(ledger, date(2024, 1, 1))
+        assert (january.debit, january.credit, january.transaction_count) == (0, 10, 1)
+        assert _balance(ledger, date(2024, 3, 1)).debit == 25
+        assert verify_balances() == []
+
+    def test_rebuild_and_verify_command(self, ledger):
+        """Test that --verify reports drift and a rebuild repairs it."""
+        _transaction(ledger, date(2024, 1, 15), '100.00')
+        LedgerBalance.objects.update(debit=5)
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_balances', verify=True, stdout=io.StringIO(), stderr=io.StringIO())
+
+        call_command('rebuild_balances', stdout=io.StringIO())
+        assert _balance(ledger, date(2024, 1, 1)).debit == 100
+        assert rebuild_balances() == 1
+        call_command('rebuild_balances', verify=True, stdout=io.StringIO())
+
+    def test_trial_balance_uses_balances(self, client, ledger):
+        """Test that the trial balance report reads the summary table."""
+        other = Ledger.objects.create(name='Bank')
+        _transaction(other, date.today(), '12.00', 'income')
+        response = client.get('/accounting/reports/generate/trial_balance/')
+        assert response.status_code == 200
+        rows = {row['name']: row for row in response.context['ledgers']}
+        assert rows['Bank']['credit'] == 12
+        assert rows['Cash']['debit'] == 0
@@ -0,0 +1,108 @@
+"""
+Unit tests for report date ranges and the report cache.
+"""
+from datetime import date
+from decimal import Decimal
+import pytest
+from accounting.models import Ledger, Transaction
+from accounting.reports import InvalidRange, cached_report, period_bounds, report_range
+
+TODAY = date(2024, 5, 15)
+
+class TestReportRange:
+    """Test cases for parsing report query parameters."""
+
+    def test_defaults_to_last_30_days(self):
+        assert report_range({}, today=TODAY) == (date(2024, 4, 15), TODAY)
+
+    def test_explicit_range(self):
+        params = {'start': '2024-01-01', 'end': '2024-02-10'}
+        assert report_range(params, today=TODAY) == (date(2024, 1, 1), date(2024, 2, 10))
+
+    def test_reversed_and_malformed_dates(self):
+        assert report_range({'start': '2024-03-01', 'end': '2024-01-01'}) == (date(2024, 1, 1), date(2024, 3, 1))
+        for params in ({'start': 'nope'}, {'end': '2024-13-45'}, {'start': '2024-02-30', 'period': 'month'}):
+            with pytest.raises(InvalidRange):
+                report_range(params, today=TODAY)
+
+    def test_dates_and_spans_are_bounded(self):
+        """Test far-off dates and ranges spanning centuries are rejected."""
+        for params in ({'end': '9999-12-31'}, {'start': '0001-01-01'}, {'start': '1950-01-01', 'end': '2024-01-01'}):
+            with pytest.raises(InvalidRange):
+                report_range(params, today=TODAY)
+        assert report_range({'start': '2015-01-01', 'end': '2024-12-31'}) == (date(2015, 1, 1), date(2024, 12, 31))
+
+    def test_periods(self):
+        assert report_range({'period': 'month'}, today=TODAY) == (date(2024, 5, 1), date(2024, 5, 31))
+        assert report_range({'period': 'quarter', 'start': '2023-11-20'}) == (date(2023, 10, 1), date(2023, 12, 31))
+        assert report_range({'period': 'year', 'start': '2024-02-29'}) == (date(2024, 1, 1), date(2024, 12, 31))
+        assert period_bounds('month', date(2024, 12, 3)) == (date(2024, 12, 1), date(2024, 12, 31))
+        assert period_bounds('month', date(2024, 2, 3)) == (date(2024, 2, 1), date(2024, 2, 29))
+
+@pytest.mark.django_db
+class TestReportCache:
+    """Test cases for cached report results."""
+
+    URL = '/accounting/reports/generate/trial_balance/?start=2024-01-01&end=2024-01-31'
+
+    def _credit(self, client):
+        response = client.get(self.URL)
+        assert response.status_code == 200
+        return {row['name']: row['credit'] for row in response.context['ledgers']}['Cash']
+
+    def _income(self, ledger, day, amount):
+        Transaction.objects.create(
+            ledger=ledger, date=day, amount=Decimal(amount), description='Test', transaction_type='income'
+        )
+
+    def test_served_from_cache_until_range_changes(self, client, ledger, django_assert_num_queries):
+        self._income(ledger, date(2024, 1, 10), '10.00')
+        assert self._credit(client) == 10
+
+        with django_assert_num_queries(0):
+            assert self._credit(client) == 10
+
+        # A write outside the range leaves the cached report alone
+        self._income(ledger, date(2024, 3, 10), '5.00')
+        with django_assert_num_queries(0):
+            assert self._credit(client) == 10
+
+        self._income(ledger, date(2024, 1, 20), '7.00')
+        assert self._credit(client) == 17
+
+    def test_ledger_changes_expire_reports(self, client, ledger):
+        assert self._credit(client) == 0
+        ledger.name = 'Petty cash'
+        ledger.save()
+        Ledger.objects.create(name='Cash')
+        assert self._credit(client) == 0
+        response = client.get(self.URL)
+        assert {row['name'] for row in response.context['ledgers']} == {'Cash', 'Petty cash'}
+
+    def test_report_cached_before_commit_is_not_served_after(self, ledger, django_capture_on_commit_callbacks):
+        """Test the month's token is replaced again when the write commits."""
+        january = (date(2024, 1, 1), date(2024, 1, 31))
+        with django_capture_on_commit_callbacks(execute=True):
+            self._income(ledger, date(2024, 1, 10), '10.00')
+            # A concurrent request, not yet seeing the write, caches its result
+            cached_report('trial_balance', *january, lambda start, end: 'before commit')
+
+        assert cached_report('trial_balance', *january, lambda start, end: 'after commit') == 'after commit'
+
+    def test_balance_sheet_covers_history_before_the_range(self, client):
+        """Test the all-history report is computed up to end whatever the start."""
+        self._income(Ledger.objects.create(name='Sales', type='revenue'), date(2023, 6, 1), '4.00')
+        url = '/accounting/reports/generate/balance_sheet/'
+        for start in ('2024-01-01', '2024-01-15'):
+            response = client.get(url, {'start': start, 'end': '2024-01-31'})
+            assert response.context['retained_earnings'] == 4
+
+    def test_invalid_range_is_a_bad_request(self, client):
+        """Test out-of-range and malformed dates are answered with 400 instead of failing."""
+        url = '/accounting/reports/generate/trial_balance/'
+        assert client.get(url, {'end': '9999-12-31'}).status_code == 400
+        assert client.get(url, {'start': '0001-01-01'}).status_code == 400
+        assert client.get(url, {'start': 'yesterday'}).status_code == 400
+
+    def test_unknown_report_type(self, client):
+        assert client.get('/accounting/reports/generate/nope/').status_code == 404
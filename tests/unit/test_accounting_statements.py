@@ -0,0 +1,90 @@
+"""
+Unit tests for the financial statement engine.
+"""
+from datetime import date
+from decimal import Decimal
+import pytest
+from accounting.models import Ledger, Transaction
+from accounting.statements import Statements, statement_activity
+
+RANGES = [
+    (date(2024, 1, 15), date(2024, 3, 10)),
+    (date(2024, 1, 1), date(2024, 2, 29)),
+    (date(2024, 1, 12), date(2024, 1, 25)),
+    (date(2024, 1, 12), date(2024, 1, 31)),
+    (date(2024, 2, 1), date(2024, 3, 31)),
+    (date(2024, 3, 6), date(2024, 4, 30)),
+]
+
+def _transaction(ledger, day, amount, transaction_type='expense'):
+    return Transaction.objects.create(
+        ledger=ledger, date=day, amount=Decimal(amount),
+        description='Test', transaction_type=transaction_type,
+    )
+
+@pytest.fixture
+def ledgers():
+    return {
+        ledger_type: Ledger.objects.create(name=ledger_type.title(), type=ledger_type)
+        for ledger_type, _ in Ledger.ACCOUNT_TYPES
+    }
+
+@pytest.mark.django_db
+class TestStatements:
+    """Test cases for the statement engine."""
+
+    @pytest.mark.parametrize('start,end', RANGES)
+    def test_balances_match_full_scan(self, ledger, start, end):
+        """Test that summary rows plus edge scans equal a scan of every transaction."""
+        for day, amount in [(10, '1.00'), (20, '2.00')]:
+            for month in (1, 2, 3):
+                _transaction(ledger, date(2024, month, day), amount)
+                _transaction(ledger, date(2024, month, day + 5), amount, 'income')
+
+        assert statement_activity(start, end) == statement_activity(start, end, use_balances=False)
+
+    def test_edge_months_are_scanned(self, ledger):
+        """Test partial months at the range edges only count the days inside it."""
+        _transaction(ledger, date(2024, 1, 10), '1.00')
+        _transaction(ledger, date(2024, 1, 20), '2.00')
+        _transaction(ledger, date(2024, 2, 15), '4.00')
+        _transaction(ledger, date(2024, 3, 5), '8.00')
+        _transaction(ledger, date(2024, 3, 25), '16.00')
+
+        activity = statement_activity(date(2024, 1, 15), date(2024, 3, 10))[ledger.pk]
+        assert activity['period_debit'] == 14
+        assert activity['debit'] == 15
+
+    def test_statements(self, ledgers, django_assert_num_queries):
+        """Test that every statement comes from one ledger query plus one activity pass."""
+        _transaction(ledgers['revenue'], date(2024, 2, 10), '500.00', 'income')
+        _transaction(ledgers['expense'], date(2024, 2, 12), '200.00')
+        _transaction(ledgers['asset'], date(2024, 2, 14), '150.00')
+        _transaction(ledgers['liability'], date(2024, 2, 16), '1000.00', 'income')
+        _transaction(ledgers['equity'], date(2024, 1, 5), '300.00', 'income')
+
+        # ledgers + LedgerBalance rows + edge-day scan
+        with django_assert_num_queries(3):
+            statements = Statements(date(2024, 2, 1), date(2024, 2, 20)).as_dict()
+
+        assert statements['income_statement'] == {
+            'revenue': 500, 'expenses': 200, 'net_income': 300,
+        }
+        assert statements['balance_sheet']['assets'] == 150
+        assert statements['balance_sheet']['equity'] == 300
+        assert statements['balance_sheet']['total_liabilities_and_equity'] == 1600
+        assert statements['cash_flow'] == {
+            'operating_cash_flow': 300,
+            'investing_cash_flow': -150,
+            'financing_cash_flow': 1000,
+            'net_cash_flow': 1150,
+        }
+        trial = {row['name']: row for row in statements['trial_balance']['ledgers']}
+        assert trial['Equity']['credit'] == 0
+        assert trial['Revenue']['credit'] == 500
+
+    @pytest.mark.parametrize('report_type', ['income_statement', 'balance_sheet', 'cash_flow'])
+    def test_report_pages_render(self, client, ledgers, report_type):
+        _transaction(ledgers['revenue'], date.today(), '50.00', 'income')
+        response = client.get(f'/accounting/reports/generate/{report_type}/?period=month')
+        assert response.status_code == 200
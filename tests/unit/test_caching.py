@@ -0,0 +1,127 @@
+"""
+Unit tests for per-view and fragment caching.
+"""
+import os
+import subprocess
+import sys
+import pytest
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.template import engines
+from erp_project import caching, counters
+from erp_project.caching import model_version
+from sales.models import Customer, Order
+
+def _customer(name='Customer'):
+    return Customer.objects.create(name=name, email='c@example.com', phone='555', address='Street')
+
+@pytest.mark.django_db
+class TestModelVersions:
+    """Test cases for model version tokens."""
+
+    def test_writes_change_only_their_model(self, customer):
+        orders, customers = model_version('sales.Order'), model_version('sales.Customer')
+        customer.name = 'Renamed'
+        customer.save()
+        assert model_version('sales.Order') == orders
+        assert model_version('sales.Customer') != customers
+
+@pytest.mark.django_db
+class TestCachedView:
+    """Test cases for whole-page caching."""
+
+    def test_repeat_views_skip_orm_and_rendering(self, client, customer, django_assert_num_queries):
+        first = client.get('/')
+        assert first.templates
+        with django_assert_num_queries(0):
+            second = client.get('/')
+        assert not second.templates
+        assert second.content == first.content
+
+    def test_model_write_expires_page(self, client, customer, django_capture_on_commit_callbacks):
+        client.get('/')
+        with django_capture_on_commit_callbacks(execute=True):
+            _customer('Another')
+        response = client.get('/')
+        assert response.context['customers_count'] == 2
+
+    def test_disabled_with_zero_timeout(self, client, settings):
+        settings.VIEW_CACHE_TIMEOUT = 0
+        client.get('/')
+        assert client.get('/').templates
+
+    def test_pages_with_messages_are_not_cached(self, client, customer):
+        client.cookies['messages'] = 'pending'
+        client.get('/')
+        assert client.get('/').templates
+
+@pytest.mark.django_db
+class TestFragmentCache:
+    """Test cases for list table fragments."""
+
+    def test_table_fragment_is_reused(self, client, order, django_assert_num_queries):
+        template = engines['django'].from_string(
+            "{% load cache model_cache %}{% model_version 'sales.Order' as version %}{% fragment_timeout as timeout %}"
+            "{% cache timeout orders version %}{% for order in orders %}{{ order.pk }}{% endfor %}{% endcache %}"
+        )
+        assert template.render({'orders': Order.objects.all()}) == str(order.pk)
+        with django_assert_num_queries(0):
+            assert template.render({'orders': Order.objects.all()}) == str(order.pk)
+
+        Order.objects.create(customer=order.customer, order_date='2024-01-02', total_amount=1)
+        assert template.render({'orders': Order.objects.order_by('id')}).count(str(order.pk)) == 1
+        assert len(template.render({'orders': Order.objects.all()})) > len(str(order.pk))
+
+    def test_orders_list_reuses_table(self, client, order, django_assert_max_num_queries):
+        client.get('/orders/')
+        with django_assert_max_num_queries(0):
+            response = client.get('/orders/')
+        assert f'#{order.id}' in response.content.decode()
+
+def _settings(**env):
+    timeouts = ('VIEW_CACHE_TIMEOUT', 'REPORT_CACHE_TIMEOUT', 'COUNTER_CACHE_TIMEOUT')
+    env = {**{k: v for k, v in os.environ.items() if k not in timeouts}, 'SECRET_KEY': 'x', 'DEBUG': 'True', **env}
+    return subprocess.run(
+        [sys.executable, '-c', 'from erp_project import settings as s; '
+                               'print(s.VIEW_CACHE_TIMEOUT, s.REPORT_CACHE_TIMEOUT, s.COUNTER_CACHE_TIMEOUT)'],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+
+@pytest.mark.django_db
+class TestSharedCache:
+    """Test cases for invalidation across processes, each with its own cache client."""
+
+    @pytest.fixture
+    def processes(self, tmp_path, monkeypatch):
+        """Return a function switching the caching modules to the client of a web or job process."""
+        clients = {name: FileBasedCache(str(tmp_path / 'cache'), {}) for name in ('web', 'jobs')}
+
+        def use(name):
+            monkeypatch.setattr(caching, 'cache', clients[name])
+            monkeypatch.setattr(counters, 'cache', clients[name])
+        return use
+
+    def test_write_in_one_process_expires_pages_of_another(self, client, customer, processes,
+                                                           django_capture_on_commit_callbacks):
+        """Test a row imported by the job worker expires the page and count cached by a web worker."""
+        processes('web')
+        client.get('/')
+        assert not client.get('/').templates
+
+        processes('jobs')
+        with django_capture_on_commit_callbacks(execute=True):
+            _customer('Imported')
+
+        processes('web')
+        response = client.get('/')
+        assert response.templates
+        assert response.context['customers_count'] == 2
+
+    def test_per_process_backends_turn_the_caches_off(self):
+        """Test locmem disables the invalidated caches and rejects turning them on."""
+        assert _settings(CACHE_BACKEND='locmem').stdout.split() == ['0', '0', '0']
+        assert _settings(CACHE_BACKEND='db').stdout.split() == ['600', '86400', '300']
+
+        process = _settings(CACHE_BACKEND='locmem', VIEW_CACHE_TIMEOUT='60')
+        assert process.returncode != 0
+        assert 'VIEW_CACHE_TIMEOUT requires CACHE_BACKEND' in process.stderr
@@ -0,0 +1,78 @@
+"""
+Unit tests for the cached dashboard counters.
+"""
+import io
+import time
+import pytest
+from django.core.cache.backends import filebased
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.management import call_command
+from erp_project import counters
+from erp_project.export_import_utils import import_from_csv
+from sales.models import Customer, Order
+
+CUSTOMER_MAPPING = {'Name': 'name', 'Email': 'email', 'Phone': 'phone', 'Address': 'address'}
+
+def _customer(i):
+    return Customer.objects.create(name=f'C{i}', email=f'c{i}@example.com', phone='555', address='Street')
+
+@pytest.mark.django_db
+class TestCounters:
+    """Test cases for signal-maintained counters."""
+
+    def test_served_from_cache(self, django_assert_num_queries):
+        _customer(1)
+        with django_assert_num_queries(1):
+            assert counters.count(Customer) == 1
+        with django_assert_num_queries(0):
+            assert counters.count(Customer) == 1
+
+    def test_signals_adjust_counts_on_commit(self, django_capture_on_commit_callbacks, django_assert_num_queries):
+        assert counters.count(Customer) == 0
+        with django_capture_on_commit_callbacks(execute=True):
+            customer = _customer(1)
+            _customer(2)
+        with django_capture_on_commit_callbacks(execute=True):
+            customer.delete()
+        with django_capture_on_commit_callbacks(execute=True):
+            import_from_csv(Customer, io.BytesIO(b'Name,Email,Phone,Address\nA,a@example.com,1,X\n'), CUSTOMER_MAPPING)
+
+        with django_assert_num_queries(0):
+            assert counters.count(Customer) == 2
+
+    def test_uncommitted_writes_are_not_counted(self, django_capture_on_commit_callbacks):
+        assert counters.count(Customer) == 0
+        with django_capture_on_commit_callbacks(execute=False):
+            _customer(1)
+        assert counters.count(Customer) == 0
+
+    def test_adjusted_count_keeps_the_counter_timeout(self, settings, tmp_path, monkeypatch,
+                                                      django_capture_on_commit_callbacks):
+        # FileBasedCache.incr is BaseCache's get-then-set with the backend's own timeout
+        monkeypatch.setattr(counters, 'cache', FileBasedCache(str(tmp_path / 'cache'), {'TIMEOUT': 3600}))
+        settings.COUNTER_CACHE_TIMEOUT = 60
+        assert counters.count(Customer) == 0
+        with django_capture_on_commit_callbacks(execute=True):
+            _customer(1)
+        assert counters.count(Customer) == 1
+
+        later = time.time() + 120
+        monkeypatch.setattr(filebased.time, 'time', lambda: later)
+        assert counters.cache.get(counters._key(Customer)) is None
+
+    def test_reconcile_command(self, customer):
+        assert counters.count(Customer) == 1
+        Customer.objects.bulk_create([Customer(name='B', email='b@example.com', phone='1', address='X')])
+        out = io.StringIO()
+        call_command('reconcile_counters', stdout=out)
+        assert 'sales.Customer: cached 1, actual 2' in out.getvalue()
+        assert counters.count(Customer) == 2
+
+    def test_dashboard_uses_counters(self, client, order, django_assert_num_queries):
+        response = client.get('/')
+        assert response.context['orders_count'] == Order.objects.count() == 1
+        with django_assert_num_queries(0):
+            client.get('/')
+        client.get('/accounting/')
+        with django_assert_num_queries(0):
+            client.get('/accounting/')
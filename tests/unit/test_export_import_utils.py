@@ -0,0 +1,296 @@
+"""
+Unit tests for the shared export/import utilities.
+"""
+import csv
+import io
+import re
+import pytest
+from decimal import Decimal
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.http import FileResponse, StreamingHttpResponse
+from accounting.models import Ledger, Transaction
+from sales.models import Customer
+from erp_project.export_import_utils import (
+    ForeignKeyResolver, export_to_csv, export_to_pdf, import_from_csv, iter_csv, keyset_rows, pdf_rows,
+    write_pdf_pages,
+)
+from erp_project import export_import_utils
+
+TRANSACTION_FIELDS = ['id', 'ledger__name', 'date', 'amount', 'transaction_type']
+
+TRANSACTION_MAPPING = {
+    'Ledger': 'ledger',
+    'Date': 'date',
+    'Amount': 'amount',
+    'Description': 'description',
+    'Transaction Type': 'transaction_type'
+}
+
+CUSTOMER_MAPPING = {
+    'ID': 'id',
+    'Name': 'name',
+    'Email': 'email',
+    'Phone': 'phone',
+    'Address': 'address'
+}
+
+def _upload(content):
+    return SimpleUploadedFile('import.csv', content.encode('utf-8'), content_type='text/csv')
+
+def _read_csv(response):
+    content = b''.join(response.streaming_content).decode('utf-8')
+    return list(csv.reader(io.StringIO(content)))
+
+def _page_count(pdf):
+    return len(re.findall(rb'/Type /Page\b(?!s)', pdf))
+
+@pytest.mark.django_db
+class TestExportToCsv:
+    """Test cases for the streaming CSV export."""
+
+    def test_export_streams_rows_with_related_fields(self, ledger):
+        """Test related '__' paths are resolved in the exported rows."""
+        Transaction.objects.create(ledger=ledger, date='2024-01-01', amount=Decimal('10.50'), description='Rent')
+
+        response = export_to_csv('transactions', Transaction.objects.all(), TRANSACTION_FIELDS)
+
+        assert isinstance(response, StreamingHttpResponse)
+        assert response['Content-Type'] == 'text/csv'
+        rows = _read_csv(response)
+        assert rows[0] == TRANSACTION_FIELDS
+        assert rows[1][1:] == ['Cash', '2024-01-01', '10.50', 'expense']
+
+    def test_export_runs_single_query(self, ledger, django_assert_num_queries):
+        """Test the export does not issue a query per row."""
+        Transaction.objects.bulk_create([
+            Transaction(ledger=ledger, date='2024-01-01', amount=i, description='Bulk')
+            for i in range(50)
+        ])
+
+        with django_assert_num_queries(1):
+            rows = list(csv.reader(io.StringIO(''.join(iter_csv(Transaction.objects.all(), TRANSACTION_FIELDS)))))
+
+        assert len(rows) == 51
+
+    def test_iter_csv_yields_bounded_chunks(self, ledger):
+        """Test the CSV text is emitted in blocks instead of one string."""
+        Transaction.objects.bulk_create([
+            Transaction(ledger=ledger, date='2024-01-01', amount=i, description='Bulk')
+            for i in range(200)
+        ])
+
+        chunks = list(iter_csv(Transaction.objects.all(), TRANSACTION_FIELDS, buffer_size=512))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) < 1024 for chunk in chunks)
+
+def _transactions(ledger, count):
+    Transaction.objects.bulk_create([
+        Transaction(ledger=ledger, date=f'2024-01-0{i % 3 + 1}', amount=i, description='Bulk')
+        for i in range(count)
+    ])
+
+@pytest.mark.django_db
+class TestKeysetRows:
+    """Test cases for the keyset-chunked export reader used behind transaction poolers."""
+
+    def test_rows_are_read_one_query_per_chunk(self, ledger, django_assert_num_queries):
+        """Test every row is read once, in primary key order, chunk_size rows per query."""
+        _transactions(ledger, 25)
+
+        with django_assert_num_queries(3):
+            rows = list(keyset_rows(Transaction.objects.all(), TRANSACTION_FIELDS, chunk_size=10))
+
+        assert rows == list(Transaction.objects.order_by('id').values_list(*TRANSACTION_FIELDS))
+
+    def test_queryset_ordering_is_kept_across_ties(self, ledger):
+        """Test chunks resume after the last row's (date, id) key when dates repeat."""
+        _transactions(ledger, 25)
+        queryset = Transaction.objects.filter(amount__gte=2).order_by('-date')
+
+        rows = list(keyset_rows(queryset, ['id', 'date'], chunk_size=4))
+
+        assert rows == list(queryset.order_by('-date', 'id').values_list('id', 'date'))
+
+    def test_related_ordering_falls_back_to_one_query(self, ledger, caplog, django_assert_num_queries):
+        """Test querysets that cannot be resumed by key are still exported whole."""
+        _transactions(ledger, 5)
+
+        with django_assert_num_queries(1):
+            rows = list(keyset_rows(Transaction.objects.order_by('ledger'), ['id'], chunk_size=2))
+
+        assert len(rows) == 5
+        assert 'cannot be read in keyset chunks' in caplog.text
+
+@pytest.mark.django_db
+class TestExportToPdf:
+    """Test cases for the paged PDF export."""
+
+    def test_export_streams_a_pdf_file(self, ledger, django_assert_num_queries):
+        """Test the export reads rows in one query and returns a file response."""
+        Transaction.objects.bulk_create([
+            Transaction(ledger=ledger, date='2024-01-01', amount=i, description='Bulk')
+            for i in range(50)
+        ])
+
+        with django_assert_num_queries(1):
+            response = export_to_pdf('transactions', Transaction.objects.all(), TRANSACTION_FIELDS, 'Transactions')
+
+        assert isinstance(response, FileResponse)
+        assert 'attachment' in response['Content-Disposition']
+        assert b''.join(response.streaming_content).startswith(b'%PDF')
+
+    def test_rows_are_split_into_pages(self):
+        """Test each page holds at most rows_per_page rows and progress is reported per page."""
+        output = io.BytesIO()
+        seen = []
+
+        write_pdf_pages(
+            output, ([i, 'x' * 500] for i in range(25)), ['ID', 'Text'], 'Paged',
+            rows_per_page=10, progress=seen.append,
+        )
+
+        assert _page_count(output.getvalue()) == 3
+        assert seen == [10, 20, 25]
+
+    def test_parallel_render_matches_serial_pages(self, monkeypatch):
+        """Test parts rendered by worker processes merge into one correctly numbered document."""
+        from pypdf import PdfReader
+
+        monkeypatch.setattr(export_import_utils, 'PDF_PAGES_PER_PART', 2)
+        rows = [[i, f'row {i}'] for i in range(23)]
+        serial, parallel = io.BytesIO(), io.BytesIO()
+        seen = []
+
+        write_pdf_pages(serial, iter(rows), ['ID', 'Text'], 'Paged', rows_per_page=5, workers=1)
+        write_pdf_pages(
+            parallel, iter(rows), ['ID', 'Text'], 'Paged', rows_per_page=5, workers=2, progress=seen.append,
+        )
+
+        pages = [page.extract_text() for page in PdfReader(parallel).pages]
+        assert len(pages) == _page_count(serial.getvalue()) == 5
+        assert all('ID' in text and f'Page {number}' in text for number, text in enumerate(pages, start=1))
+        assert 'row 22' in pages[-1]
+        assert seen == [10, 20, 23]
+
+    def test_empty_export_has_a_header_page(self):
+        """Test an export with no rows still renders one page."""
+        output = io.BytesIO()
+        write_pdf_pages(output, iter([]), ['ID'], 'Empty')
+        assert _page_count(output.getvalue()) == 1
+
+    def test_cells_are_truncated_to_one_line(self):
+        """Test long and multi-line values are cut down to fit their column."""
+        assert export_import_utils._truncate('a\nb', 10) == 'a b'
+        assert export_import_utils._truncate('x' * 50, 10) == 'xxxxxxx...'
+        assert export_import_utils._truncate(None, 10) == ''
+
+    def test_pdf_rows_follows_related_paths_on_objects(self, ledger):
+        """Test plain iterables of objects are read with the same '__' paths."""
+        txn = Transaction(ledger=ledger, date='2024-01-01', amount=1, description='Rent')
+        assert list(pdf_rows([txn], ['ledger__name', 'description'])) == [['Cash', 'Rent']]
+
+@pytest.mark.django_db
+class TestImportFromCsv:
+    """Test cases for the batched CSV import."""
+
+    def test_import_creates_and_updates_in_batches(self, customer, django_assert_max_num_queries):
+        """Test rows are split into inserts and updates and written in bulk."""
+        rows = ''.join(f',Customer {i},c{i}@example.com,555,Street {i}\n' for i in range(20))
+        content = f'ID,Name,Email,Phone,Address\n{customer.id},Renamed,test@example.com,555,Street\n{rows}'
+
+        # savepoint + per-batch (id lookup, insert, update) for two batches
+        with django_assert_max_num_queries(8):
+            result = import_from_csv(Customer, _upload(content), CUSTOMER_MAPPING, batch_size=15)
+
+        assert result.success
+        assert (result.created, result.updated, result.rejected) == (20, 1, [])
+        customer.refresh_from_db()
+        assert customer.name == 'Renamed'
+        assert Customer.objects.count() == 21
+
+    def test_import_rejects_invalid_rows_with_line_numbers(self):
+        """Test invalid rows are reported and valid rows are still imported."""
+        content = (
+            'Name,Email,Phone,Address\n'
+            'Good,good@example.com,555,Street\n'
+            'Bad,not-an-email,555,Street\n'
+        )
+
+        result = import_from_csv(Customer, _upload(content), CUSTOMER_MAPPING)
+
+        assert result.success
+        assert result.created == 1
+        assert [line for line, _ in result.rejected] == [3]
+        assert 'email' in result.rejected[0][1]
+        assert 'Rejected 1 rows' in result.message
+
+    def test_import_reports_progress_per_batch(self):
+        """Test the progress callback sees the counters grow batch by batch."""
+        content = 'Name,Email,Phone,Address\n' + ''.join(
+            f'Customer {i},c{i}@example.com,555,Street\n' for i in range(5)
+        )
+        seen = []
+
+        result = import_from_csv(Customer, _upload(content), CUSTOMER_MAPPING, batch_size=2,
+                                 progress=lambda r: seen.append((r.batches, r.rows_read, r.created)))
+
+        assert seen == [(1, 2, 2), (2, 4, 4), (3, 5, 5)]
+        assert result.total_bytes == len(content)
+
+    def test_import_rejects_unknown_foreign_keys(self, ledger):
+        """Test rows pointing at missing parents are rejected up front."""
+        content = (
+            'Ledger,Date,Amount,Description,Transaction Type\n'
+            f'{ledger.id},2024-01-01,10.00,Rent,expense\n'
+            '999999,2024-01-01,10.00,Rent,expense\n'
+        )
+        result = import_from_csv(Transaction, _upload(content), TRANSACTION_MAPPING)
+
+        assert result.created == 1
+        assert [line for line, _ in result.rejected] == [3]
+        assert Transaction.objects.get().ledger == ledger
+
+    def test_import_resolves_natural_keys_once_per_batch(self, ledger, django_assert_max_num_queries):
+        """Test foreign keys given by id or name share one lookup per batch."""
+        bank = Ledger.objects.create(name='Bank')
+        rows = ''.join(
+            f'{ref},2024-01-01,{i}.00,Row {i},income\n'
+            for i, ref in enumerate(['Cash', str(bank.id), 'Missing'] * 10)
+        )
+        content = 'Ledger,Date,Amount,Description,Transaction Type\n' + rows
+
+        # savepoint + ledger lookup + insert for the single batch, then one
+        # balance update per ledger and a savepoint + insert for the new balances
+        with django_assert_max_num_queries(9):
+            result = import_from_csv(Transaction, _upload(content), TRANSACTION_MAPPING,
+                                     natural_keys={'ledger': 'name'})
+
+        assert result.created == 20
+        assert len(result.rejected) == 10
+        assert "'Missing' does not exist" in result.rejected[0][1]
+        assert Transaction.objects.filter(ledger=ledger).count() == 10
+        assert Transaction.objects.filter(ledger=bank).count() == 10
+
+@pytest.mark.django_db
+class TestForeignKeyResolver:
+    """Test cases for the import foreign key resolver."""
+
+    def test_resolver_caches_lookups_across_batches(self, ledger, django_assert_num_queries):
+        """Test known and unknown keys are only queried once."""
+        resolver = ForeignKeyResolver(Transaction._meta.get_field('ledger'), 'name')
+
+        with django_assert_num_queries(1):
+            assert resolver.resolve(['Cash', 'Missing']) == {'Cash': ledger.id, 'Missing': None}
+            assert resolver.resolve(['Cash', 'Missing']) == {'Cash': ledger.id, 'Missing': None}
+
+    def test_resolver_cache_is_bounded(self, ledger):
+        """Test the least recently used keys are evicted."""
+        resolver = ForeignKeyResolver(Transaction._meta.get_field('ledger'), 'name', cache_size=2)
+
+        resolver.resolve(['Cash'])
+        resolver.resolve(['A'])
+        resolver.resolve(['Cash'])
+        resolver.resolve(['B'])
+
+        assert list(resolver.cache) == ['Cash', 'B']
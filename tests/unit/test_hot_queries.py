@@ -0,0 +1,42 @@
+"""
+Unit tests for the hot query registry and the EXPLAIN check.
+"""
+import io
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from erp_project.hot_queries import HOT_QUERIES, sequential_scans
+from sales.models import Customer
+
+def test_sequential_scans_parses_plans():
+    postgres_plan = (
+        'Bitmap Heap Scan on sales_order  (cost=4.18..12.64 rows=4 width=40)\n'
+        '  ->  Seq Scan on sales_customer  (cost=0.00..1.05 rows=5 width=8)'
+    )
+    assert sequential_scans(postgres_plan, 'postgresql') == ['sales_customer']
+    sqlite_plan = '3 0 0 SEARCH sales_order USING INDEX x (status=?)\n7 0 0 SCAN sales_customer'
+    assert sequential_scans(sqlite_plan, 'sqlite') == ['sales_customer']
+    assert sequential_scans('2 0 0 SCAN sales_order USING INDEX x', 'sqlite') == []
+
+@pytest.mark.django_db
+class TestExplainHotQueries:
+    """Test cases for the explain_hot_queries command."""
+
+    def test_every_hot_query_uses_an_index(self):
+        out = io.StringIO()
+        call_command('explain_hot_queries', min_rows=0, stdout=out)
+        assert out.getvalue().count(': ok') == len(HOT_QUERIES)
+
+    def test_small_tables_are_skipped(self):
+        out = io.StringIO()
+        call_command('explain_hot_queries', 'sales.orders_by_status', stdout=out)
+        assert 'skipped (0 rows' in out.getvalue()
+
+    def test_unindexed_query_is_reported(self, monkeypatch):
+        monkeypatch.setitem(HOT_QUERIES, 'sales.customers_by_phone', lambda: Customer.objects.filter(phone='555'))
+        with pytest.raises(CommandError):
+            call_command('explain_hot_queries', 'sales.customers_by_phone', min_rows=0, stdout=io.StringIO())
+
+    def test_unknown_query_name(self):
+        with pytest.raises(CommandError):
+            call_command('explain_hot_queries', 'nope', stdout=io.StringIO())
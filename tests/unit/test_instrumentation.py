@@ -0,0 +1,66 @@
+"""
+Unit tests for the request instrumentation middleware.
+"""
+import logging
+import pytest
+from django.db import connection
+from erp_project.instrumentation import RequestStats
+from sales.models import Invoice, Order
+
+@pytest.fixture
+def invoices(order):
+    for _ in range(5):
+        extra = Order.objects.create(customer=order.customer, order_date=order.order_date, total_amount=1)
+        Invoice.objects.create(order=extra, invoice_date=order.order_date, amount=1)
+
+@pytest.mark.django_db
+class TestInstrumentation:
+    """Test cases for per-request timing and query counting."""
+
+    def test_repeated_statements_are_grouped(self, invoices):
+        """Test an N+1 loop shows up as one statement repeated per row."""
+        stats = RequestStats('test')
+        with connection.execute_wrapper(stats):
+            for invoice in Invoice.objects.all():
+                invoice.order.customer
+            list(Invoice.objects.filter(pk__in=[1, 2, 3]))
+            list(Invoice.objects.filter(pk__in=[4]))
+
+        count, sql = stats.repeated()[0]
+        assert count == 5 and 'sales_order' in sql
+        assert stats.queries == 13
+        assert stats.db_time > 0
+        # IN lists of different lengths are the same statement
+        assert (2, next(sql for sql in stats.statements if 'IN (...)' in sql)) in stats.repeated(5)
+
+    def test_response_carries_request_id_and_timing(self, client):
+        """Test the request id is echoed and Server-Timing reports queries and templates."""
+        response = client.get('/customers/', HTTP_X_REQUEST_ID='abc123')
+
+        assert response['X-Request-ID'] == 'abc123'
+        assert 'db;desc="' in response['Server-Timing']
+        assert 'tpl;dur=' in response['Server-Timing']
+        assert client.get('/customers/')['X-Request-ID'] != 'abc123'
+
+    def test_slow_requests_are_logged_with_their_sql(self, client, invoices, settings, caplog):
+        """Test requests over the thresholds are logged as warnings with the repeated SQL."""
+        settings.VIEW_CACHE_TIMEOUT = 0
+        settings.REQUEST_SLOW_MS = 0
+
+        with caplog.at_level(logging.DEBUG, logger='erp_project.requests'):
+            client.get('/invoices/')
+
+        record = next(record for record in caplog.records if record.name == 'erp_project.requests')
+        assert record.levelno == logging.WARNING
+        assert record.getMessage().startswith('GET /invoices/ 200 ')
+        assert 'db=' in record.getMessage() and 'tpl=' in record.getMessage()
+        assert record.queries > 0
+
+    def test_fast_requests_are_not_warned_about(self, client, settings, caplog):
+        """Test requests under every threshold are only logged at debug level."""
+        settings.REQUEST_SLOW_MS = 60000
+        with caplog.at_level(logging.DEBUG, logger='erp_project.requests'):
+            client.get('/customers/')
+        assert [record.levelno for record in caplog.records if record.name == 'erp_project.requests'] == [
+            logging.DEBUG
+        ]
@@ -0,0 +1,116 @@
+"""
+Unit tests for the gunicorn profile and the load-test harness.
+"""
+import io
+import json
+import runpy
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from erp_project.loadtest import default_paths, run, summarize
+
+def _gunicorn_config(monkeypatch, **env):
+    for name in ('GUNICORN_WORKER_CLASS', 'WEB_CONCURRENCY', 'GUNICORN_THREADS', 'GUNICORN_PRELOAD'):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+
+class _RedirectToHttps(BaseHTTPRequestHandler):
+    # Redirects like SECURE_SSL_REDIRECT unless the request came through a TLS proxy
+    def do_GET(self):
+        forwarded = self.headers.get('X-Forwarded-Proto') == 'https'
+        self.send_response(200 if forwarded and self.path != '/moved/' else 301)
+        if not forwarded or self.path == '/moved/':
+            self.send_header('Location', f'https://testserver{self.path}')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def redirecting_server():
+    """Serve _RedirectToHttps on a free port and return its base URL."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _RedirectToHttps)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+class TestGunicornConfig:
+    """Test cases for gunicorn.conf.py."""
+
+    def test_defaults_scale_with_cpus(self, monkeypatch):
+        """Test sync workers are sized from the CPU count and the app is preloaded."""
+        config = _gunicorn_config(monkeypatch)
+        assert config['workers'] == config['cpus'] * 2 + 1
+        assert (config['worker_class'], config['threads'], config['preload_app']) == ('sync', 1, True)
+        assert config['max_requests'] and config['max_requests_jitter']
+
+    def test_gthread_profile_from_environment(self, monkeypatch):
+        """Test the worker model and counts are read from the environment."""
+        config = _gunicorn_config(
+            monkeypatch, GUNICORN_WORKER_CLASS='gthread', WEB_CONCURRENCY='3', GUNICORN_PRELOAD='false',
+        )
+        assert (config['workers'], config['threads'], config['preload_app']) == (3, 4, False)
+
+    def test_route_timeouts(self, monkeypatch):
+        """Test exports and job downloads get the longer timeout, which also bounds the worker timeout."""
+        config = _gunicorn_config(monkeypatch, GUNICORN_TIMEOUT='10', GUNICORN_EXPORT_TIMEOUT='90')
+        assert config['route_timeout']('/invoices/') == 10
+        assert config['route_timeout']('/invoices/export/pdf/') == 90
+        assert config['route_timeout']('/accounting/reports/generate/trial_balance/') == 90
+        assert config['route_timeout']('/jobs/42/download/') == 90
+        assert config['route_timeout']('/jobs/42/') == 10
+        assert config['timeout'] == 90
+
+class TestLoadTest:
+    """Test cases for the load-test harness."""
+
+    def test_summarize_reports_percentiles_and_errors(self):
+        """Test latencies are summarized per path and in total."""
+        results = [('/a/', 200, n / 1000) for n in range(1, 101)] + [('/b/', 500, 0.5), ('/b/', None, 1.0)]
+        summary = summarize(results, duration=2)
+
+        assert summary['/a/']['p50'] == pytest.approx(50)
+        assert summary['/a/']['p99'] == pytest.approx(99)
+        assert summary['/b/']['errors'] == 2
+        assert summary['total']['requests'] == 102
+        assert summary['total']['rps'] == 51
+
+    def test_redirects_are_errors(self):
+        """Test a 301 is counted as an error and a redirect, not as a fast success."""
+        summary = summarize([('/a/', 200, 0.1), ('/b/', 301, 0.001), ('/b/', 302, 0.001)], duration=1)
+        assert (summary['/a/']['errors'], summary['/a/']['redirects']) == (0, 0)
+        assert (summary['/b/']['errors'], summary['/b/']['redirects']) == (2, 2)
+        assert summary['total']['errors'] == 2
+
+    def test_requests_pass_as_coming_through_the_tls_proxy(self, redirecting_server):
+        """Test the harness sends X-Forwarded-Proto, so SSL redirects do not answer its requests."""
+        results = run(redirecting_server, {'/customers/': 1, '/moved/': 1}, concurrency=1, duration=0.3)
+        summary = summarize(results, 0.3)
+
+        assert {status for path, status, _ in results if path == '/customers/'} == {200}
+        assert summary['/customers/']['errors'] == 0
+        assert summary['/moved/']['errors'] == summary['/moved/']['redirects'] == summary['/moved/']['requests']
+
+    def test_default_paths_cover_lists_dashboards_and_exports(self):
+        """Test the default mix includes each kind of page."""
+        paths = default_paths()
+        assert '/' in paths and '/customers/' in paths
+        assert any('/export/' in path for path in paths)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_run_against_live_server(self, live_server):
+        """Test the harness drives a real server and the command prints its summary."""
+        results = run(live_server.url, {'/customers/': 1}, concurrency=2, duration=0.5)
+        assert results and {status for _, status, _ in results} == {200}
+
+        stdout = io.StringIO()
+        call_command('loadtest', url=live_server.url, paths=['/'], duration=0.3, concurrency=1, json=True,
+                     stdout=stdout)
+        assert json.loads(stdout.getvalue())['total']['errors'] == 0
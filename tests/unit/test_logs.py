@@ -0,0 +1,102 @@
+"""
+Unit tests for the JSON logging handler and filters.
+"""
+import json
+import logging
+import multiprocessing
+import pytest
+from erp_project import logs
+from erp_project.instrumentation import RequestStats, current_request
+from erp_project.logs import AsyncRotatingFileHandler, JsonFormatter, RequestContextFilter, SamplingFilter
+
+def _record(message='hello %s', args=('world',), level=logging.DEBUG, **extra):
+    record = logging.LogRecord('erp_project.test', level, __file__, 1, message, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def _lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+@pytest.fixture
+def handler(tmp_path):
+    handler = AsyncRotatingFileHandler(str(tmp_path / 'app.log'))
+    yield handler
+    handler.close()
+
+def _log_in_child(handler):
+    handler.handle(_record('from child', ()))
+    handler.close()
+
+class TestJsonLogging:
+    """Test cases for the structured log format and filters."""
+
+    def test_formatter_emits_one_json_object_with_extras(self):
+        """Test the message, level, extras and request id become JSON fields."""
+        record = _record(duration_ms=12.5)
+        token = current_request.set(RequestStats('req-1'))
+        try:
+            RequestContextFilter().filter(record)
+        finally:
+            current_request.reset(token)
+
+        entry = json.loads(JsonFormatter().format(record))
+        assert entry['message'] == 'hello world'
+        assert (entry['level'], entry['logger']) == ('DEBUG', 'erp_project.test')
+        assert (entry['request_id'], entry['duration_ms']) == ('req-1', 12.5)
+
+    def test_repeated_debug_messages_are_sampled(self):
+        """Test a burst passes, then one in every `every`, while warnings always pass."""
+        sampler = SamplingFilter(burst=10, every=100, interval=60)
+        passed = [sampler.filter(_record()) for _ in range(250)]
+        assert sum(passed) == 12
+        assert all(sampler.filter(_record(level=logging.WARNING)) for _ in range(50))
+
+        record = _record('other')
+        assert sampler.filter(record) == sampler.filter(record)
+
+    def test_records_are_written_by_the_listener(self, handler, tmp_path):
+        """Test queued records end up as JSON lines once the listener drains the queue."""
+        handler.handle(_record())
+        handler.listener.stop()
+        assert _lines(tmp_path / 'app.log')[0]['message'] == 'hello world'
+
+    def test_full_queue_drops_instead_of_blocking(self, tmp_path):
+        """Test records are dropped and counted when the writer falls behind."""
+        handler = AsyncRotatingFileHandler(str(tmp_path / 'app.log'), queueSize=1)
+        handler.listener.stop()
+        for _ in range(3):
+            handler.handle(_record())
+        assert handler.dropped == 2
+
+        handler.restart()
+        handler.handle(_record('after', ()))
+        handler.close()
+        assert _lines(tmp_path / 'app.log')[-1]['dropped_records'] == 2
+
+    def test_file_rotates_by_size(self, tmp_path):
+        """Test the file is rolled over once it reaches maxBytes."""
+        handler = AsyncRotatingFileHandler(str(tmp_path / 'app.log'), maxBytes=500, backupCount=2)
+        for n in range(20):
+            handler.handle(_record('line %s', (n,)))
+        handler.close()
+        assert (tmp_path / 'app.log.1').exists() and (tmp_path / 'app.log.2').exists()
+        assert not (tmp_path / 'app.log.3').exists()
+
+    def test_rotates_without_file_locks(self, tmp_path, monkeypatch):
+        """Test the handler writes and rotates where fcntl is missing, without a lock file."""
+        monkeypatch.setattr(logs, 'fcntl', None)
+        handler = AsyncRotatingFileHandler(str(tmp_path / 'app.log'), maxBytes=500, backupCount=2)
+        for n in range(20):
+            handler.handle(_record('line %s', (n,)))
+        handler.close()
+        assert _lines(tmp_path / 'app.log')[-1]['message'] == 'line 19'
+        assert (tmp_path / 'app.log.1').exists()
+        assert not (tmp_path / 'app.log.lock').exists()
+
+    def test_forked_child_gets_its_own_listener(self, handler, tmp_path):
+        """Test a worker forked after logging was configured still writes its records."""
+        child = multiprocessing.get_context('fork').Process(target=_log_in_child, args=(handler,))
+        child.start()
+        child.join()
+        assert child.exitcode == 0
+        assert [line['message'] for line in _lines(tmp_path / 'app.log')] == ['from child']
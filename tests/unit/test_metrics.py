@@ -0,0 +1,120 @@
+"""
+Unit tests for the multi-process metrics registry and the /metrics endpoint.
+"""
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import pytest
+from erp_project import counters, metrics
+from erp_project.export_import_utils import iter_csv
+from sales.models import Customer
+
+@pytest.fixture(autouse=True)
+def metrics_dir(settings, tmp_path):
+    """Give every test an empty metrics directory and no recorded values."""
+    settings.METRICS_DIR = str(tmp_path / 'metrics')
+    metrics._values.reset()
+
+def _counter(name, **labels):
+    key = (name, tuple(str(labels[label]) for label in metrics.REGISTRY[name].labels))
+    return metrics.collect()['counters'].get(key, 0)
+
+def _child():
+    metrics.CACHE_REQUESTS.inc(3, cache='view', result='hit')
+    metrics.flush()
+
+class TestRegistry:
+    """Test cases for recording, aggregating and rendering metrics."""
+
+    def test_histogram_renders_cumulative_buckets(self):
+        """Test observations are bucketed, summed and counted in the text format."""
+        for seconds in (0.004, 0.02, 0.02, 40):
+            metrics.REQUEST_DURATION.observe(seconds, view='sales:orders_list')
+
+        text = metrics.render()
+        assert '# TYPE erp_request_duration_seconds histogram' in text
+        assert 'erp_request_duration_seconds_bucket{view="sales:orders_list",le="0.005"} 1' in text
+        assert 'erp_request_duration_seconds_bucket{view="sales:orders_list",le="0.025"} 3' in text
+        assert 'erp_request_duration_seconds_bucket{view="sales:orders_list",le="30"} 3' in text
+        assert 'erp_request_duration_seconds_bucket{view="sales:orders_list",le="+Inf"} 4' in text
+        assert 'erp_request_duration_seconds_count{view="sales:orders_list"} 4' in text
+
+    def test_labels_must_match(self):
+        """Test a metric rejects labels it was not declared with."""
+        with pytest.raises(ValueError):
+            metrics.EXPORT_ROWS.inc(1, model='sales.Order')
+
+    def test_values_are_summed_across_processes(self):
+        """Test other workers' files are added to this process's values, also after they exit."""
+        metrics.CACHE_REQUESTS.inc(cache='view', result='hit')
+        child = multiprocessing.get_context('fork').Process(target=_child)
+        child.start()
+        child.join()
+
+        assert _counter('erp_cache_requests_total', cache='view', result='hit') == 4
+        metrics.mark_process_dead(child.pid)
+        assert _counter('erp_cache_requests_total', cache='view', result='hit') == 4
+
+        metrics.reset_directory()
+        assert _counter('erp_cache_requests_total', cache='view', result='hit') == 1
+
+    def test_process_archives_its_file_on_exit(self, settings):
+        """Test a process that is not a gunicorn worker folds its values into the archive when it exits."""
+        script = (
+            'import django; django.setup()\n'
+            'from erp_project import metrics\n'
+            'metrics.CACHE_REQUESTS.inc(2, cache="view", result="miss")\n'
+            'metrics.flush()\n'
+        )
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE='erp_project.settings',
+                   METRICS_DIR=settings.METRICS_DIR, SECRET_KEY='x')
+        subprocess.run([sys.executable, '-c', script], env=env, check=True)
+
+        assert sorted(name for name in os.listdir(settings.METRICS_DIR) if name.endswith('.json')) == [metrics.ARCHIVE]
+        with open(os.path.join(settings.METRICS_DIR, metrics.ARCHIVE)) as file:
+            assert json.load(file)['counters'] == [['erp_cache_requests_total', ['view', 'miss'], 2]]
+        assert _counter('erp_cache_requests_total', cache='view', result='miss') == 2
+
+@pytest.mark.django_db
+class TestInstrumentedCode:
+    """Test cases for the metrics recorded by the application."""
+
+    def test_endpoint_reports_request_latency_per_view(self, client):
+        """Test /metrics includes the histograms of the requests served before it."""
+        client.get('/customers/')
+        response = client.get('/metrics')
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        text = response.content.decode()
+        assert 'erp_request_duration_seconds_count{view="sales:customers_list"} 1' in text
+        assert 'erp_request_queries_count{view="sales:customers_list"} 1' in text
+
+    def test_endpoint_requires_token_when_configured(self, client, settings):
+        """Test METRICS_TOKEN protects the endpoint, whatever the client's address."""
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code == 200
+        assert client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret', REMOTE_ADDR='203.0.113.9').status_code == 200
+
+    def test_endpoint_without_token_is_internal_only(self, client, settings):
+        """Test without METRICS_TOKEN only METRICS_ALLOWED_IPS are served, unless DEBUG is on."""
+        settings.METRICS_TOKEN = ''
+        settings.DEBUG = False
+        assert client.get('/metrics', REMOTE_ADDR='203.0.113.9').status_code == 403
+        assert client.get('/metrics', REMOTE_ADDR='127.0.0.1').status_code == 200
+
+        settings.DEBUG = True
+        assert client.get('/metrics', REMOTE_ADDR='203.0.113.9').status_code == 200
+
+    def test_cache_hits_and_export_rows_are_counted(self, customer):
+        """Test cache lookups and exported rows are recorded."""
+        counters.count(Customer)
+        counters.count(Customer)
+        ''.join(iter_csv(Customer.objects.all(), ['id', 'name']))
+
+        assert _counter('erp_cache_requests_total', cache='counter', result='miss') == 1
+        assert _counter('erp_cache_requests_total', cache='counter', result='hit') == 1
+        assert _counter('erp_export_rows_total', format='csv') == 1
@@ -0,0 +1,100 @@
+"""
+Unit tests for keyset pagination.
+"""
+import base64
+import json
+import pytest
+from django.test import RequestFactory
+from django.utils import timezone
+from sales.models import Customer
+from erp_project.pagination import decode_cursor, encode_cursor, paginate
+
+def _crafted(items):
+    return base64.urlsafe_b64encode(json.dumps(items).encode('utf-8')).decode('ascii')
+
+# Well-formed cursors whose values cannot be compared with (created_at, id)
+CRAFTED_CURSORS = {
+    'none': [['value', None], ['value', 1]],
+    'bad datetime': [['datetime', 'garbage'], ['value', 1]],
+    'text for datetime': [['value', 'abc'], ['value', 1]],
+    'text for id': [['datetime', '2024-01-01T00:00:00+00:00'], ['value', 'abc']],
+}
+
+def _page(query=''):
+    request = RequestFactory().get(f'/customers/?{query}')
+    return paginate(request, Customer.objects.all())
+
+@pytest.fixture
+def customers():
+    Customer.objects.bulk_create([
+        Customer(name=f'Customer {i}', email=f'c{i}@example.com', phone='555', address='Street')
+        for i in range(7)
+    ])
+    # Identical timestamps force the id tie-breaker to do its job
+    Customer.objects.update(created_at=timezone.now())
+    return list(Customer.objects.order_by('-created_at', '-id'))
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cases for the keyset paginator."""
+
+    def test_pages_forward_and_back(self, customers):
+        """Test walking every page forward and then back again."""
+        first = _page('size=3')
+        assert list(first) == customers[:3]
+        assert first.has_next and not first.has_previous
+
+        second = _page(first.next_query)
+        assert list(second) == customers[3:6]
+        assert second.has_next and second.has_previous
+
+        third = _page(second.next_query)
+        assert list(third) == customers[6:]
+        assert not third.has_next
+        assert third.next_query is None
+
+        back = _page(third.previous_query)
+        assert list(back) == customers[3:6]
+        assert back.has_previous
+
+        start = _page(back.previous_query)
+        assert list(start) == customers[:3]
+        assert not start.has_previous
+
+    def test_page_runs_one_query_without_count(self, customers, django_assert_num_queries):
+        """Test a page is a single LIMIT query with no COUNT(*)."""
+        page = _page('size=3')
+
+        with django_assert_num_queries(1) as captured:
+            assert len(page) == 3
+            assert page.has_next
+
+        sql = captured.captured_queries[0]['sql']
+        assert 'COUNT' not in sql.upper()
+        assert 'OFFSET' not in sql.upper()
+
+    def test_unknown_sort_and_bad_cursor_fall_back(self, customers):
+        """Test invalid parameters fall back to the first page of the default sort."""
+        page = _page('sort=name&size=abc&after=not-a-cursor')
+
+        assert page.sort == 'newest'
+        assert list(page) == customers
+
+    def test_cursor_round_trip(self):
+        """Test cursors keep datetimes exact to the microsecond."""
+        now = timezone.now().replace(microsecond=123456)
+
+        assert decode_cursor(encode_cursor([now, 42]), 2) == [now, 42]
+
+    @pytest.mark.parametrize('items', CRAFTED_CURSORS.values(), ids=CRAFTED_CURSORS.keys())
+    def test_cursor_values_must_fit_the_sort_fields(self, customers, items):
+        """Test a cursor holding None or values of the wrong type selects the first page."""
+        for param in ('after', 'before'):
+            page = _page(f'{param}={_crafted(items)}')
+            assert list(page) == customers
+
+    @pytest.mark.parametrize('url', ['/customers/', '/accounting/transactions/'])
+    @pytest.mark.parametrize('items', CRAFTED_CURSORS.values(), ids=CRAFTED_CURSORS.keys())
+    def test_list_views_ignore_crafted_cursors(self, client, url, items):
+        """Test crafted cursors are answered with the first page rather than an error."""
+        assert client.get(url, {'after': _crafted(items)}).status_code == 200
@@ -0,0 +1,75 @@
+"""
+Unit tests for the seed_erp benchmark data generator.
+"""
+import io
+from datetime import date
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count
+from django.utils import timezone
+from accounting.balances import verify_balances
+from accounting.models import Ledger, Transaction
+from erp_project import counters
+from hr.models import Attendance, Employee
+from inventory.models import Product, Supplier
+from sales.models import Customer, Invoice, Order
+
+def _seed(**options):
+    call_command('seed_erp', scale=50, days=60, batch_size=100, stdout=io.StringIO(), **options)
+
+def _snapshot():
+    return list(Order.objects.order_by('pk').values_list(
+        'customer__name', 'order_date', 'total_amount', 'status', 'invoice__amount',
+    ))
+
+@pytest.mark.django_db
+class TestSeedErp:
+    """Test cases for the seed_erp command."""
+
+    def test_rows_are_consistent_and_derived_data_rebuilt(self):
+        """Test counts, relations, balances and counters after seeding."""
+        _seed()
+
+        assert Customer.objects.count() == 50
+        assert Order.objects.count() == 500
+        assert Transaction.objects.count() == 2500
+        assert not Invoice.objects.filter(order__status='cancelled').exists()
+        assert Invoice.objects.count() == Order.objects.exclude(status='cancelled').count()
+        assert Attendance.objects.count() == Employee.objects.count() * len({
+            day for day in Attendance.objects.values_list('date', flat=True)
+        })
+        assert verify_balances() == []
+        assert counters.count(Order) == 500
+
+    def test_same_seed_generates_same_data(self, monkeypatch):
+        """Test the generator is deterministic for a seed, whatever day it runs on."""
+        _seed(seed=7)
+        first = _snapshot()
+        for model in (Customer, Ledger, Employee, Product, Supplier):
+            model.objects.all().delete()
+
+        monkeypatch.setattr(timezone, 'localdate', lambda *args, **kwargs: date(2031, 5, 17))
+        _seed(seed=7)
+        assert _snapshot() == first
+
+    def test_end_bounds_the_history(self):
+        """Test --end sets the last day the dates are spread over."""
+        _seed(end=date(2020, 6, 30), count=[('orders', 200)])
+        dates = Order.objects.values_list('order_date', flat=True)
+        assert max(dates) <= date(2020, 6, 30)
+        assert min(dates) >= date(2020, 5, 2)
+
+    def test_orders_are_skewed_to_hot_customers(self):
+        """Test a few customers receive most of the orders."""
+        _seed()
+        per_customer = sorted(
+            Customer.objects.annotate(orders=Count('order')).values_list('orders', flat=True), reverse=True
+        )
+        assert per_customer[0] > 5 * (500 / 50)
+
+    def test_refuses_to_seed_the_same_seed_twice(self):
+        """Test rerunning a seed fails instead of colliding on unique SKUs."""
+        _seed(count=[('orders', 10), ('transactions', 10)])
+        with pytest.raises(CommandError):
+            _seed()
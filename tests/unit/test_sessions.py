@@ -0,0 +1,73 @@
+"""
+Unit tests for the cached session store and session pruning.
+"""
+import io
+from datetime import timedelta
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from erp_project.sessions import BUCKET_KEY, SessionStore
+
+@pytest.fixture
+def session():
+    store = SessionStore()
+    store['user'] = 'alice'
+    store.save(must_create=True)
+    return store.session_key
+
+def _writes(queries):
+    return [q['sql'] for q in queries if q['sql'].startswith(('UPDATE', 'INSERT')) and 'django_session' in q['sql']]
+
+@pytest.mark.django_db
+class TestSessionStore:
+    """Test cases for the write-skipping session store."""
+
+    @pytest.mark.parametrize('cache_reads,reads', [(True, 0), (False, 1)])
+    def test_unchanged_session_is_not_rewritten(self, settings, session, cache_reads, reads,
+                                                django_assert_num_queries):
+        settings.SESSION_CACHE_READS = cache_reads
+        with django_assert_num_queries(reads):
+            store = SessionStore(session)
+            assert store['user'] == 'alice'
+            store.save()
+
+    def test_modified_session_is_written(self, session):
+        store = SessionStore(session)
+        store['user'] = 'bob'
+        store.save()
+        assert SessionStore(session)['user'] == 'bob'
+        assert Session.objects.get(session_key=session).get_decoded()['user'] == 'bob'
+
+    def test_new_expiry_bucket_is_written(self, session):
+        store = SessionStore(session)
+        store._session[BUCKET_KEY] -= 1
+        with CaptureQueriesContext(connection) as queries:
+            store.save()
+        assert _writes(queries.captured_queries)
+
+    def test_row_outlives_cookie_by_one_bucket(self, settings, session):
+        expire_date = Session.objects.get(session_key=session).expire_date
+        expected = timezone.now() + timedelta(seconds=settings.SESSION_COOKIE_AGE + settings.SESSION_EXPIRY_BUCKET)
+        assert abs(expire_date - expected) < timedelta(minutes=1)
+
+    def test_page_views_do_not_write_sessions(self, client):
+        client.force_login(get_user_model().objects.create_user('alice', password='x'))
+        client.get('/jobs/')
+        with CaptureQueriesContext(connection) as queries:
+            client.get('/jobs/')
+        assert not _writes(queries.captured_queries)
+
+@pytest.mark.django_db
+def test_prune_sessions_in_batches(session):
+    past = timezone.now() - timedelta(days=1)
+    Session.objects.bulk_create([
+        Session(session_key=f'expired{i}', session_data='', expire_date=past) for i in range(5)
+    ])
+    out = io.StringIO()
+    call_command('prune_sessions', batch_size=2, stdout=out)
+    assert 'Deleted 5 expired sessions' in out.getvalue()
+    assert list(Session.objects.values_list('session_key', flat=True)) == [session]
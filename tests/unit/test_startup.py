@@ -0,0 +1,70 @@
+"""
+Start-up benchmark: what a fresh worker imports and how much memory it holds.
+
+Each test starts a new interpreter with `python -X importtime`, sets Django
+up and resolves the URLconf, as a web worker does before its first request.
+"""
+import json
+import os
+import subprocess
+import sys
+import pytest
+from django.conf import settings
+
+HEAVY_MODULES = ('pandas', 'numpy', 'reportlab', 'pypdf')
+
+STARTUP_SCRIPT = f'''
+import json, os, sys
+import django
+
+def rss_kb():
+    # Current resident set; ru_maxrss would include the parent's peak on Linux
+    with open('/proc/self/statm') as statm:
+        return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+
+django.setup()
+from django.urls import get_resolver
+get_resolver().url_patterns
+loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({HEAVY_MODULES!r}))
+rss = rss_kb()
+import pandas, reportlab.platypus, reportlab.pdfgen.canvas
+heavy_rss = rss_kb()
+print(json.dumps({{'loaded': loaded, 'rss_kb': rss, 'heavy_rss_kb': heavy_rss}}))
+'''
+
+def _importtime_summary(stderr, limit=10):
+    """Return the top-level imports with the largest cumulative time (microseconds)."""
+    totals = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        # Nested imports are indented under the module that triggered them
+        if not name[1:].startswith(' '):
+            totals.append((int(cumulative), name.strip()))
+    return sorted(totals, reverse=True)[:limit]
+
+def _startup_profile():
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': 'erp_project.settings', 'DEBUG': 'True'}
+    env.setdefault('SECRET_KEY', 'startup-benchmark')
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert process.returncode == 0, process.stderr[-2000:]
+    return json.loads(process.stdout.splitlines()[-1]), _importtime_summary(process.stderr)
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/statm'), reason='RSS is read from /proc')
+class TestStartup:
+    """Test cases for worker start-up cost."""
+
+    def test_heavy_dependencies_are_not_imported_at_startup(self):
+        """Test pandas, reportlab and pypdf are only loaded by the views that use them."""
+        profile, summary = _startup_profile()
+        assert profile['loaded'] == [], f'slowest imports (us, module): {summary}'
+
+    def test_startup_memory_excludes_heavy_dependencies(self):
+        """Test a started worker holds well under the memory the heavy dependencies add."""
+        profile, summary = _startup_profile()
+        saved_mb = (profile['heavy_rss_kb'] - profile['rss_kb']) / 1024
+        assert saved_mb > 20, f'RSS {profile["rss_kb"]} KB, +{saved_mb:.0f} MB with exports loaded; {summary}'
@@ -8,6 +8,11 @@ class CustomUser(AbstractUser):
         ('staff', 'Staff'),
     ]
     role = models.CharField(max_length=20, choices=ROLE_CHOICES, default='staff')
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['date_joined', 'id'], name='users_date_joined_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.role})"
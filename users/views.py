@@ -2,12 +2,15 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from .forms import CustomUserCreationForm, CustomUserChangeForm
+from erp_project.pagination import paginate
 
 User = get_user_model()
 
+USER_SORTS = {'newest': ('-date_joined', '-id'), 'oldest': ('date_joined', 'id')}
+
 def users_list(request):
     """Display list of all users."""
-    users = User.objects.all()
+    users = paginate(request, User.objects.all(), USER_SORTS)
     return render(request, 'users/users_list.html', {'users': users})
 
 def user_detail(request, pk):